@@ -0,0 +1,335 @@
+"""Lazy pygame start-up and background asset loading.
+
+Nothing here starts SDL at import time. init_video, init_fonts and
+init_audio bring a subsystem up the first time something needs it, so tools
+that only import the game never open an audio device. An AssetLoader works
+through a manifest on a background thread while the menu is already on
+screen; get() hands back an asset at once if it is loaded, and otherwise
+loads it on the calling thread or waits for the loader to finish it.
+Processed assets (rotated sprite sheets, synthesized sounds) go into an
+on-disk cache keyed by their inputs, so a warm start skips the processing.
+
+The loader thread only draws on Surfaces of its own, runs NumPy and reads
+and writes the cache. Fonts, the mixer and Sound objects share SDL state
+that is not thread-safe, so subsystems are started and fonts made on the
+game's thread, and each asset's finish() runs on the thread that asks for
+the asset: ready() and get() are for the game's thread only.
+
+    python assets.py
+"""
+import argparse
+import hashlib
+import inspect
+import io
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+
+import pygame
+
+from audio import to_mixer
+
+ASSET_CACHE_DIR = ".asset_cache"
+SHEET_HEADER = struct.Struct("<4sI")  # magic, sprite count
+SPRITE_HEADER = struct.Struct("<HH")  # width, height; RGBA bytes follow
+SHEET_MAGIC = b"SPRS"
+# Mixer settings: 16-bit stereo, converted by SDL if the device differs
+AUDIO_RATE = 44100
+AUDIO_FORMAT = -16
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER = 512  # Samples; small enough that effects start within a frame
+
+
+def init_video():
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+
+def init_fonts():
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+def init_audio():
+    # False when there is no audio device to open
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init(AUDIO_RATE, AUDIO_FORMAT, AUDIO_CHANNELS, AUDIO_BUFFER, allowedchanges=0)
+        except pygame.error:
+            return False
+    return True
+
+
+class Asset:
+    # A manifest entry. sources() gathers the cheap inputs, key() names them
+    # for the disk cache, process() does the expensive work, and dump() and
+    # restore() turn its result into bytes and back; these run on the loader
+    # thread. finish() turns a processed or restored value into the asset,
+    # on the thread that asks for it. With no key the asset is processed
+    # every time and never cached.
+    def __init__(self, name):
+        self.name = name
+
+    def sources(self):
+        return None
+
+    def key(self, sources):
+        return None
+
+    def process(self, sources):
+        raise NotImplementedError
+
+    def dump(self, value):
+        raise NotImplementedError
+
+    def restore(self, data):
+        raise NotImplementedError
+
+    def finish(self, sources, value):
+        return value
+
+
+class SpriteSheet(Asset):
+    # An upright body rendered by render(*args) and its rotations every step
+    # degrees, keyed by the rendered pixels so any change to the drawing
+    # code or its colours misses the cache. The value is (body, sprites).
+    def __init__(self, name, render, args, step):
+        super().__init__(name)
+        self.render = render
+        self.args = args
+        self.step = step
+
+    def sources(self):
+        return self.render(*self.args)
+
+    def key(self, body):
+        return repr((self.args, self.step, body.get_size())).encode() + pygame.image.tobytes(body, "RGBA")
+
+    def process(self, body):
+        # Game angles turn clockwise, pygame's counter-clockwise
+        return [pygame.transform.rotate(body, -i * self.step) for i in range(round(360 / self.step))]
+
+    def dump(self, sprites):
+        parts = [SHEET_HEADER.pack(SHEET_MAGIC, len(sprites))]
+        for sprite in sprites:
+            parts.append(SPRITE_HEADER.pack(*sprite.get_size()))
+            parts.append(pygame.image.tobytes(sprite, "RGBA"))
+        return b"".join(parts)
+
+    def restore(self, data):
+        magic, count = SHEET_HEADER.unpack_from(data)
+        if magic != SHEET_MAGIC:
+            raise ValueError("not a sprite sheet")
+        sprites, offset = [], SHEET_HEADER.size
+        for _ in range(count):
+            size = SPRITE_HEADER.unpack_from(data, offset)
+            offset += SPRITE_HEADER.size
+            end = offset + size[0] * size[1] * 4
+            sprites.append(pygame.image.frombytes(data[offset:end], size, "RGBA"))
+            offset = end
+        return sprites
+
+    def finish(self, body, sprites):
+        return body, sprites
+
+
+class SoundAsset(Asset):
+    # A sound for a mixer started as mixer, pygame.mixer.get_init()'s
+    # (rate, format, channels), or None without an audio device. A sound
+    # file is read on the loader thread and decoded when the Sound is made.
+    # Without the file, synth(rate) makes the samples in the mixer's format,
+    # keyed by the source of its module and cached.
+    def __init__(self, name, path, volume=1.0, synth=None, mixer=None):
+        super().__init__(name)
+        self.path = path
+        self.volume = volume
+        self.synth = synth
+        self.mixer = mixer
+
+    def sources(self):
+        if self.mixer is None:
+            raise OSError("no audio device")
+        if self.synth is not None and not os.path.exists(self.path):
+            module = inspect.getsource(inspect.getmodule(self.synth))
+            return "synth", self.synth.__name__, module, self.mixer
+        return ("file",)
+
+    def key(self, sources):
+        return repr(sources).encode() if sources[0] == "synth" else None
+
+    def process(self, sources):
+        if sources[0] == "synth":
+            rate, mixer_format, channels = self.mixer
+            return to_mixer(self.synth(rate), mixer_format, channels).tobytes()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def dump(self, data):
+        return data
+
+    def restore(self, data):
+        return data
+
+    def finish(self, sources, data):
+        if sources[0] == "synth":
+            sound = pygame.mixer.Sound(buffer=data)
+        else:
+            sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        sound.set_volume(self.volume)
+        return sound
+
+
+class AssetLoader:
+    def __init__(self, manifest, cache_dir=ASSET_CACHE_DIR):
+        self.manifest = {asset.name: asset for asset in manifest}
+        self.cache_dir = cache_dir
+        self.prepared = {}  # name -> (sources, value) waiting for finish()
+        self.values = {}
+        self.errors = {}  # name -> why the asset is None
+        self.cache_hits = 0
+        self.claims = {}  # name -> Event set once the asset is in prepared or errors
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.load_all, name="asset-loader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def __contains__(self, name):
+        return name in self.manifest
+
+    def load_all(self):
+        for name in self.manifest:
+            self.prepare(name)
+        for name, error in self.errors.items():
+            print(f"Asset {name} not loaded: {error}")
+
+    def wait(self):
+        for name in self.manifest:
+            self.get(name)
+
+    def ready(self, name):
+        # The asset if it is loaded already, else None; never blocks
+        if name not in self.values:
+            event = self.claims.get(name)
+            if event is None or not event.is_set():
+                return None
+            self.finish(name)
+        return self.values[name]
+
+    def get(self, name):
+        if name not in self.values:
+            self.prepare(name)
+            self.finish(name)
+        return self.values[name]
+
+    def prepare(self, name):
+        # Loads the asset up to finish(), unless another thread has claimed
+        # it, in which case this waits for that thread
+        with self.lock:
+            event = self.claims.get(name)
+            mine = event is None
+            if mine:
+                event = self.claims[name] = threading.Event()
+        if mine:
+            try:
+                self.prepared[name] = self.load(self.manifest[name])
+            except (OSError, ValueError, pygame.error) as e:
+                self.errors[name] = str(e)
+            finally:
+                event.set()
+        else:
+            event.wait()
+
+    def finish(self, name):
+        value = None
+        if name not in self.errors:
+            try:
+                value = self.manifest[name].finish(*self.prepared.pop(name))
+            except pygame.error as e:
+                self.errors[name] = str(e)
+        self.values[name] = value
+
+    def load(self, asset):
+        # (sources, value) for asset.finish(), from the cache if possible
+        sources = asset.sources()
+        key = asset.key(sources)
+        path = None
+        if key is not None and self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{asset.name}-{hashlib.sha1(key).hexdigest()[:16]}.bin")
+            try:
+                with open(path, "rb") as f:
+                    value = asset.restore(f.read())
+                self.cache_hits += 1
+                return sources, value
+            except (OSError, ValueError, struct.error, pygame.error):
+                pass  # Missing or unreadable: processed again and stored below
+        value = asset.process(sources)
+        if path:
+            self.store(path, asset.dump(value))
+        return sources, value
+
+    def store(self, path, data):
+        # Written beside the entry and renamed over it, so a reader never
+        # sees half a file
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"Not caching {path}: {e}")
+
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import starship_lander
+imported = time.perf_counter()
+game = starship_lander.Game(seed=0, asset_cache=sys.argv[1])
+game.draw()
+game.present()
+drawn = time.perf_counter()
+game.assets.wait()
+loaded = time.perf_counter()
+game.assets.thread.join()  # Its messages come before the result line
+print(imported - start, drawn - imported, loaded - imported, game.assets.cache_hits, len(game.assets.manifest))
+"""
+
+
+def startup_times(cache_dir=ASSET_CACHE_DIR):
+    # Import time, time from import to the first presented frame and to every
+    # asset loaded, in ms, from a fresh interpreter
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, cache_dir], env=env, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True).stdout
+    imported, drawn, loaded, hits, count = output.splitlines()[-1].split()
+    return {
+        "import_ms": float(imported) * 1000,
+        "first_frame_ms": float(drawn) * 1000,
+        "assets_ms": float(loaded) * 1000,
+        "cache_hits": int(hits),
+        "assets": int(count),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the game's import, first frame and asset loading.")
+    parser.add_argument("--cache", default=ASSET_CACHE_DIR, help="asset cache directory to time with")
+    args = parser.parse_args()
+
+    cache = os.path.abspath(args.cache)
+    for run in ("first", "second"):
+        times = startup_times(cache)
+        print(f"{run} start: import {times['import_ms']:.1f} ms, first frame {times['first_frame_ms']:.1f} ms, "
+              f"all assets {times['assets_ms']:.1f} ms ({times['cache_hits']} of {times['assets']} from the cache)")
+
+
+if __name__ == "__main__":
+    main()
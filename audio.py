@@ -0,0 +1,172 @@
+"""Procedural sound effects and a fixed pool of mixer voices.
+
+The effects the game ships without files for are synthesized here as NumPy
+buffers: a seamless engine-noise loop, an explosion and a landing chime.
+Each function takes the sample rate and returns mono float samples in
+[-1, 1]; to_mixer() shapes them for the mixer. assets.SoundAsset makes them
+when no sound file is found and caches the result on disk.
+
+VoicePool owns every mixer channel the game uses. The engine loop plays on a
+reserved channel for as long as the pool exists and follows the throttle
+through its volume, so tapping thrust never starts, stops or allocates
+anything. One-shot effects take a free voice or steal the oldest one of no
+higher priority.
+
+    python audio.py --out sounds
+"""
+import argparse
+import os
+import wave
+
+import numpy as np
+import pygame
+
+SYNTH_SEED = 7  # Fixed, so the synthesized noise is the same on every run
+ENGINE_LOOP_SECONDS = 2.0
+VOICES = 8  # One-shot channels, besides the engine loop's
+LOOP_ATTACK = 0.2  # Engine loop volume change per frame while spooling up
+LOOP_RELEASE = 0.08  # ... and while dying down, a bit slower
+
+
+def shaped_noise(rng, n, rate, cutoff, low=20.0):
+    # White noise through a two-pole low-pass at cutoff and a cut below low,
+    # done on the spectrum, so the result repeats seamlessly every n samples
+    frequencies = np.fft.rfftfreq(n, 1 / rate)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    spectrum /= 1 + (frequencies / cutoff) ** 2
+    spectrum[frequencies < low] = 0
+    return np.fft.irfft(spectrum, n)
+
+
+def normalize(samples, peak):
+    return samples * (peak / max(np.abs(samples).max(), 1e-9))
+
+
+def engine_noise(rate, seconds=ENGINE_LOOP_SECONDS):
+    # Rocket rumble with a slow flutter; the flutter makes a whole number of
+    # cycles per loop so the seam stays inaudible
+    n = int(rate * seconds)
+    rng = np.random.default_rng(SYNTH_SEED)
+    rumble = shaped_noise(rng, n, rate, 300.0, 25.0) + 0.15 * shaped_noise(rng, n, rate, 2500.0)
+    t = np.arange(n) / rate
+    flutter = round(6 * seconds) / seconds
+    rumble *= 1 + 0.2 * np.sin(2 * np.pi * flutter * t)
+    return normalize(rumble, 0.8)
+
+
+def explosion(rate, seconds=1.6):
+    # A sharp crack over a deep rumble that dies away
+    n = int(rate * seconds)
+    rng = np.random.default_rng(SYNTH_SEED + 1)
+    t = np.arange(n) / rate
+    attack = np.minimum(t / 0.004, 1.0)
+    rumble = normalize(shaped_noise(rng, n, rate, 120.0, 20.0), 1.0) * np.exp(-t / 0.45)
+    crack = normalize(shaped_noise(rng, n, rate, 3000.0), 1.0) * np.exp(-t / 0.04)
+    return normalize(attack * (rumble + 0.6 * crack), 0.9)
+
+
+def chime(rate, seconds=1.2):
+    # Rising C major arpeggio of bell-like tones
+    n = int(rate * seconds)
+    t = np.arange(n) / rate
+    samples = np.zeros(n)
+    for frequency, start in ((1046.5, 0.0), (1318.5, 0.09), (1568.0, 0.18)):
+        local = np.maximum(t - start, 0.0)
+        on = t >= start
+        samples += on * np.sin(2 * np.pi * frequency * local) * np.exp(-local / 0.35)
+        samples += on * 0.3 * np.sin(2 * np.pi * 2 * frequency * local) * np.exp(-local / 0.12)
+    samples *= np.minimum((n - np.arange(n)) / (0.01 * rate), 1.0)  # No click at the end
+    return normalize(samples, 0.7)
+
+
+def to_mixer(samples, mixer_format, channels):
+    # Float samples in [-1, 1] as the array pygame.sndarray expects for the
+    # mixer's sample format and channel count
+    if mixer_format == -16:
+        data = (samples * 32767).astype(np.int16)
+    elif mixer_format == 16:
+        data = (samples * 32767 + 32768).astype(np.uint16)
+    elif mixer_format == -8:
+        data = (samples * 127).astype(np.int8)
+    elif mixer_format == 8:
+        data = (samples * 127 + 128).astype(np.uint8)
+    else:
+        raise ValueError(f"unsupported mixer format {mixer_format}")
+    return np.ascontiguousarray(np.repeat(data[:, None], channels, axis=1)) if channels > 1 else data
+
+
+class VoicePool:
+    def __init__(self, voices=VOICES):
+        pygame.mixer.set_num_channels(voices + 1)
+        pygame.mixer.set_reserved(1)  # Channel 0 is never handed out by pygame either
+        self.loop_channel = pygame.mixer.Channel(0)
+        self.channels = [pygame.mixer.Channel(i + 1) for i in range(voices)]
+        self.started = [0] * voices  # Play count when each voice last started
+        self.priority = [0] * voices
+        self.plays = 0
+        self.stolen = 0
+        self.loop = None
+        self.volume = 0.0
+
+    def play(self, sound, priority=0):
+        # False if every voice is busy with something more important
+        voice = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                voice = i
+                break
+            if self.priority[i] <= priority and (voice is None or self.started[i] < self.started[voice]):
+                voice = i
+        else:
+            if voice is None:
+                return False
+            self.stolen += 1
+        self.plays += 1
+        self.started[voice] = self.plays
+        self.priority[voice] = priority
+        self.channels[voice].play(sound)
+        return True
+
+    def set_loop(self, sound):
+        # The engine loop runs from here on, silent until throttled up
+        if sound is not self.loop:
+            self.loop = sound
+            self.loop_channel.set_volume(self.volume)
+            self.loop_channel.play(sound, loops=-1)
+
+    def throttle(self, level):
+        # Ease the loop's volume toward level, one step per frame
+        volume = self.volume
+        if level > volume:
+            volume = min(level, volume + LOOP_ATTACK)
+        else:
+            volume = max(level, volume - LOOP_RELEASE)
+        if volume != self.volume:
+            self.volume = volume
+            self.loop_channel.set_volume(volume)
+
+
+# Name -> synth, for the sounds that ship without files
+SYNTHS = {"thrust": engine_noise, "crash": explosion, "success": chime}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthesized sounds out as WAV files.")
+    parser.add_argument("--out", default="sounds", help="directory for the .wav files")
+    parser.add_argument("--rate", type=int, default=44100)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, synth in SYNTHS.items():
+        data = to_mixer(synth(args.rate), -16, 1)
+        path = os.path.join(args.out, f"{name}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(args.rate)
+            f.writeframes(data.tobytes())
+        print(f"{path}: {len(data) / args.rate:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Rollout autopilot: every few frames, fly hundreds of candidate control
+sequences ahead in one vector_sim batch and keep the best.
+
+A candidate is a row of 4-bit control masks, the same packing as input
+recordings, one per frame. Each plan starts from the previous best shifted to
+the current frame; the other rows are random mutations of it, fresh random
+sequences held SEGMENT frames at a time, and the scripted descent controller
+flown closed-loop with and without key slips. A candidate that
+touches down within the landing limits ranks by fuel left, one still flying
+at the horizon by how far it strays from the scripted glide path, and a
+crash ranks last, a later crash above an earlier one. The batch steps exactly
+as step_ship does, so a plan that lands is flown to touchdown as predicted.
+
+A rollout is spread over the SEGMENT frames it takes to fly the first segment
+of the current plan, which every candidate shares: each frame steps the batch
+until that frame's budget runs out, checked after every step, and the best
+candidate takes over once the shared segment has been flown. A frame's
+planning time is the budget plus one batch step and the final ranking.
+
+    python autopilot.py --episodes 20
+    python autopilot.py --catch --levels 2 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from lander_sim import (
+    WIDTH, FPS, MAX_LEVEL, MAX_FUEL, BOOSTER_ROTATION_RATE, BOOSTER_ROTATION_FUEL,
+    PHASE_RETURN, PLAYING, WIN, CONTROL_STATES, NO_CONTROLS, Controls,
+    ChunkedTerrain, game_episode, run_episode,
+)
+from catch_sim import (
+    MAST_WIDTH, CATCH_ZONE_WIDTH, CATCH_ZONE_HEIGHT, CATCH_SPEED, CATCH_ANGLE, new_catch, run_catch,
+)
+from vector_sim import LanderBatch, descent_controls, glide_path
+from vector_sim import PLAYING as BATCH_PLAYING, WIN as BATCH_WIN, LOSE as BATCH_LOSE
+
+CANDIDATES = 256
+HORIZON = 120  # Frames flown ahead
+SEGMENT = 4  # Frames a candidate holds one control mask; also the replan interval
+MUTATION_RATE = 0.15  # Share of the best plan's segments each mutant redraws
+FRESH_SHARE = 0.25  # Share of candidates drawn from scratch
+SCRIPTED_SHARE = 0.25  # Share of candidates flown by descent_controls
+SCRIPTED_NOISE = 0.1  # Chance per segment that a scripted row slips on each key
+PLAN_BUDGET_MS = 8.0  # Planning per frame, leaving the rest of a 60 FPS frame to the game
+
+# Control masks a candidate draws from: coast, thrust, rotate with or
+# without thrust, and the emergency boost
+SHIP_ACTIONS = tuple(c.bits for c in (
+    Controls(), Controls(thrust=True), Controls(left=True), Controls(right=True),
+    Controls(thrust=True, left=True), Controls(thrust=True, right=True), Controls(thrust=True, boost=True),
+))
+BOOSTER_ACTIONS = SHIP_ACTIONS[:-1]  # The booster has no emergency boost
+
+# Ranking: lower is better, and every landing beats every flight beats every crash
+LANDED_COST = -1e6
+CRASHED_COST = 1e6
+GLIDE_WEIGHTS = (0.2, 20.0, 2.0)  # Per pixel off the pad, per px/frame off the glide path, per degree
+BELOW_CATCH_WEIGHT = 5.0  # Per pixel a booster hangs below the arms it has to reach
+MAST_CLEARANCE = 3  # Extra width of the modelled mast, for a tilted booster's corners
+
+
+class Autopilot:
+    # Called like any policy: autopilot(state) -> Controls. A new state object
+    # starts a new plan.
+    actions = SHIP_ACTIONS
+
+    def __init__(self, seed=0, candidates=CANDIDATES, horizon=HORIZON, budget_ms=PLAN_BUDGET_MS):
+        self.rng = np.random.default_rng(seed)
+        self.candidates = candidates
+        self.horizon = horizon - horizon % SEGMENT
+        self.budget_ms = budget_ms
+        self.state = None
+        self.plan = np.zeros(self.horizon, dtype=np.uint8)
+        self.cursor = 0  # Frames of the plan already flown
+        self.predicted = PLAYING  # Outcome the current plan leads to
+        self.plan_ms = 0.0  # Time planning took in the last frame
+        # The rollout in progress, started when the plan's cursor was at 0
+        self.batch = self.plans = self.noise = None
+        self.depth = 0  # Frames it has flown so far
+
+    def __call__(self, state):
+        start = time.perf_counter()
+        if state is not self.state:
+            self.state = state
+            self.plan[:] = 0  # Coast through the first segment while the first plan is made
+            self.cursor = 0
+            self.batch = None
+        if self.batch is None:
+            self.begin(state)
+        self.roll(start + self.budget_ms / 1000 if self.budget_ms else float("inf"))
+        bits = int(self.plan[self.cursor])
+        self.cursor += 1
+        if self.cursor == SEGMENT:
+            self.finish()
+        self.plan_ms = (time.perf_counter() - start) * 1000
+        return CONTROL_STATES[bits]
+
+    def vehicle(self, state):
+        return state.ship
+
+    def problem(self, state):
+        # LanderBatch arguments for this state in a frame starting at origin
+        ship, pad = state.ship, state.pad
+        terrain, origin = state.terrain, 0
+        if isinstance(terrain, ChunkedTerrain):
+            heights, _, origin = terrain.window(ship.x - WIDTH / 2, ship.x + WIDTH / 2)
+        elif terrain is not None:
+            heights = terrain.heights
+        return dict(
+            gravity=state.gravity, wind_force=state.wind_force, fuel=ship.fuel,
+            x=ship.x - origin, y=ship.y, vx=ship.vx, vy=ship.vy, angle=ship.angle,
+            width=ship.width, height=ship.height,
+            pad_x=pad.x - origin, pad_y=pad.y, pad_width=pad.width, pad_height=pad.height,
+            ground_y=state.ground_y, terrain=None if terrain is None else np.asarray(heights),
+            wrap=state.wrap,
+        )
+
+    def begin(self, state):
+        # Candidates from the plan about to be flown; its first segment is
+        # flown while they roll out, so all of them share it
+        self.plans = self.mutate(self.plan)
+        self.batch = LanderBatch(self.candidates, **self.problem(state))
+        self.noise = self.rng.random((len(self.scripted_rows()), self.horizon // SEGMENT, 3)) < SCRIPTED_NOISE
+        self.noise[0] = False
+        self.depth = 0
+
+    def roll(self, deadline):
+        # Steps the rollout until it reaches the horizon, every candidate
+        # has finished or the deadline passes
+        batch, plans, scripted = self.batch, self.plans, self.scripted_rows()
+        while self.depth < self.horizon and not batch.all_done():
+            depth = self.depth
+            bits = plans[:, depth]
+            if depth >= SEGMENT:
+                # Scripted rows record what the controller did, noise
+                # included, so the row replays exactly if it wins
+                thrust, left, right, _ = descent_controls(batch)
+                flips = self.noise[:, depth // SEGMENT]
+                bits[scripted] = ((thrust[scripted] ^ flips[:, 0]) | (left[scripted] ^ flips[:, 1]) << 1
+                                  | (right[scripted] ^ flips[:, 2]) << 2)
+            batch.step(bits & 1 > 0, bits & 2 > 0, bits & 4 > 0, bits & 8 > 0)
+            self.settle(batch)
+            self.depth += 1
+            if time.perf_counter() > deadline:
+                break
+
+    def finish(self):
+        # The shared segment has been flown: switch to the rest of the best
+        # candidate, padded with its last mask
+        batch = self.batch
+        best = int(np.argmin(self.rank(batch)))
+        row = self.plans[best, SEGMENT:]
+        self.plan[:len(row)] = row
+        self.plan[len(row):] = row[-1]
+        self.cursor = 0
+        self.predicted = {BATCH_WIN: WIN, BATCH_LOSE: "lose"}.get(int(batch.status[best]), PLAYING)
+        self.batch = None
+
+    def settle(self, batch):
+        # Outcome tests the batch doesn't make itself, after every step
+        pass
+
+    def scripted_rows(self):
+        # Rows flown by the scripted controller; the first one never slips
+        return np.arange(1, 1 + int(self.candidates * SCRIPTED_SHARE))
+
+    def mutate(self, best):
+        # Candidate plans: row 0 is the best plan; then mutants of it and
+        # fresh random rows. None of them changes the first segment. The
+        # scripted rows are filled in as they are flown.
+        n, segments = self.candidates, self.horizon // SEGMENT
+        plans = np.repeat(best[None], n, axis=0)
+        redraw = self.rng.random((n, segments)) < MUTATION_RATE
+        redraw[0] = False
+        redraw[n - int(n * FRESH_SHARE):] = True
+        redraw[:, 0] = False
+        actions = np.array(self.actions, dtype=np.uint8)
+        drawn = actions[self.rng.integers(len(actions), size=(n, segments))]
+        by_segment = plans.reshape(n, segments, SEGMENT)
+        by_segment[redraw] = drawn[redraw][:, None]
+        return plans
+
+    def rank(self, batch):
+        # Cost of every candidate after its rollout; see the module docstring
+        height, target_vx, target_vy = glide_path(batch)
+        per_pixel, per_speed, per_degree = GLIDE_WEIGHTS
+        cost = (per_pixel * np.abs(batch.pad_x - batch.x)
+                + per_speed * (np.abs(batch.vx - target_vx) + np.abs(batch.vy - target_vy))
+                + per_degree * np.abs(batch.angle)
+                - batch.fuel)
+        cost[batch.status == BATCH_WIN] = LANDED_COST - batch.fuel[batch.status == BATCH_WIN]
+        crashed = batch.status == BATCH_LOSE
+        cost[crashed] = CRASHED_COST - batch.frame[crashed]
+        return cost
+
+
+class CatchAutopilot(Autopilot):
+    # Flies the booster's return to the tower in a catch_sim mission. The
+    # catch zone stands in for the pad and the mast for a wall in the ground;
+    # outside the return phase the booster flies itself.
+    actions = BOOSTER_ACTIONS
+
+    def __call__(self, state):
+        if state.phase != PHASE_RETURN:
+            self.state = None
+            return NO_CONTROLS
+        return super().__call__(state)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set by problem() in the batch's frame
+        self.mast_edge = self.mast_top = 0
+        self.catch_x = self.catch_y = 0
+
+    def settle(self, batch):
+        # in_catch_zone for every lander still flying
+        caught = batch.status == BATCH_PLAYING
+        caught &= np.abs(batch.x - self.catch_x) < CATCH_ZONE_WIDTH
+        caught &= np.abs(batch.y - self.catch_y) < CATCH_ZONE_HEIGHT
+        caught &= np.abs(batch.vy) < CATCH_SPEED
+        caught &= np.abs(batch.angle) < CATCH_ANGLE
+        batch.status[caught] = BATCH_WIN
+
+    def rank(self, batch):
+        # The "pad" floats: unlike the ground, it can be flown under, and from
+        # the far side of the mast the way in is over its top
+        cost = super().rank(batch)
+        flying = batch.status == BATCH_PLAYING
+        floor = np.where(batch.x < self.mast_edge, self.mast_top, batch.pad_top)
+        below = batch.y + batch.height / 2 - floor
+        cost[flying] += BELOW_CATCH_WEIGHT * np.maximum(below[flying], 0)
+        return cost
+
+    def vehicle(self, state):
+        return state.booster
+
+    def problem(self, state):
+        booster, tower = state.booster, state.tower
+        heights, _, origin = state.terrain.window(booster.x - WIDTH / 2, booster.x + WIDTH / 2)
+        heights = np.asarray(heights)
+        reach = MAST_WIDTH / 2 + booster.width / 2 + MAST_CLEARANCE
+        left = max(int(np.floor(tower.x - reach - origin)), 0)
+        right = min(int(np.ceil(tower.x + reach - origin)) + 1, len(heights))
+        heights[left:right] = np.minimum(heights[left:right], tower.y - tower.height)
+        self.mast_edge = tower.x + reach - origin
+        self.mast_top = tower.y - tower.height - MAST_CLEARANCE
+        self.catch_x, self.catch_y = tower.catch_x - origin, tower.catch_y(booster)
+        # Bottom touching this "pad" puts the centre on the catch point. It is
+        # half the zone wide: the batch stops a lander at the contact point,
+        # the catch test looks at the end of the frame.
+        pad_top = tower.catch_y(booster) + booster.height / 2
+        return dict(
+            gravity=state.gravity, wind_force=state.wind_force, fuel=booster.fuel,
+            x=booster.x - origin, y=booster.y, vx=booster.vx, vy=booster.vy, angle=booster.angle,
+            width=booster.width, height=booster.height,
+            pad_x=tower.catch_x - origin, pad_y=pad_top, pad_width=CATCH_ZONE_WIDTH / 2 + booster.width, pad_height=0,
+            terrain=heights, velocity_threshold=CATCH_SPEED, angle_threshold=CATCH_ANGLE,
+            rotation_rate=BOOSTER_ROTATION_RATE, rotation_fuel=BOOSTER_ROTATION_FUEL, wrap=False,
+        )
+
+
+def fly(level, seed, world=False, catch=False, **kwargs):
+    # One episode flown by the autopilot: (final state, pilot, planning ms
+    # of every frame it planned in)
+    pilot = (CatchAutopilot if catch else Autopilot)(seed, **kwargs)
+    plan_ms = []
+
+    def policy(state):
+        controls = pilot(state)
+        if pilot.state is state:
+            plan_ms.append(pilot.plan_ms)
+        return controls
+
+    if catch:
+        state = run_catch(new_catch(level, seed), policy)
+    else:
+        state = run_episode(game_episode(level, seed, world), policy, max_frames=120 * FPS)
+    return state, pilot, plan_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fly every level with the rollout autopilot and time its plans.")
+    parser.add_argument("--episodes", type=int, default=20, help="seeds per level")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(1, MAX_LEVEL + 1)))
+    parser.add_argument("--world", action="store_true", help="long-range world missions")
+    parser.add_argument("--catch", action="store_true", help="booster-catch missions")
+    parser.add_argument("--candidates", type=int, default=CANDIDATES)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--budget-ms", type=float, default=PLAN_BUDGET_MS, help="planning time per frame; 0 flies the full horizon every plan")
+    args = parser.parse_args()
+
+    unsolved = 0
+    for level in args.levels:
+        landed, fuel, plan_ms, failed = 0, [], [], []
+        for seed in range(args.episodes):
+            state, pilot, times = fly(level, seed, args.world, args.catch, candidates=args.candidates,
+                                      horizon=args.horizon, budget_ms=args.budget_ms)
+            plan_ms += times
+            if state.status == WIN:
+                landed += 1
+                fuel.append(pilot.vehicle(state).fuel / MAX_FUEL)
+            else:
+                failed.append(seed)
+        unsolved += len(failed)
+        times = np.array(plan_ms)
+        print(f"level {level}: {landed}/{args.episodes} landed, fuel left {np.mean(fuel or [0]):.0%}, "
+              f"planning {times.mean():.2f} ms mean / {np.percentile(times, 99):.2f} ms p99 / "
+              f"{times.max():.2f} ms max per frame" + (f", unsolved seeds {failed}" if failed else ""))
+    if unsolved:
+        raise SystemExit(f"{unsolved} episodes not solved")
+
+if __name__ == "__main__":
+    main()
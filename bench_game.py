@@ -0,0 +1,198 @@
+"""Headless game-loop benchmark suite.
+
+Runs Game under the dummy SDL video and audio drivers through scripted
+scenarios and reports frames per second, per-frame p50/p99 latency, the
+median cost of the simulation step and of drawing, and peak Python heap for
+each, plus the import and time-to-first-frame of a fresh
+start. Results are written as JSON and can be compared with a
+stored baseline; any scenario that regresses past the threshold fails the run.
+
+    python bench_game.py --save-baseline bench_baseline.json
+    python bench_game.py --baseline bench_baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import starship_lander as sl
+from assets import startup_times
+from catch_sim import catch_policy
+from lander_sim import MAX_LEVEL, NO_CONTROLS, Controls, descent_policy
+
+FULL_THRUST = Controls(thrust=True)
+
+
+def idle_descent(game, frame):
+    return NO_CONTROLS
+
+
+def thrust_burn(game, frame):
+    return FULL_THRUST
+
+
+def explosions(game, frame):
+    # A fresh explosion every other frame on top of a normal descent
+    if frame % 2 == 0:
+        game.add_explosion_particles()
+    return descent_policy(game.sim)
+
+
+def scripted_landing(game, frame):
+    return descent_policy(game.sim)
+
+
+def scripted_catch(game, frame):
+    return catch_policy(game.sim)
+
+
+def autopilot(game, frame):
+    # Rollout planning inside the frame, as in a demo
+    if game.autopilot is None:
+        game.autopilot = game.make_autopilot()
+    return game.autopilot(game.sim)
+
+
+# name -> (level, policy, mode); mode is None, "world" or "catch"
+SCENARIOS = {
+    "idle_descent": (1, idle_descent, None),
+    "thrust_burn": (1, thrust_burn, None),
+    "explosions": (1, explosions, None),
+}
+for _level in range(1, MAX_LEVEL + 1):
+    SCENARIOS[f"level_{_level}"] = (_level, scripted_landing, None)
+# Long flight across the chunked world: cost should not grow with distance
+SCENARIOS["world_cruise"] = (1, scripted_landing, "world")
+# Launch, separation and catch with the rigid-body world stepping every frame
+SCENARIOS["booster_catch"] = (1, scripted_catch, "catch")
+# Rollout autopilot planning inside the 16 ms frame
+SCENARIOS["autopilot"] = (MAX_LEVEL, autopilot, None)
+
+
+def run_scenario(level, policy, frames, seed, mode=None):
+    # Returns per-frame simulation and rendering times in ms, one fixed step
+    # per frame; finished episodes restart at the same level
+    game = sl.Game(seed=seed, sound=False, world=mode == "world", catch=mode == "catch")
+    game.level = level
+    game.reset_game()
+    game.game_state = "playing"
+    physics = np.empty(frames)
+    render = np.empty(frames)
+    clock = time.perf_counter
+    for frame in range(frames):
+        if game.game_state != "playing":
+            game.level = level
+            game.reset_game()
+            game.game_state = "playing"
+        start = clock()
+        game.tick(policy(game, frame))
+        stepped = clock()
+        game.draw()
+        game.present()
+        physics[frame] = (stepped - start) * 1000
+        render[frame] = (clock() - stepped) * 1000
+    return physics, render
+
+
+def measure(name, frames, seed):
+    level, policy, mode = SCENARIOS[name]
+    physics, render = run_scenario(level, policy, frames, seed, mode)
+    times = physics + render
+    # Peak heap from a separate, shorter traced pass so tracing doesn't skew timings
+    tracemalloc.start()
+    run_scenario(level, policy, max(frames // 4, 1), seed, mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "frames": frames,
+        "fps": float(frames / (times.sum() / 1000)),
+        "p50_ms": float(np.percentile(times, 50)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "physics_p50_ms": float(np.percentile(physics, 50)),
+        "draw_p50_ms": float(np.percentile(render, 50)),
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Lower fps or higher latency/memory than baseline by more than threshold
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        checks = [
+            ("fps", base["fps"] / result["fps"] - 1),
+            ("p50_ms", result["p50_ms"] / base["p50_ms"] - 1),
+            ("p99_ms", result["p99_ms"] / base["p99_ms"] - 1),
+            ("peak_kib", result["peak_kib"] / base["peak_kib"] - 1),
+        ]
+        for metric, change in checks:
+            if change > threshold:
+                regressions.append(f"{name}.{metric}: {change:+.1%} worse than baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="compare with this results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--save-baseline", metavar="FILE", help="also store these results as a baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':>14} {'fps':>9} {'p50 ms':>8} {'p99 ms':>8} {'sim ms':>8} {'draw ms':>8} {'peak KiB':>9}")
+    for name in args.scenarios:
+        result = results[name] = measure(name, args.frames, args.seed)
+        print(f"{name:>14} {result['fps']:>9.0f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+              f"{result['physics_p50_ms']:>8.3f} {result['draw_p50_ms']:>8.3f} {result['peak_kib']:>9.0f}")
+    pygame.quit()
+    startup = startup_times()
+    print(f"startup: import {startup['import_ms']:.1f} ms, first frame {startup['first_frame_ms']:.1f} ms, "
+          f"all assets {startup['assets_ms']:.1f} ms")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+        "startup": startup,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
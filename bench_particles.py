@@ -0,0 +1,111 @@
+"""Particle blit throughput benchmark.
+
+Compares the legacy per-particle renderer (a fresh SRCALPHA Surface, a circle
+and a blit for every particle) with the sprite atlas + Surface.blits() batch
+used by ParticleSystem.draw, then times a step of particle physics plus the
+draw with particles raining onto the single-screen terrain and pad, most of
+them bouncing or at rest on the ground. Runs under the dummy SDL video
+driver.
+
+    python bench_particles.py --particles 1000 5000 10000 --frames 60
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import starship_lander as sl
+
+
+def draw_legacy(system, screen):
+    # The pre-atlas Particle.draw, one Surface allocation per particle
+    n = system.count
+    for (x, y), lifetime, max_lifetime, style in zip(system.pos[:n].tolist(), system.lifetime[:n].tolist(),
+                                                     system.max_lifetime[:n].tolist(), system.color[:n].tolist()):
+        alpha = int(255 * (lifetime / max_lifetime))
+        color, radius = system.palette[style]
+        particle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(particle_surface, (*color, alpha), (radius, radius), radius)
+        screen.blit(particle_surface, (int(x) - radius, int(y) - radius))
+
+
+def populate(count, seed=0):
+    system = sl.ParticleSystem()
+    rng = np.random.default_rng(seed)
+    colors = [color for color, _ in sl.PARTICLE_STYLES]
+    per_color = count // len(colors)
+    for i, color in enumerate(colors):
+        n = count - per_color * (len(colors) - 1) if i == 0 else per_color
+        system.emit(n, rng.uniform(0, sl.WIDTH, n), rng.uniform(0, sl.HEIGHT, n),
+                    0, 0, color, rng.integers(1, 61, n))
+    return system
+
+
+def rain(count, seed=0):
+    # count long-lived particles falling onto the terrain and pad from a
+    # little above them
+    system = sl.ParticleSystem()
+    system.set_terrain(sl.Terrain(random.Random(seed)), sl.LandingPad(sl.PAD_X, sl.PAD_Y))
+    rng = np.random.default_rng(seed)
+    system.emit(count, rng.uniform(0, sl.WIDTH, count), rng.uniform(sl.HEIGHT - 350, sl.HEIGHT - 200, count),
+                rng.uniform(-2, 2, count), rng.uniform(-1, 3, count), sl.ORANGE, 1_000_000)
+    return system
+
+
+def time_physics(system, screen, frames, settle=200):
+    # Mean update and update + draw per frame, after settle untimed steps for
+    # the rain to land, and the share of particles on the ground at the end
+    for _ in range(settle):
+        system.update()
+    updating = 0.0
+    start = time.perf_counter()
+    for _ in range(frames):
+        step = time.perf_counter()
+        system.update()
+        updating += time.perf_counter() - step
+        screen.fill(sl.BLACK)
+        system.draw(screen)
+    total = (time.perf_counter() - start) / frames
+    heights, rise, origin = system.ground
+    n = system.count
+    grounded = system.pos[:n, 1] >= sl.height_at(heights, rise, 0, system.pos[:n, 0] - origin) - 0.5
+    return updating / frames, total, float(grounded.mean())
+
+
+def time_draw(draw, system, screen, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        screen.fill(sl.BLACK)
+        draw(system, screen)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--particles", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    screen = pygame.display.set_mode((sl.WIDTH, sl.HEIGHT))
+    print(f"{'particles':>10} {'legacy ms':>10} {'atlas ms':>10} {'legacy p/s':>12} {'atlas p/s':>12} {'speedup':>8}")
+    for count in args.particles:
+        system = populate(count)
+        legacy = time_draw(draw_legacy, system, screen, args.frames)
+        atlas = time_draw(sl.ParticleSystem.draw, system, screen, args.frames)
+        print(f"{count:>10} {legacy * 1000:>10.2f} {atlas * 1000:>10.2f} "
+              f"{count / legacy:>12.0f} {count / atlas:>12.0f} {legacy / atlas:>7.1f}x")
+    print(f"{'particles':>10} {'update ms':>10} {'+draw ms':>10} {'grounded':>9}")
+    for count in args.particles:
+        update, total, grounded = time_physics(rain(count), screen, max(args.frames, 90))
+        print(f"{count:>10} {update * 1000:>10.3f} {total * 1000:>10.2f} {grounded:>9.0%}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Monte Carlo difficulty calibration for the level table.
+
+Runs many seeded landing episodes per level with a control policy, fans the
+work out over a process pool and reports success rate, fuel left and
+touchdown speed for every level. Workers receive nothing but a seed and the
+run settings; each one simulates its episodes as one vector_sim batch.
+
+    python calibrate.py --episodes 20000 --policy noisy --jobs 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lander_sim import WIDTH, FPS, MAX_LEVEL, level_params
+from vector_sim import LanderBatch, PLAYING, WIN, LOSE, descent_controls, random_terrain
+
+POLICIES = ("scripted", "noisy", "random")
+LAYOUTS = ("game", "random")
+
+
+def random_controls(batch, rng, held):
+    # Mash keys like a new player: each lander keeps its keys for a while and
+    # picks a new combination about every ten frames
+    change = rng.random(batch.n) < 0.1
+    fresh = rng.random((4, batch.n)) < np.array([0.5, 0.15, 0.15, 0.005])[:, None]
+    held[:, change] = fresh[:, change]
+    return held
+
+
+def run_chunk(level, seed, episodes, policy, layout, max_frames, noise):
+    # Every episode gets its own seeded terrain, as in the game
+    rng = np.random.default_rng(seed)
+    kwargs = {"terrain": random_terrain(rng, episodes)}
+    if layout == "random":
+        kwargs.update(
+            x=rng.uniform(200, WIDTH - 200, episodes),
+            vx=rng.uniform(-1, 1, episodes),
+            pad_x=rng.uniform(150, WIDTH - 150, episodes),
+        )
+    batch = LanderBatch.for_levels(np.full(episodes, level), **kwargs)
+    held = np.zeros((4, episodes), dtype=bool)
+    for _ in range(max_frames):
+        if batch.all_done():
+            break
+        if policy == "random":
+            controls = random_controls(batch, rng, held)
+        else:
+            controls = np.array(descent_controls(batch))
+            if policy == "noisy":
+                # Slips on thrust and rotation; nobody hits the boost by accident
+                controls[:3] ^= rng.random((3, episodes)) < noise
+        batch.step(*controls)
+    return {
+        "status": batch.status,
+        "fuel": batch.fuel,
+        "touchdown_vy": batch.touchdown_vy,
+        "frames": batch.frame,
+    }
+
+
+def chunk_sizes(total, size):
+    sizes = [size] * (total // size)
+    if total % size:
+        sizes.append(total % size)
+    return sizes
+
+
+def summarize(level, results):
+    status = np.concatenate([r["status"] for r in results])
+    fuel = np.maximum(np.concatenate([r["fuel"] for r in results]), 0)
+    touchdown = np.abs(np.concatenate([r["touchdown_vy"] for r in results]))
+    frames = np.concatenate([r["frames"] for r in results])
+    landed = status == WIN
+    touched = ~np.isnan(touchdown)
+    percentiles = lambda values, qs: (
+        {f"p{q}": float(v) for q, v in zip(qs, np.percentile(values, qs))} if len(values) else {})
+    params = level_params(level)
+    return {
+        "level": level,
+        "gravity": params.gravity,
+        "wind_force": params.wind_force,
+        "fuel_fraction": params.fuel_fraction,
+        "episodes": len(status),
+        "success_rate": float(landed.mean()),
+        "crash_rate": float((status == LOSE).mean()),
+        "timeout_rate": float((status == PLAYING).mean()),
+        "fuel_left": percentiles(fuel[landed], (10, 50, 90)),
+        "touchdown_speed": percentiles(touchdown[touched], (50, 90, 99)),
+        "mean_frames": float(frames.mean()),
+    }
+
+
+def format_row(row):
+    fuel = row["fuel_left"]
+    speed = row["touchdown_speed"]
+    fuel_text = "/".join(f"{fuel[k]:.0f}" for k in ("p10", "p50", "p90")) if fuel else "-"
+    speed_text = "/".join(f"{speed[k]:.2f}" for k in ("p50", "p90", "p99")) if speed else "-"
+    return (f"{row['level']:>5} {row['episodes']:>9} {row['success_rate']:>8.1%} {row['crash_rate']:>8.1%} "
+            f"{row['timeout_rate']:>8.1%} {fuel_text:>16} {speed_text:>17}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=10000, help="episodes per level")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(1, MAX_LEVEL + 1)))
+    parser.add_argument("--policy", choices=POLICIES, default="noisy")
+    parser.add_argument("--noise", type=float, default=0.05, help="per-key flip chance for --policy noisy")
+    parser.add_argument("--layout", choices=LAYOUTS, default="random",
+                        help="game: the fixed pad and spawn point; random: seeded start, drift and pad position "
+                             "(terrain is seeded per episode either way)")
+    parser.add_argument("--max-seconds", type=float, default=60, help="episode time limit in game seconds")
+    parser.add_argument("--chunk", type=int, default=2000, help="episodes per worker task")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    max_frames = int(args.max_seconds * FPS)
+    sizes = chunk_sizes(args.episodes, args.chunk)
+    # One independent 32-bit seed per task, all derived from --seed
+    seeds = iter(np.random.SeedSequence(args.seed).generate_state(len(args.levels) * len(sizes)).tolist())
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            level: [pool.submit(run_chunk, level, next(seeds), size, args.policy, args.layout,
+                                max_frames, args.noise)
+                    for size in sizes]
+            for level in args.levels
+        }
+        report = [summarize(level, [f.result() for f in chunks]) for level, chunks in futures.items()]
+    elapsed = time.perf_counter() - start
+
+    total = args.episodes * len(args.levels)
+    print(f"policy={args.policy} layout={args.layout} jobs={args.jobs} seed={args.seed}")
+    print(f"{'level':>5} {'episodes':>9} {'landed':>8} {'crashed':>8} {'timeout':>8} "
+          f"{'fuel p10/50/90':>16} {'|vy| p50/90/99':>17}")
+    for row in report:
+        print(format_row(row))
+    print(f"{total} episodes in {elapsed:.2f}s ({total / elapsed:.0f} episodes/s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "elapsed": elapsed, "levels": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Headless booster-catch mission: launch, separation, booster return and a
+chopstick catch at the tower.
+
+The stack lifts off beside the tower under automatic thrust. At MECO speed
+the upper stage separates and flies on, the booster coasts for a moment and
+then the player flies it back until it hangs still between the open arms,
+which close on it. Booster, upper stage, tower parts and any wreckage are
+bodies in one physics.World that is stepped every frame; a crash turns the
+booster into debris that is left to settle before the run ends.
+
+    python catch_sim.py --episodes 50
+"""
+import argparse
+import math
+import random
+import time
+from dataclasses import dataclass, field
+
+from lander_sim import (
+    FPS, SIM_DT, MAX_FUEL, THRUST_POWER, LANDING_BONUS, FUEL_SCORE, TOWER_HEIGHT, CHOPSTICKS_LENGTH,
+    PHASE_LAUNCH, PHASE_SEPARATION, PHASE_RETURN, PHASE_CATCH, PLAYING, WIN, LOSE,
+    EVENT_THRUST_STOP, EVENT_LANDED, EVENT_CRASHED, EVENT_SEPARATION, EVENT_CAUGHT,
+    Controls, BoosterState, StarshipState, ChunkedTerrain, level_params, step_booster, step_starship,
+)
+from physics import DRIVEN, STATIC, Body, BoxState, World, scatter_debris
+
+# Tower layout
+TOWER_X = 0
+MAST_WIDTH = 10
+ARM_THICKNESS = 3
+ARM_OPEN_ANGLE = -30  # Chopsticks raised while waiting for the booster
+ARM_CLOSE_RATE = 2  # Degrees per frame
+CATCH_OFFSET = MAST_WIDTH / 2 + 15  # Booster centre line, right of the mast
+
+# Catch limits (centre within the zone around the catch point)
+CATCH_ZONE_WIDTH = 15
+CATCH_ZONE_HEIGHT = 10
+CATCH_SPEED = 2
+CATCH_ANGLE = 5
+
+# Flight plan
+MECO_SPEED = 25  # Booster engines cut and the stages separate at this climb rate
+SEPARATION_KICK = 2  # Extra climb rate given to the upper stage
+SEPARATION_FRAMES = 30  # Coast before the player gets the booster
+CATCH_BONUS = 2 * LANDING_BONUS
+
+# Wreckage
+DEBRIS_COUNT = 40
+DEBRIS_SPEED = 6
+WRECK_FRAMES = 2 * FPS  # Debris settles this long before the run ends
+
+
+@dataclass
+class TowerState:
+    x: float
+    y: float  # Ground level at the foot of the mast
+    height: float = TOWER_HEIGHT
+    arm_length: float = CHOPSTICKS_LENGTH
+    arm_angle: float = ARM_OPEN_ANGLE
+    closing: bool = False
+
+    @property
+    def arm_y(self):
+        return self.y - self.height + 5
+
+    @property
+    def catch_x(self):
+        return self.x + CATCH_OFFSET
+
+    def catch_y(self, booster):
+        # Grid fins (a quarter of the way down) rest on the arms
+        return self.arm_y + booster.height / 4
+
+    def arm_box(self, box):
+        # Place the arm's box: pivot on the mast, angle raised while open
+        radians = math.radians(self.arm_angle)
+        half = self.arm_length / 2
+        box.x = self.x + MAST_WIDTH / 2 + math.cos(radians) * half
+        box.y = self.arm_y + math.sin(radians) * half
+        box.angle = self.arm_angle
+
+
+@dataclass
+class CatchState:
+    booster: BoosterState
+    starship: StarshipState
+    tower: TowerState
+    terrain: object
+    world: World
+    rng: random.Random
+    level: int = 1
+    gravity: float = 0
+    wind_force: float = 0
+    status: str = PLAYING
+    score: int = 0
+    frame: int = 0
+    phase_frames: int = 0  # Frames spent in the current phase
+    wreck_frames: int = 0  # Counts down while the wreck settles
+    bodies: dict = field(default_factory=dict)  # tag -> Body
+    debris: list = field(default_factory=list)
+
+    @property
+    def phase(self):
+        return self.booster.phase
+
+    @property
+    def wrecked(self):
+        return "booster" not in self.bodies
+
+
+def apply_catch_level(state, level):
+    params = level_params(level)
+    state.level = level
+    state.gravity = state.world.gravity = params.gravity
+    state.wind_force = state.world.wind_force = params.wind_force
+    state.booster.fuel = MAX_FUEL * params.fuel_fraction
+
+
+def new_catch(level=1, seed=0, booster=None, starship=None, tower=None, terrain=None):
+    # The stack stands on the ground under the arms of a tower at TOWER_X.
+    # Objects passed in are moved into place rather than created, so the game
+    # can use its drawable subclasses.
+    terrain = terrain if terrain is not None else ChunkedTerrain(seed)
+    tower = tower if tower is not None else TowerState(0, 0)
+    tower.x = TOWER_X
+    tower.y = terrain.highest(TOWER_X - MAST_WIDTH, TOWER_X + CATCH_OFFSET + MAST_WIDTH)
+    tower.arm_angle, tower.closing = ARM_OPEN_ANGLE, False
+    booster = booster if booster is not None else BoosterState(0, 0)
+    booster.x, booster.y = tower.catch_x, tower.y - booster.height / 2 - 1
+    booster.phase = PHASE_LAUNCH
+    starship = starship if starship is not None else StarshipState(0, 0)
+    starship.attached = True
+    step_starship(starship, booster, 0, 0, 0)
+
+    world = World(terrain=terrain)
+    mast = BoxState(tower.x, tower.y - tower.height / 2, MAST_WIDTH, tower.height)
+    arm = BoxState(0, 0, tower.arm_length, ARM_THICKNESS)
+    tower.arm_box(arm)
+    state = CatchState(booster, starship, tower, terrain, world, random.Random(seed))
+    state.bodies = {
+        "mast": world.add(Body(mast, STATIC, tag="mast")),
+        "arm": world.add(Body(arm, STATIC, tag="arm")),
+        "booster": world.add(Body(booster, DRIVEN, tag="booster")),
+        "starship": world.add(Body(starship, DRIVEN, tag="starship")),
+    }
+    apply_catch_level(state, level)
+    return state
+
+
+def in_catch_zone(tower, booster):
+    return (abs(booster.x - tower.catch_x) < CATCH_ZONE_WIDTH and
+            abs(booster.y - tower.catch_y(booster)) < CATCH_ZONE_HEIGHT and
+            abs(booster.vy) < CATCH_SPEED and abs(booster.angle) < CATCH_ANGLE)
+
+
+def set_phase(state, phase):
+    state.booster.phase = phase
+    state.phase_frames = 0
+
+
+def wreck_booster(state):
+    # The booster leaves the world and its debris takes its place
+    booster = state.booster
+    state.world.remove(state.bodies.pop("booster"))
+    state.debris = scatter_debris(state.world, state.rng, booster.x, booster.y,
+                                  booster.vx * 0.3, min(booster.vy, 0) * 0.3, DEBRIS_COUNT, DEBRIS_SPEED)
+    state.wreck_frames = WRECK_FRAMES
+    events = [EVENT_CRASHED]
+    if booster.was_thrusting:
+        booster.was_thrusting = booster.thrusting = False
+        events.append(EVENT_THRUST_STOP)
+    return events
+
+
+def step_catch(state, controls, dt=SIM_DT):
+    if state.status != PLAYING:
+        return []
+    booster, starship, tower = state.booster, state.starship, state.tower
+    events = []
+
+    if state.wrecked:
+        # Nothing left to fly: let the debris settle, then end the run
+        state.world.step(dt)
+        state.wreck_frames -= 1
+        if state.wreck_frames <= 0:
+            state.status = LOSE
+        return events
+
+    state.phase_frames += 1
+    if booster.phase == PHASE_LAUNCH and -booster.vy >= MECO_SPEED:
+        set_phase(state, PHASE_SEPARATION)
+        starship.attached = False
+        starship.thrusting = True
+        starship.vy -= SEPARATION_KICK
+        events.append(EVENT_SEPARATION)
+    elif booster.phase == PHASE_SEPARATION and state.phase_frames > SEPARATION_FRAMES:
+        set_phase(state, PHASE_RETURN)
+
+    if booster.phase == PHASE_CATCH:
+        # Held by the arms while they close
+        tower.arm_angle = min(tower.arm_angle + ARM_CLOSE_RATE * dt, 0)
+    else:
+        events.extend(step_booster(booster, controls, state.gravity, state.wind_force, dt))
+    step_starship(starship, booster, state.gravity, state.wind_force, dt)
+    tower.arm_box(state.bodies["arm"].state)
+
+    for contact in state.world.step(dt):
+        other = contact.b if contact.a.tag == "booster" else contact.a
+        if "booster" in (contact.a.tag, contact.b and contact.b.tag) and (other is None or other.tag == "mast"):
+            return events + wreck_booster(state)
+
+    if booster.phase == PHASE_RETURN and in_catch_zone(tower, booster):
+        set_phase(state, PHASE_CATCH)
+        tower.closing = True
+        booster.vx = booster.vy = 0
+        booster.x, booster.y = tower.catch_x, tower.catch_y(booster)
+        if booster.was_thrusting:
+            booster.was_thrusting = booster.thrusting = False
+            events.append(EVENT_THRUST_STOP)
+        events.append(EVENT_CAUGHT)
+    elif booster.phase == PHASE_CATCH and tower.arm_angle >= 0:
+        state.status = WIN
+        state.score += CATCH_BONUS + int(booster.fuel * FUEL_SCORE)
+        events.append(EVENT_LANDED)
+    state.score += 1
+    state.frame += 1
+    return events
+
+
+def catch_policy(state):
+    # Scripted booster return: the descent_policy controller aimed at the
+    # catch point instead of a pad, holding altitude until it is overhead
+    booster, tower = state.booster, state.tower
+    if booster.phase != PHASE_RETURN:
+        return Controls()
+    target_x, target_y = tower.catch_x, tower.catch_y(booster)
+    height = max(0.0, target_y - booster.y)
+    target_vx = max(-3.0, min(3.0, (target_x - booster.x) * 0.05))
+    target_vy = 1.0 + 0.5 * math.sqrt(2 * max(THRUST_POWER - state.gravity, 0.05) * height)
+    if abs(target_x - booster.x) > height / 2 + CATCH_ZONE_WIDTH / 2:
+        target_vy = min(target_vy, 0.5)  # Still too far off: hold altitude
+    need_x = (target_vx - booster.vx) * 0.2 - state.wind_force
+    need_y = min((target_vy - booster.vy) * 0.2 - state.gravity, 0.0)  # Gravity does any slowing of a climb
+    limit = CATCH_ANGLE - 1 if height < 20 else 30.0
+    target_angle = max(-limit, min(limit, math.degrees(math.atan2(need_x, max(-need_y, 0.01)))))
+    along = need_x * math.sin(math.radians(booster.angle)) - need_y * math.cos(math.radians(booster.angle))
+    return Controls(
+        thrust=along > THRUST_POWER * 0.5,
+        left=booster.angle > target_angle + 1,
+        right=booster.angle < target_angle - 1,
+    )
+
+
+def run_catch(state, policy, max_frames=120 * FPS, dt=SIM_DT):
+    while state.status == PLAYING and state.frame < max_frames:
+        step_catch(state, policy(state), dt)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fly booster-catch missions headless with the scripted policy.")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--level", type=int, default=1)
+    args = parser.parse_args()
+
+    frames = caught = 0
+    start = time.perf_counter()
+    for seed in range(args.episodes):
+        state = run_catch(new_catch(args.level, seed), catch_policy)
+        frames += state.frame
+        caught += state.status == WIN
+    elapsed = time.perf_counter() - start
+    print(f"{args.episodes} missions, {caught} caught, {frames} frames in {elapsed:.3f}s "
+          f"({frames / elapsed:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
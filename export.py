@@ -0,0 +1,167 @@
+"""Parallel headless video export of recorded runs.
+
+Each worker process replays the episode from its seed and inputs under the
+dummy SDL video driver, one simulation step per video frame, and renders
+every worker-th CHUNK of frames to its offscreen screen Surface. The other
+chunks are still simulated, without drawing, so particles and every other
+random draw stay exactly as in the recording. Finished frames go through a
+bounded queue per worker, and the parent takes them chunk by chunk, in
+order, into an ffmpeg pipe as raw RGB or into a numbered PNG sequence
+(encoded by the workers, with fast settings that suit the game's flat
+colours). A worker at most QUEUE_FRAMES frames ahead of the
+writer blocks, so memory stays bounded however long the run is.
+
+    python export.py run.slr --episode 0 --out landing.mp4
+    python export.py run.slr --out frames --start 300 --stop 900 --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import time
+import zlib
+
+import numpy as np
+
+from lander_sim import FPS, HEIGHT, PLAYING, WIDTH
+from replay import read_recording
+
+CHUNK = 8  # Consecutive frames a worker renders before skipping ahead
+QUEUE_FRAMES = 16  # Frames each worker may have waiting for the writer
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".webm", ".avi")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_LEVEL = 1  # zlib level; a quarter of libpng's time, for slightly bigger files
+
+
+def frame_chunks(start, stop, worker, workers, chunk=CHUNK):
+    # The frames in start..stop that a worker renders
+    return [frame for frame in range(start, stop) if (frame - start) // chunk % workers == worker]
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(rgb, size, level=PNG_LEVEL):
+    # 8-bit RGB PNG with no row filters
+    width, height = size
+    scanlines = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+    scanlines[:, 1:] = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+    return b"".join([
+        PNG_SIGNATURE,
+        png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), level)),
+        png_chunk(b"IEND", b""),
+    ])
+
+
+def render_worker(path, index, start, stop, worker, workers, png, frames):
+    # Replays episode index of the recording at path and puts the encoded
+    # frames this worker owns on the frames queue, in order
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    import pygame
+    from starship_lander import Game
+
+    episode = read_recording(path)[index]
+    game = Game(sound=False)
+    game.level, game.world, game.catch = episode.level, episode.world, episode.catch
+    game.reset_game(episode.seed)
+    game.game_state = PLAYING
+    owned = set(frame_chunks(start, stop, worker, workers))
+    drew = False
+    for frame, controls in enumerate(episode.controls()[:stop]):
+        game.tick(controls)
+        if frame not in owned:
+            drew = False
+            continue
+        if not drew:
+            game.full_redraw = True  # The screen still holds this worker's last chunk
+        game.draw()
+        drew = True
+        rgb = pygame.image.tobytes(game.screen, "RGB")
+        frames.put(encode_png(rgb, game.screen.get_size()) if png else rgb)
+
+
+def ffmpeg_writer(path, size, fps):
+    command = [shutil.which("ffmpeg"), "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+               "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p", path]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+def export(path, out, index=0, start=0, stop=None, workers=None, fps=FPS):
+    # Returns (frames written, seconds taken, where they went)
+    episode = read_recording(path)[index]
+    stop = len(episode.frames) if stop is None else min(stop, len(episode.frames))
+    start = max(0, min(start, stop))
+    workers = max(1, min(workers or multiprocessing.cpu_count(), -(-(stop - start) // CHUNK)))
+    video = out.lower().endswith(VIDEO_EXTENSIONS)
+    if video and not shutil.which("ffmpeg"):
+        out = os.path.splitext(out)[0]
+        print(f"ffmpeg not found; writing a PNG sequence to {out}/ instead")
+        video = False
+    if not video:
+        os.makedirs(out, exist_ok=True)
+
+    started = time.perf_counter()
+    queues = [multiprocessing.Queue(QUEUE_FRAMES) for _ in range(workers)]
+    processes = [multiprocessing.Process(target=render_worker, daemon=True,
+                                         args=(path, index, start, stop, worker, workers, not video, frames))
+                 for worker, frames in enumerate(queues)]
+    for process in processes:
+        process.start()
+    writer = ffmpeg_writer(out, (WIDTH, HEIGHT), fps) if video else None
+    written = 0
+    try:
+        for frame in range(start, stop):
+            worker = (frame - start) // CHUNK % workers
+            data = next_frame(queues[worker], processes[worker])
+            if writer:
+                writer.stdin.write(data)
+            else:
+                with open(os.path.join(out, f"frame_{written:06d}.png"), "wb") as f:
+                    f.write(data)
+            written += 1
+    finally:
+        if writer:
+            writer.stdin.close()
+            writer.wait()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+    return written, time.perf_counter() - started, out
+
+
+def next_frame(frames, process):
+    # The worker's next frame; raises if it died before sending it
+    while True:
+        try:
+            return frames.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"{process.name} exited with code {process.exitcode} before its frames were done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded episode to video or PNGs, in parallel, headless.")
+    parser.add_argument("recording")
+    parser.add_argument("--episode", type=int, default=0, help="index of the episode in the recording")
+    parser.add_argument("--out", default="export.mp4", help="video file (needs ffmpeg) or directory for PNGs")
+    parser.add_argument("--start", type=int, default=0, help="first frame to export")
+    parser.add_argument("--stop", type=int, help="frame to stop before; default the end of the episode")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--fps", type=int, default=FPS, help="frame rate of the video")
+    args = parser.parse_args()
+
+    frames, elapsed, out = export(args.recording, args.out, args.episode, args.start, args.stop, args.workers,
+                                  args.fps)
+    print(f"{frames} frames to {out} in {elapsed:.2f}s: {frames / max(elapsed, 1e-9):.0f} frames/s, "
+          f"{frames / FPS / max(elapsed, 1e-9):.1f}x real time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Gym-style training environments on the game's own rules.
+
+LanderEnv wraps one lander_sim episode. reset() and step() follow the
+Gymnasium API, with step returning (obs, reward, terminated, truncated,
+info). The reward is the change in the score Game.update shows, and an
+episode ends exactly where the game's does. VectorLanderEnv steps n landers
+as one vector_sim batch and restarts finished ones within the same call;
+ProcessVectorEnv splits such a batch across worker processes. Vector
+observations, rewards and end flags live in preallocated arrays (shared
+memory for the worker version) that step() fills in place, so nothing is
+pickled per step.
+
+Actions are the 4-bit control masks of input recordings: thrust, left,
+right, boost.
+
+    python lander_env.py --envs 8192 --steps 500 --workers 4
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from lander_sim import FPS, MAX_LEVEL, PLAYING, CONTROL_STATES, game_episode, step
+from vector_sim import LanderBatch, random_terrain
+from vector_sim import PLAYING as BATCH_PLAYING
+
+OBSERVATION = ("x", "y", "vx", "vy", "angle", "fuel", "pad_dx", "pad_dy", "wind")
+OBS_SIZE = len(OBSERVATION)
+ACTIONS = len(CONTROL_STATES)
+MAX_STEPS = 60 * FPS  # Episodes that neither land nor crash are truncated here
+
+
+def observe(state, out=None):
+    # OBSERVATION for one SimState; pad_dy is the height of the ship's
+    # bottom above the pad
+    ship, pad = state.ship, state.pad
+    out = np.empty(OBS_SIZE, dtype=np.float32) if out is None else out
+    out[:] = (ship.x, ship.y, ship.vx, ship.vy, ship.angle, ship.fuel,
+              pad.x - ship.x, pad.y - pad.height - (ship.y + ship.height/2), state.wind_force)
+    return out
+
+
+def observe_batch(batch, out, index=slice(None)):
+    # OBSERVATION for the given landers of a batch, written into out[index]
+    out[index, 0] = batch.x[index]
+    out[index, 1] = batch.y[index]
+    out[index, 2] = batch.vx[index]
+    out[index, 3] = batch.vy[index]
+    out[index, 4] = batch.angle[index]
+    out[index, 5] = batch.fuel[index]
+    out[index, 6] = batch.pad_x[index] - batch.x[index]
+    out[index, 7] = batch.pad_top[index] - (batch.y[index] + batch.height[index] / 2)
+    out[index, 8] = batch.wind_force[index]
+
+
+class LanderEnv:
+    # One episode at a time of the single-screen game, terrain seeded per
+    # episode as Game.reset_game does it
+    def __init__(self, level=1, seed=None, max_steps=MAX_STEPS):
+        self.level = level
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.state = None
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        episode_seed = self.rng.getrandbits(32)
+        self.state = game_episode(self.level, episode_seed)
+        return observe(self.state), {"seed": episode_seed}
+
+    def step(self, action):
+        state = self.state
+        score = state.score
+        step(state, CONTROL_STATES[int(action)])
+        terminated = state.status != PLAYING
+        truncated = not terminated and state.frame >= self.max_steps
+        return observe(state), float(state.score - score), terminated, truncated, {"status": state.status}
+
+
+class StepBuffers:
+    # Arrays a vector step reads and writes: actions in; observations, the
+    # last observation of each episode that just ended, rewards and end
+    # flags out. Shared buffers live in one shared-memory block that worker
+    # processes attach to by name.
+    FIELDS = (
+        ("actions", np.uint8, ()),
+        ("obs", np.float32, (OBS_SIZE,)),
+        ("final_obs", np.float32, (OBS_SIZE,)),
+        ("rewards", np.float32, ()),
+        ("terminated", np.bool_, ()),
+        ("truncated", np.bool_, ()),
+    )
+
+    def __init__(self, n, shared=False, name=None):
+        self.n = n
+        self.shm = None
+        self.owner = False
+        if not shared and name is None:
+            for field, dtype, shape in self.FIELDS:
+                setattr(self, field, np.zeros((n,) + shape, dtype=dtype))
+            return
+        layout, size = [], 0
+        for field, dtype, shape in self.FIELDS:
+            size = -(-size // 8) * 8  # Keep every array 8-byte aligned
+            layout.append((field, dtype, shape, size))
+            size += n * math.prod(shape) * np.dtype(dtype).itemsize
+        self.owner = name is None
+        self.shm = SharedMemory(name=name, create=self.owner, size=max(size, 1))
+        for field, dtype, shape, offset in layout:
+            setattr(self, field, np.ndarray((n,) + shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+
+    @property
+    def name(self):
+        return self.shm.name if self.shm else None
+
+    def view(self, start, stop):
+        # The same buffers limited to envs start..stop, sharing memory
+        part = object.__new__(StepBuffers)
+        part.n, part.shm, part.owner = stop - start, None, False
+        for field, _, _ in self.FIELDS:
+            setattr(part, field, getattr(self, field)[start:stop])
+        return part
+
+    def close(self):
+        if self.shm is None:
+            return
+        for field, _, _ in self.FIELDS:
+            setattr(self, field, None)  # Views must go before the block can close
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+
+class VectorLanderEnv:
+    # n landers on their own random terrains in one LanderBatch. step()
+    # restarts every lander whose episode ended and leaves that episode's last
+    # observation in buffers.final_obs, so obs is always a live episode.
+    def __init__(self, n, levels=1, seed=0, max_steps=MAX_STEPS, buffers=None):
+        self.n = n
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.buffers = buffers if buffers is not None else StepBuffers(n)
+        levels = np.broadcast_to(np.clip(levels, 1, MAX_LEVEL), (n,))
+        self.batch = LanderBatch.for_levels(levels, terrain=random_terrain(self.rng, n))
+        self.start_fuel = self.batch.fuel.copy()
+        self._score = np.zeros(n, dtype=np.int64)  # Scores before the step
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        everyone = np.arange(self.n)
+        self.batch.restart(everyone, terrain=random_terrain(self.rng, self.n), fuel=self.start_fuel)
+        observe_batch(self.batch, self.buffers.obs)
+        return self.buffers.obs
+
+    def step(self, actions=None):
+        # actions: one control mask per env; by default read from the buffers
+        b, batch = self.buffers, self.batch
+        if actions is not None:
+            np.copyto(b.actions, actions)
+        np.copyto(self._score, batch.score)
+        a = b.actions
+        batch.step(a & 1 > 0, a & 2 > 0, a & 4 > 0, a & 8 > 0)
+        np.subtract(batch.score, self._score, out=b.rewards, casting="unsafe")
+        np.not_equal(batch.status, BATCH_PLAYING, out=b.terminated)
+        np.greater_equal(batch.frame, self.max_steps, out=b.truncated)
+        b.truncated &= ~b.terminated
+        observe_batch(batch, b.obs)
+        ended = np.flatnonzero(b.terminated | b.truncated)
+        if len(ended):
+            b.final_obs[ended] = b.obs[ended]
+            batch.restart(ended, terrain=random_terrain(self.rng, len(ended)), fuel=self.start_fuel[ended])
+            observe_batch(batch, b.obs, ended)
+        return b.obs, b.rewards, b.terminated, b.truncated
+
+    def close(self):
+        pass
+
+
+def _worker(pipe, name, n, start, stop, levels, seed, max_steps):
+    # Steps envs start..stop of a ProcessVectorEnv in its shared buffers;
+    # commands and replies are single bytes
+    buffers = StepBuffers(n, name=name)
+    env = VectorLanderEnv(stop - start, levels, seed, max_steps, buffers.view(start, stop))
+    try:
+        while True:
+            command = pipe.recv_bytes()
+            if command == b"s":
+                env.step()
+            elif command == b"r":
+                env.reset()
+            else:
+                break
+            pipe.send_bytes(b"")
+    finally:
+        env = None
+        buffers.close()
+
+
+class ProcessVectorEnv:
+    # VectorLanderEnv split across worker processes, each stepping its own
+    # slice of one set of shared buffers
+    def __init__(self, n, workers=None, levels=1, seed=0, max_steps=MAX_STEPS):
+        workers = max(1, min(workers or multiprocessing.cpu_count(), n))
+        self.n = n
+        self.buffers = StepBuffers(n, shared=True)
+        levels = np.broadcast_to(levels, (n,))
+        bounds = np.linspace(0, n, workers + 1).astype(int).tolist()
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        self.pipes, self.processes = [], []
+        for (start, stop), worker_seed in zip(zip(bounds, bounds[1:]), seeds):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child, self.buffers.name, n, start, stop, levels[start:stop].copy(), worker_seed, max_steps))
+            process.start()
+            child.close()
+            self.pipes.append(parent)
+            self.processes.append(process)
+
+    def _call(self, command):
+        for pipe in self.pipes:
+            pipe.send_bytes(command)
+        for pipe in self.pipes:
+            pipe.recv_bytes()
+
+    def reset(self):
+        self._call(b"r")
+        return self.buffers.obs
+
+    def step(self, actions=None):
+        b = self.buffers
+        if actions is not None:
+            np.copyto(b.actions, actions)
+        self._call(b"s")
+        return b.obs, b.rewards, b.terminated, b.truncated
+
+    def close(self):
+        for pipe in self.pipes:
+            pipe.send_bytes(b"q")
+        for process in self.processes:
+            process.join()
+        self.pipes, self.processes = [], []
+        self.buffers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def throughput(env, steps, seed=0):
+    # Env steps per second under random actions, drawn ahead of time
+    actions = np.random.default_rng(seed).integers(0, ACTIONS, (64, env.n), dtype=np.uint8)
+    env.reset()
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t % len(actions)])
+    return env.n * steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the vectorized environments under random actions.")
+    parser.add_argument("--envs", type=int, default=8192)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--level", type=int, default=1)
+    args = parser.parse_args()
+
+    env = LanderEnv(args.level, seed=0)
+    env.reset()
+    rng = random.Random(0)
+    steps, start = 0, time.perf_counter()
+    while time.perf_counter() - start < 1.0:
+        _, _, terminated, truncated, _ = env.step(rng.randrange(ACTIONS))
+        steps += 1
+        if terminated or truncated:
+            env.reset()
+    print(f"single env: {steps / (time.perf_counter() - start):,.0f} steps/s")
+    rate = throughput(VectorLanderEnv(args.envs, args.level), args.steps)
+    print(f"in-process, {args.envs} envs: {rate:,.0f} steps/s")
+    if args.workers > 1:
+        with ProcessVectorEnv(args.envs, args.workers, args.level) as env:
+            rate = throughput(env, args.steps)
+        print(f"{args.workers} workers, {args.envs} envs: {rate:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
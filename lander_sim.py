@@ -0,0 +1,689 @@
+"""Headless simulation core for Starship Lander.
+
+Plain state dataclasses and step functions with no pygame dependency. The game
+wraps these for input, sound and drawing; tools and tests drive them directly,
+as fast as the CPU allows.
+
+    python lander_sim.py --episodes 200
+"""
+import argparse
+import functools
+import math
+import random
+import time
+from collections import OrderedDict
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+# World
+WIDTH, HEIGHT = 1200, 800
+FPS = 60
+GROUND_Y = HEIGHT - 100
+
+# Physics (per-frame amounts at FPS; step() scales them by dt in frames)
+SIM_DT = 1.0
+GRAVITY = 0.2  # Reduced for space-like feel
+THRUST_POWER = 0.8
+SIDE_THRUST = 0.3
+EMERGENCY_BOOST = 3.0
+MAX_FUEL = 2000
+LANDING_VELOCITY_THRESHOLD = 3
+LANDING_ANGLE_THRESHOLD = 10  # degrees
+
+# Ship handling
+SHIP_ROTATION_RATE = 2
+SHIP_ROTATION_FUEL = 0.5
+BOOST_FUEL = 50
+
+# SpaceX Starship dimensions (scaled for game)
+BOOSTER_HEIGHT = 70
+BOOSTER_WIDTH = 9
+STARSHIP_HEIGHT = 50
+STARSHIP_WIDTH = 9
+FULL_STACK_HEIGHT = BOOSTER_HEIGHT + STARSHIP_HEIGHT
+TOWER_HEIGHT = 143
+CHOPSTICKS_LENGTH = 25
+
+# Booster handling
+BOOSTER_LAUNCH_THRUST = THRUST_POWER * 2
+BOOSTER_LAUNCH_FUEL = 2
+BOOSTER_ROTATION_RATE = 1.5
+BOOSTER_ROTATION_FUEL = 0.3
+STARSHIP_THRUST = THRUST_POWER  # Upper stage burns straight up once free
+
+# Game phases
+PHASE_LAUNCH = "launch"
+PHASE_SEPARATION = "separation"
+PHASE_RETURN = "return"
+PHASE_CATCH = "catch"
+PHASES = (PHASE_LAUNCH, PHASE_SEPARATION, PHASE_RETURN, PHASE_CATCH)
+
+# Episode status (matches Game.game_state)
+PLAYING = "playing"
+WIN = "win"
+LOSE = "lose"
+# Indexed by snapshots and telemetry files; append only
+STATUSES = ("menu", PLAYING, WIN, LOSE)
+MODES = ("screen", "world", "catch")  # Game.mode
+
+# Events returned by the step functions, for sound and effect hooks
+EVENT_THRUST_START = "thrust_start"
+EVENT_THRUST_STOP = "thrust_stop"
+EVENT_LANDED = "landed"
+EVENT_CRASHED = "crashed"
+EVENT_SEPARATION = "separation"
+EVENT_CAUGHT = "caught"
+
+# Terrain
+TERRAIN_STEP = 50
+TERRAIN_ROUGHNESS = 20
+
+# Scrolling world (missions over chunked terrain many screens wide)
+CHUNK_WIDTH = 400  # a whole number of TERRAIN_STEPs
+CHUNK_MARGIN = 2  # chunks kept either side of the retained range
+CHUNK_CACHE = 32  # most chunks held at once, however they were requested
+MISSION_START_Y = -3 * HEIGHT  # missions begin three screens above the top
+MISSION_DISTANCE = (3 * WIDTH, 6 * WIDTH)  # how far away the pad may be
+
+# Landing pad
+PAD_X, PAD_Y = WIDTH // 2, HEIGHT - 120
+PAD_WIDTH, PAD_HEIGHT = 100, 10
+LANDING_BONUS = 1000
+FUEL_SCORE = 0.1
+
+
+@dataclass(frozen=True)
+class Controls:
+    thrust: bool = False
+    left: bool = False
+    right: bool = False
+    boost: bool = False
+
+    @property
+    def bits(self):
+        # Packed form used by input recordings
+        return int(self.thrust) | int(self.left) << 1 | int(self.right) << 2 | int(self.boost) << 3
+
+    @classmethod
+    def from_bits(cls, bits):
+        return cls(bool(bits & 1), bool(bits & 2), bool(bits & 4), bool(bits & 8))
+
+
+NO_CONTROLS = Controls()
+CONTROL_STATES = tuple(Controls.from_bits(bits) for bits in range(16))
+
+
+@dataclass
+class LevelParams:
+    gravity: float
+    wind_force: float
+    fuel_fraction: float
+
+
+# Difficulty by level; anything past the table uses the last entry
+LEVELS = {
+    1: LevelParams(GRAVITY, 0, 1.0),
+    2: LevelParams(GRAVITY * 1.2, 0.05, 0.8),
+    3: LevelParams(GRAVITY * 1.5, 0.1, 0.6),
+    4: LevelParams(GRAVITY * 2.0, 0.15, 0.4),
+}
+MAX_LEVEL = max(LEVELS)
+
+
+def level_params(level):
+    return LEVELS.get(level, LEVELS[MAX_LEVEL])
+
+
+@dataclass
+class ShipState:
+    x: float
+    y: float
+    vx: float = 0
+    vy: float = 2  # Initial downward velocity
+    angle: float = 0  # Rotation angle in degrees
+    fuel: float = MAX_FUEL
+    thrusting: bool = False
+    left_thrust: bool = False
+    right_thrust: bool = False
+    emergency_boost: bool = False
+    was_thrusting: bool = False  # Track previous thrust state
+    width: float = 20
+    height: float = 40
+
+
+@dataclass
+class BoosterState:
+    x: float
+    y: float
+    vx: float = 0
+    vy: float = 0
+    angle: float = 0
+    fuel: float = MAX_FUEL
+    thrusting: bool = False
+    left_thrust: bool = False
+    right_thrust: bool = False
+    was_thrusting: bool = False
+    width: float = BOOSTER_WIDTH
+    height: float = BOOSTER_HEIGHT
+    engine_count: int = 33
+    mass: float = 200000  # kg (empty booster mass)
+    phase: str = PHASE_LAUNCH
+
+
+@dataclass
+class StarshipState:
+    x: float
+    y: float
+    vx: float = 0
+    vy: float = 0
+    angle: float = 0
+    thrusting: bool = False
+    width: float = STARSHIP_WIDTH
+    height: float = STARSHIP_HEIGHT
+    attached: bool = True
+
+
+@dataclass
+class PadState:
+    x: float
+    y: float
+    width: float = PAD_WIDTH
+    height: float = PAD_HEIGHT
+
+
+class Heightfield:
+    # Ground height for every whole column 0..WIDTH, linear in between, so a
+    # height or slope lookup is one index and one multiply-add. Off the edges
+    # the ground continues flat at the edge height.
+    def __init__(self, heights):
+        self.heights = array("d", heights)
+        self.rise = array("d", (b - a for a, b in zip(self.heights, self.heights[1:])))
+        self.top = min(self.heights)
+
+    @classmethod
+    def from_points(cls, points):
+        return cls(terrain_heights(points))
+
+    @classmethod
+    def flat(cls, y):
+        return cls([y] * (WIDTH + 1))
+
+    def column(self, x):
+        # Column index and offset into it, with x clamped to the field
+        x = min(max(x, 0.0), float(WIDTH))
+        i = min(int(x), WIDTH - 1)
+        return i, x - i
+
+    def height_at(self, x):
+        i, f = self.column(x)
+        return self.heights[i] + self.rise[i] * f
+
+    def slope_at(self, x):
+        # dy/dx of the ground; positive where it falls away to the right
+        return self.rise[self.column(x)[0]]
+
+    def sweep(self, x0, y0, x1, y1):
+        # First point where the segment from (x0, y0) to (x1, y1) meets the
+        # ground, as (t, x, y) with t in [0, 1], or None if it stays above.
+        # The gap y - ground is linear between column boundaries, so each
+        # piece the segment crosses is solved exactly.
+        if max(y0, y1) < self.top:
+            return None
+        gap0 = y0 - self.height_at(x0)
+        if gap0 >= 0:
+            return 0.0, x0, y0
+        dx, dy = x1 - x0, y1 - y0
+        t0 = 0.0
+        for c in self.boundaries(x0, x1):
+            t = (c - x0) / dx
+            gap = (y0 + dy * t) - self.column_height(c)
+            if gap >= 0:
+                return sweep_contact(x0, y0, dx, dy, t0, gap0, t, gap)
+            t0, gap0 = t, gap
+        gap = y1 - self.height_at(x1)
+        if gap >= 0:
+            return sweep_contact(x0, y0, dx, dy, t0, gap0, 1.0, gap)
+        return None
+
+    def boundaries(self, x0, x1):
+        return column_boundaries(x0, x1, 0, WIDTH)
+
+    def column_height(self, c):
+        return self.heights[c]
+
+
+class ChunkedTerrain(Heightfield):
+    # Endless ground in CHUNK_WIDTH-wide chunks of per-column heights. Every
+    # chunk's outline comes from its own generator seeded by (seed, index), so
+    # chunks are built only when something looks at them and come out the same
+    # if they are evicted and built again.
+    def __init__(self, seed, roughness=TERRAIN_ROUGHNESS):
+        self.seed = seed
+        self.roughness = roughness
+        self.chunks = OrderedDict()  # index -> (heights, rise)
+        self.top = GROUND_Y - roughness  # Highest the ground can ever be
+
+    def vertices(self, index):
+        # Outline heights at TERRAIN_STEP spacing from the chunk's left edge
+        rng = random.Random(f"{self.seed}:{index}")
+        r = self.roughness
+        return [GROUND_Y + rng.randint(-r, r) for _ in range(CHUNK_WIDTH // TERRAIN_STEP)]
+
+    def chunk(self, index):
+        chunk = self.chunks.get(index)
+        if chunk is not None:
+            self.chunks.move_to_end(index)
+            return chunk
+        ys = self.vertices(index) + self.vertices(index + 1)[:1]
+        points = [(i * TERRAIN_STEP, y) for i, y in enumerate(ys)]
+        heights = array("d", terrain_heights(points, CHUNK_WIDTH))
+        rise = array("d", (b - a for a, b in zip(heights, heights[1:])))
+        chunk = self.chunks[index] = (heights, rise)
+        if len(self.chunks) > CHUNK_CACHE:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def retain(self, x_min, x_max):
+        # Evict every chunk more than CHUNK_MARGIN chunks outside [x_min, x_max]
+        low = math.floor(x_min) // CHUNK_WIDTH - CHUNK_MARGIN
+        high = math.floor(x_max) // CHUNK_WIDTH + CHUNK_MARGIN
+        for index in [i for i in self.chunks if not low <= i <= high]:
+            del self.chunks[index]
+
+    def window(self, x_min, x_max):
+        # Heights and rises of the columns covering [x_min, x_max] as flat
+        # arrays, plus the world x of their first column
+        first = math.floor(x_min) // CHUNK_WIDTH
+        last = math.floor(x_max) // CHUNK_WIDTH
+        heights, rise = array("d"), array("d")
+        for index in range(first, last + 1):
+            chunk_heights, chunk_rise = self.chunk(index)
+            heights.extend(chunk_heights[:-1])
+            rise.extend(chunk_rise)
+        heights.append(self.chunk(last)[0][-1])
+        return heights, rise, first * CHUNK_WIDTH
+
+    def column(self, x):
+        c = math.floor(x)
+        index, i = divmod(c, CHUNK_WIDTH)
+        return self.chunk(index), i, x - c
+
+    def height_at(self, x):
+        (heights, rise), i, f = self.column(x)
+        return heights[i] + rise[i] * f
+
+    def slope_at(self, x):
+        (_, rise), i, _ = self.column(x)
+        return rise[i]
+
+    def highest(self, x_min, x_max):
+        # Smallest ground y over the columns from x_min to x_max
+        return min(self.column_height(c) for c in range(math.floor(x_min), math.ceil(x_max) + 1))
+
+    def boundaries(self, x0, x1):
+        return column_boundaries(x0, x1)
+
+    def column_height(self, c):
+        index, i = divmod(c, CHUNK_WIDTH)
+        return self.chunk(index)[0][i]
+
+
+def terrain_heights(points, width=WIDTH):
+    # Per-column heights along a ground outline; points run left to right from
+    # x = 0 and anything after the last x (the polygon's closing corners) is
+    # ignored
+    heights = []
+    end_y = points[0][1]
+    for (xa, ya), (xb, yb) in zip(points, points[1:]):
+        if xb <= xa:
+            break
+        for x in range(max(xa, len(heights)), min(xb, width + 1)):
+            heights.append(ya + (yb - ya) * ((x - xa) / (xb - xa)))
+        end_y = yb
+    heights.extend([end_y] * (width + 1 - len(heights)))
+    return heights
+
+
+def column_boundaries(x0, x1, first=None, last=None):
+    # Whole columns crossed going from x0 to x1, in order of travel, limited
+    # to [first, last] when those are given
+    if x1 > x0:
+        start, stop = math.floor(x0) + 1, math.ceil(x1)
+        if first is not None:
+            start, stop = max(start, first), min(stop, last + 1)
+        return range(start, stop)
+    if x1 < x0:
+        start, stop = math.ceil(x0) - 1, math.floor(x1)
+        if first is not None:
+            start, stop = min(start, last), max(stop, first - 1)
+        return range(start, stop, -1)
+    return range(0)
+
+
+def sweep_contact(x0, y0, dx, dy, t0, gap0, t1, gap1):
+    # The gap goes from below zero at t0 to zero or above at t1
+    t = t0 + (t1 - t0) * (gap0 / (gap0 - gap1))
+    return t, x0 + dx * t, y0 + dy * t
+
+
+@functools.lru_cache(maxsize=None)
+def flat_ground(y):
+    return Heightfield.flat(y)
+
+
+@dataclass
+class SimState:
+    ship: ShipState
+    pad: PadState
+    level: int = 1
+    gravity: float = GRAVITY
+    wind_force: float = 0
+    ground_y: float = GROUND_Y  # Flat ground used when there is no terrain
+    terrain: Optional[Heightfield] = None
+    wrap: bool = True  # Ships leaving one screen edge come back at the other
+    status: str = PLAYING
+    score: int = 0
+    frame: int = 0
+
+
+def apply_level(state, level):
+    params = level_params(level)
+    state.level = level
+    state.gravity = params.gravity
+    state.wind_force = params.wind_force
+    state.ship.fuel = MAX_FUEL * params.fuel_fraction
+
+
+def new_episode(level=1, ship=None, pad=None, terrain=None):
+    state = SimState(
+        ship=ship if ship is not None else ShipState(WIDTH // 2, 50),
+        pad=pad if pad is not None else PadState(PAD_X, PAD_Y),
+        terrain=terrain,
+    )
+    apply_level(state, level)
+    return state
+
+
+def new_mission(level=1, seed=0, ship=None, pad=None, terrain=None):
+    # Long-range descent over chunked terrain: the ship starts high above
+    # x = 0 and the pad sits on the ground several screens to one side. ship
+    # and pad, if given, are moved into place rather than created; terrain
+    # defaults to a ChunkedTerrain with the same seed.
+    rng = random.Random(seed)
+    terrain = terrain if terrain is not None else ChunkedTerrain(seed)
+    pad_x = rng.uniform(*MISSION_DISTANCE) * rng.choice((-1, 1))
+    ship = ship if ship is not None else ShipState(0, 0)
+    pad = pad if pad is not None else PadState(0, 0)
+    ship.x, ship.y = 0, MISSION_START_Y
+    pad.x, pad.y = pad_x, terrain.highest(pad_x - pad.width/2, pad_x + pad.width/2)
+    state = new_episode(level, ship, pad, terrain)
+    state.wrap = False
+    return state
+
+
+def game_episode(level=1, seed=0, world=False):
+    # The episode Game.reset_game builds for this seed, without pygame
+    if world:
+        return new_mission(level, seed)
+    return new_episode(level, terrain=Heightfield.from_points(generate_terrain(random.Random(seed))))
+
+
+def generate_terrain(rng):
+    # Ground outline as a closed polygon; rng is a random.Random (or the module)
+    points = []
+    for x in range(0, WIDTH + TERRAIN_STEP, TERRAIN_STEP):
+        y = GROUND_Y + rng.randint(-TERRAIN_ROUGHNESS, TERRAIN_ROUGHNESS)
+        points.append((x, y))
+    points.append((WIDTH, HEIGHT))
+    points.append((0, HEIGHT))
+    return points
+
+
+def thrust_events(vehicle, thrusting):
+    # Edge-triggered thrust events so callers can start/stop a looping sound
+    events = []
+    if thrusting and not vehicle.was_thrusting:
+        events.append(EVENT_THRUST_START)
+    elif vehicle.was_thrusting and not thrusting:
+        events.append(EVENT_THRUST_STOP)
+    vehicle.was_thrusting = thrusting
+    return events
+
+
+def step_ship(ship, controls, gravity, wind_force, dt=SIM_DT, wrap=True):
+    ship.thrusting = controls.thrust
+    ship.left_thrust = controls.left
+    ship.right_thrust = controls.right
+    ship.emergency_boost = controls.boost
+
+    # Apply gravity
+    ship.vy += gravity * dt
+
+    # Apply wind
+    ship.vx += wind_force * dt
+
+    # Apply thrust
+    burning = ship.thrusting and ship.fuel > 0
+    if burning:
+        ship.vx += math.sin(math.radians(ship.angle)) * THRUST_POWER * dt
+        ship.vy += -math.cos(math.radians(ship.angle)) * THRUST_POWER * dt
+        ship.fuel -= 1 * dt
+    events = thrust_events(ship, burning)
+
+    # Apply side thrust for rotation
+    if ship.left_thrust and ship.fuel > 0:
+        ship.angle -= SHIP_ROTATION_RATE * dt
+        ship.fuel -= SHIP_ROTATION_FUEL * dt
+    if ship.right_thrust and ship.fuel > 0:
+        ship.angle += SHIP_ROTATION_RATE * dt
+        ship.fuel -= SHIP_ROTATION_FUEL * dt
+
+    # Emergency boost
+    if ship.emergency_boost and ship.fuel > BOOST_FUEL:
+        ship.vx += math.sin(math.radians(ship.angle)) * EMERGENCY_BOOST * dt
+        ship.vy += -math.cos(math.radians(ship.angle)) * EMERGENCY_BOOST * dt
+        ship.fuel -= BOOST_FUEL * dt
+
+    # Update position
+    ship.x += ship.vx * dt
+    ship.y += ship.vy * dt
+
+    # Keep ship on screen (wrap around)
+    if wrap:
+        if ship.x < 0:
+            ship.x = WIDTH
+        elif ship.x > WIDTH:
+            ship.x = 0
+    return events
+
+
+def step_booster(booster, controls, gravity, wind_force, dt=SIM_DT):
+    # Apply gravity
+    booster.vy += gravity * dt
+
+    # Apply wind
+    booster.vx += wind_force * dt
+
+    burning = False
+    # Launch phase - automatic full thrust upward
+    if booster.phase == PHASE_LAUNCH:
+        burning = booster.fuel > 0
+        if burning:
+            booster.vy += -BOOSTER_LAUNCH_THRUST * dt
+            booster.fuel -= BOOSTER_LAUNCH_FUEL * dt
+        booster.thrusting = burning
+
+    # Return phase - player controlled
+    elif booster.phase == PHASE_RETURN:
+        booster.thrusting = controls.thrust
+        booster.left_thrust = controls.left
+        booster.right_thrust = controls.right
+
+        burning = booster.thrusting and booster.fuel > 0
+        if burning:
+            booster.vx += math.sin(math.radians(booster.angle)) * THRUST_POWER * dt
+            booster.vy += -math.cos(math.radians(booster.angle)) * THRUST_POWER * dt
+            booster.fuel -= 1 * dt
+
+        # Side thrust for rotation
+        if booster.left_thrust and booster.fuel > 0:
+            booster.angle -= BOOSTER_ROTATION_RATE * dt
+            booster.fuel -= BOOSTER_ROTATION_FUEL * dt
+        if booster.right_thrust and booster.fuel > 0:
+            booster.angle += BOOSTER_ROTATION_RATE * dt
+            booster.fuel -= BOOSTER_ROTATION_FUEL * dt
+    events = thrust_events(booster, burning)
+
+    # Update position
+    booster.x += booster.vx * dt
+    booster.y += booster.vy * dt
+    return events
+
+
+def step_starship(starship, booster, gravity, wind_force, dt=SIM_DT):
+    # Rides on top of the booster until released, then flies on by itself
+    if starship.attached:
+        starship.x = booster.x
+        starship.y = booster.y - (booster.height + starship.height) / 2
+        starship.vx, starship.vy, starship.angle = booster.vx, booster.vy, booster.angle
+        return
+    starship.vy += gravity * dt
+    starship.vx += wind_force * dt
+    if starship.thrusting:
+        starship.vx += math.sin(math.radians(starship.angle)) * STARSHIP_THRUST * dt
+        starship.vy += -math.cos(math.radians(starship.angle)) * STARSHIP_THRUST * dt
+    starship.x += starship.vx * dt
+    starship.y += starship.vy * dt
+
+
+def pad_contains(pad, ship):
+    return (ship.x - ship.width/2 >= pad.x - pad.width/2 and
+            ship.x + ship.width/2 <= pad.x + pad.width/2)
+
+
+def soft_touchdown(ship):
+    return abs(ship.vy) < LANDING_VELOCITY_THRESHOLD and abs(ship.angle) < LANDING_ANGLE_THRESHOLD
+
+
+def sweep_pad(pad, ship, x0, y0, x1, y1):
+    # Contact of the ship's bottom centre with the pad on its way from
+    # (x0, y0) to (x1, y1): landing on top mid-step, or ending the step
+    # beside or inside it
+    top = pad.y - pad.height
+    reach = (pad.width + ship.width) / 2
+    if y0 < top <= y1:
+        t = (top - y0) / (y1 - y0)
+        x = x0 + (x1 - x0) * t
+        if abs(x - pad.x) < reach:
+            return t, x, top
+    if y1 >= top and abs(x1 - pad.x) < reach:
+        return 1.0, x1, y1
+    return None
+
+
+def check_touchdown(state, start=None, dt=SIM_DT):
+    # Returns the new status once the ship touches the pad or the ground.
+    # start is the ship's (x, y) before a step of dt; the motion in between is
+    # swept as one straight segment (ignoring the screen wrap) and the ship is
+    # moved back to the first contact point. Without start only the current
+    # position is tested.
+    ship, pad = state.ship, state.pad
+    half = ship.height/2
+    if start is None:
+        x0 = x1 = ship.x
+        y0 = y1 = ship.y + half
+    else:
+        x0, y0 = start[0], start[1] + half
+        x1, y1 = x0 + ship.vx * dt, ship.y + half
+    terrain = state.terrain if state.terrain is not None else flat_ground(state.ground_y)
+    on_pad = sweep_pad(pad, ship, x0, y0, x1, y1)
+    contact = terrain.sweep(x0, y0, x1, y1)
+    if on_pad is not None and (contact is None or on_pad[0] <= contact[0]):
+        contact = on_pad
+    elif contact is None:
+        return None
+    if contact[0] < 1.0:
+        ship.x, ship.y = contact[1], contact[2] - half
+    if contact is on_pad:
+        return WIN if pad_contains(pad, ship) and soft_touchdown(ship) else LOSE
+    return LOSE
+
+
+def altitude(ship):
+    return HEIGHT - ship.y - ship.height/2
+
+
+def landing_score(ship):
+    return int(ship.fuel * FUEL_SCORE) + LANDING_BONUS
+
+
+def step(state, controls, dt=SIM_DT):
+    if state.status != PLAYING:
+        return []
+    ship = state.ship
+    x0, y0 = ship.x, ship.y
+    events = step_ship(ship, controls, state.gravity, state.wind_force, dt, state.wrap)
+    status = check_touchdown(state, (x0, y0), dt)
+    if status == WIN:
+        state.score += landing_score(state.ship)
+        events.append(EVENT_LANDED)
+    elif status == LOSE:
+        events.append(EVENT_CRASHED)
+    if status is not None:
+        state.status = status
+        if state.ship.was_thrusting:
+            state.ship.was_thrusting = False
+            events.append(EVENT_THRUST_STOP)
+    state.score += 1
+    state.frame += 1
+    return events
+
+
+def descent_policy(state):
+    # Scripted lander: pick the thrust vector that steers the velocity towards
+    # a target (drift over the pad, sink slower as the pad gets closer), point
+    # the ship along it and pulse the engine when it is needed
+    ship, pad = state.ship, state.pad
+    height = max(0.0, pad.y - pad.height - (ship.y + ship.height/2))
+    target_vx = max(-3.0, min(3.0, (pad.x - ship.x) * 0.02))
+    target_vy = 1.0 + 0.5 * math.sqrt(2 * max(THRUST_POWER - state.gravity, 0.05) * height)
+    if abs(pad.x - ship.x) > height + pad.width / 4:
+        target_vy = min(target_vy, 0.5)  # Still too far off: hold altitude
+    need_x = (target_vx - ship.vx) * 0.2 - state.wind_force
+    need_y = (target_vy - ship.vy) * 0.2 - state.gravity
+    limit = 8.0 if height < 60 else 30.0
+    target_angle = max(-limit, min(limit, math.degrees(math.atan2(need_x, -need_y))))
+    along = need_x * math.sin(math.radians(ship.angle)) - need_y * math.cos(math.radians(ship.angle))
+    return Controls(
+        thrust=along > THRUST_POWER * 0.5,
+        left=ship.angle > target_angle + 1,
+        right=ship.angle < target_angle - 1,
+    )
+
+
+def run_episode(state, policy, max_frames=60 * FPS, dt=SIM_DT):
+    while state.status == PLAYING and state.frame < max_frames:
+        step(state, policy(state), dt)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless landing episodes with the scripted policy.")
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--level", type=int, default=1)
+    args = parser.parse_args()
+
+    frames = wins = 0
+    start = time.perf_counter()
+    for _ in range(args.episodes):
+        state = run_episode(new_episode(args.level), descent_policy)
+        frames += state.frame
+        wins += state.status == WIN
+    elapsed = time.perf_counter() - start
+    print(f"{args.episodes} episodes, {wins} landed, {frames} frames in {elapsed:.3f}s "
+          f"({frames / elapsed:.0f} frames/s, {frames / FPS / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
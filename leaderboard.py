@@ -0,0 +1,193 @@
+"""Persistent leaderboard of finished runs in SQLite.
+
+The database runs in WAL mode, so the menu's reads never wait on a write and
+a crash mid-write cannot corrupt what is already stored. Runs are only ever
+inserted. record() just queues the run; a background thread writes whatever
+has queued up as one transaction, so the game loop never touches the disk.
+Queued runs are flushed on close() and at interpreter exit, unhandled
+exceptions included. The top-N query walks an index on score and stays
+fast however many runs are stored.
+
+    python leaderboard.py leaderboard.db --top 10
+    python leaderboard.py --bench 300000
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import astuple, dataclass, field, fields
+
+LEADERBOARD_PATH = "leaderboard.db"
+LEGACY_HIGH_SCORE = "high_score.json"  # Single best score kept by earlier versions
+FLUSH_INTERVAL = 0.5  # Seconds the writer gathers runs before a transaction
+BUSY_TIMEOUT_MS = 5000  # Wait this long for another process's write to finish
+
+
+@dataclass
+class Run:
+    score: int
+    level: int
+    fuel: float  # Left at the end of the run
+    duration: float  # Seconds of game time
+    seed: int  # Episode seed; with level and mode it rebuilds the run
+    mode: str = "screen"  # screen, world or catch
+    outcome: str = "lose"
+    replay: str = None  # "path#episode" in an input recording, if one was made
+    played_at: float = field(default_factory=time.time)
+
+
+COLUMNS = tuple(f.name for f in fields(Run))
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    fuel REAL NOT NULL,
+    duration REAL NOT NULL,
+    seed INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    replay TEXT,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_mode_score ON runs (mode, score DESC);
+"""
+INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT = f"SELECT {', '.join(COLUMNS)} FROM runs"
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost
+    return db
+
+
+class Leaderboard:
+    def __init__(self, path=LEADERBOARD_PATH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.db = connect(path)  # Reads, on the caller's thread
+        with self.db:
+            self.db.executescript(SCHEMA)
+        self.import_legacy()
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self.write_loop, name="leaderboard-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def import_legacy(self):
+        # Carry the old single high score, from the single-screen game, over
+        # into a fresh database
+        legacy = os.path.join(os.path.dirname(self.path), LEGACY_HIGH_SCORE)
+        if not os.path.exists(legacy) or self.db.execute("SELECT 1 FROM runs LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy) as f:
+                score = int(json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Ignoring {legacy}: {e}")
+            return
+        with self.db:
+            self.db.execute(INSERT, astuple(Run(score, 0, 0.0, 0.0, 0, outcome="imported")))
+
+    def record(self, run):
+        # Never blocks: the writer thread stores it
+        self.queue.put(run)
+
+    def write_loop(self):
+        db = connect(self.path)
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if batch:
+                with db:
+                    db.executemany(INSERT, [astuple(run) for run in batch])
+        db.close()
+
+    def top(self, n=10, mode=None):
+        if mode is None:
+            rows = self.db.execute(f"{SELECT} ORDER BY score DESC LIMIT ?", (n,))
+        else:
+            rows = self.db.execute(f"{SELECT} WHERE mode = ? ORDER BY score DESC LIMIT ?", (mode, n))
+        return [Run(*row) for row in rows]
+
+    def best(self, mode=None):
+        runs = self.top(1, mode)
+        return runs[0].score if runs else 0
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        # Write out everything queued and wait for it
+        if self.writer is None:
+            return
+        atexit.unregister(self.close)
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = None
+        self.db.close()
+
+
+def bench(rows):
+    with tempfile.TemporaryDirectory() as directory:
+        board = Leaderboard(os.path.join(directory, LEADERBOARD_PATH))
+        modes = ("screen", "world", "catch")
+        start = time.perf_counter()
+        for i in range(rows):
+            board.record(Run((i * 7919) % 100003, 1 + i % 4, 100.0, 30.0, i, modes[i % 3], "win"))
+        queued = time.perf_counter() - start
+        board.close()
+        written = time.perf_counter() - start
+        board = Leaderboard(board.path)
+        start = time.perf_counter()
+        for _ in range(100):
+            board.top(10)
+        top = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for _ in range(100):
+            board.top(10, "catch")
+        top_mode = (time.perf_counter() - start) / 100
+        print(f"{len(board)} runs: record {queued / rows * 1e6:.2f} us each, all written after {written:.2f}s")
+        print(f"top 10: {top * 1000:.3f} ms, top 10 in one mode: {top_mode * 1000:.3f} ms")
+        board.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the leaderboard or time it.")
+    parser.add_argument("path", nargs="?", default=LEADERBOARD_PATH)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--mode", choices=("screen", "world", "catch"))
+    parser.add_argument("--bench", type=int, metavar="ROWS", help="time writes and top-N queries on ROWS runs")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+    board = Leaderboard(args.path)
+    for rank, run in enumerate(board.top(args.top, args.mode), 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run.played_at))
+        replay = f"  {run.replay}" if run.replay else ""
+        print(f"{rank:>3} {run.score:>8} L{run.level} {run.mode:<8} {run.outcome:<5} "
+              f"fuel {run.fuel:>6.0f} {run.duration:>6.1f}s seed {run.seed} {when}{replay}")
+    board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""Delta-compressed state snapshots over UDP, for spectators and local races.
+
+A snapshot is what another process needs to show a run: the game state,
+score, level and quality tier, the episode seed and mode (so the terrain can
+be rebuilt rather than sent), the flown vehicle's pose, velocity, fuel and
+engine flags, and in catch mode the ship on top and the tower arm. Particles
+are not sent; the engine flags and quality tier are the emitter state, and a
+receiver runs its own particle system from them.
+
+Every SEND_RATE-th of a second the server packs the snapshot as a delta
+against the newest one each client has acknowledged: a bitmask of the
+fields that changed, then just those fields. A client without a usable
+baseline gets everything, against an all-zero snapshot. Clients acknowledge
+every snapshot, keep the last HISTORY of them and draw INTERP_INTERVALS send
+intervals in the past, between the two snapshots either side of that time.
+
+    python starship_lander.py --seed 5 --serve 50007
+    python netplay.py spectate 127.0.0.1:50007
+    python starship_lander.py --seed 5 --serve 50007 --race 127.0.0.1:50008
+    python starship_lander.py --seed 5 --serve 50008 --race 127.0.0.1:50007
+    python netplay.py test --clients 2 --loss 0.1
+"""
+import argparse
+import bisect
+import functools
+import random
+import socket
+import struct
+import time
+from collections import namedtuple
+
+from lander_sim import FPS, MODES, PHASES, PLAYING, STATUSES
+
+DEFAULT_PORT = 50007
+SEND_RATE = 20  # Snapshots per second
+HISTORY = 64  # Snapshots kept on both ends as delta baselines
+INTERP_INTERVALS = 2  # Clients draw this many send intervals behind the newest snapshot
+HELLO_INTERVAL = 1.0  # Seconds between hellos until the first snapshot arrives
+CLIENT_TIMEOUT = 5.0  # Seconds without an acknowledgement before a client is dropped
+UDP_OVERHEAD = 28  # IPv4 and UDP header bytes on every datagram
+# Bits of the flags field
+THRUST = 1
+BOOST = 2
+UPPER_THRUST = 4  # The ship on top of the booster, in catch mode
+ATTACHED = 8
+WRECKED = 16
+CLOSING = 32  # Tower arms closing
+
+FIELDS = (
+    ("status", "B"), ("mode", "B"), ("level", "B"), ("quality", "B"), ("seed", "I"), ("score", "i"),
+    ("x", "f"), ("y", "f"), ("vx", "f"), ("vy", "f"), ("angle", "f"), ("fuel", "f"), ("flags", "B"),
+    ("phase", "B"), ("upper_x", "f"), ("upper_y", "f"), ("upper_angle", "f"), ("arm_angle", "f"),
+)
+Snapshot = namedtuple("Snapshot", [name for name, _ in FIELDS])
+FULL = struct.Struct("<" + "".join(code for _, code in FIELDS))
+EMPTY = Snapshot(*FULL.unpack(bytes(FULL.size)))
+NO_BASELINE = 0xFFFFFFFF  # Base tick of a snapshot sent against EMPTY
+# kind, tick, base tick, changed-field mask; the changed fields follow
+HEADER = struct.Struct("<cIII")
+ACK = struct.Struct("<cI")
+SNAPSHOT, HELLO, ACKNOWLEDGE, BYE = b"S", b"H", b"A", b"B"
+
+
+def parse_address(text, host="127.0.0.1"):
+    # "host:port" or just "port"
+    name, _, port = text.rpartition(":")
+    return name or host, int(port)
+
+
+def capture(game):
+    # The game's Snapshot, with floats rounded to what the wire carries
+    vehicle = game.vehicle
+    flags = (THRUST if vehicle.thrusting else 0) | (BOOST if getattr(vehicle, "emergency_boost", False) else 0)
+    phase, upper, arm_angle = 0, (0.0, 0.0, 0.0), 0.0
+    if game.catch:
+        starship, tower = game.starship, game.tower
+        flags |= ((UPPER_THRUST if starship.thrusting else 0) | (ATTACHED if starship.attached else 0) |
+                  (WRECKED if game.sim.wrecked else 0) | (CLOSING if tower.closing else 0))
+        phase = PHASES.index(game.booster.phase)
+        upper = (starship.x, starship.y, starship.angle)
+        arm_angle = tower.arm_angle
+    return Snapshot(*FULL.unpack(FULL.pack(
+        STATUSES.index(game.game_state), MODES.index(game.mode), game.level, game.governor.level,
+        game.episode_seed, game.score, vehicle.x, vehicle.y, vehicle.vx, vehicle.vy, vehicle.angle,
+        vehicle.fuel, flags, phase, *upper, arm_angle)))
+
+
+@functools.lru_cache(maxsize=None)
+def delta_struct(mask):
+    return struct.Struct("<" + "".join(code for i, (_, code) in enumerate(FIELDS) if mask >> i & 1))
+
+
+def encode(tick, snapshot, base_tick=NO_BASELINE, base=EMPTY):
+    mask, changed = 0, []
+    for i, (value, old) in enumerate(zip(snapshot, base)):
+        if value != old:
+            mask |= 1 << i
+            changed.append(value)
+    return HEADER.pack(SNAPSHOT, tick, base_tick, mask) + delta_struct(mask).pack(*changed)
+
+
+def decode(data, baselines):
+    # (tick, Snapshot), or None if the baseline is no longer held
+    _, tick, base_tick, mask = HEADER.unpack_from(data)
+    base = EMPTY if base_tick == NO_BASELINE else baselines.get(base_tick)
+    if base is None:
+        return None
+    changed = iter(delta_struct(mask).unpack_from(data, HEADER.size))
+    return tick, Snapshot(*[next(changed) if mask >> i & 1 else old for i, old in enumerate(base)])
+
+
+def place(vehicle, a, b):
+    # Put snapshot b's state on a vehicle, with a as the pose it moves from
+    vehicle.previous = (a.x, a.y, a.angle) if a.seed == b.seed else None
+    vehicle.x, vehicle.y, vehicle.angle = b.x, b.y, b.angle
+    vehicle.vx, vehicle.vy, vehicle.fuel = b.vx, b.vy, b.fuel
+    vehicle.thrusting = bool(b.flags & THRUST)
+    if hasattr(vehicle, "emergency_boost"):
+        vehicle.emergency_boost = bool(b.flags & BOOST)
+
+
+def show(game, a, b, alpha):
+    # Make a Game draw the run in a snapshot pair: b's state, with vehicles
+    # alpha of the way from their poses in a. The terrain comes from the
+    # seed, so a new episode is rebuilt locally; catch debris is not shown.
+    world, catch = MODES[b.mode] != "screen", MODES[b.mode] == "catch"
+    if (b.seed, world, catch) != (game.episode_seed, game.world, game.catch):
+        game.world, game.catch, game.level = world, catch, b.level
+        game.reset_game(b.seed)
+    if b.quality != game.governor.level:
+        game.governor.level = b.quality
+        game.apply_quality()
+    game.game_state = STATUSES[b.status]
+    game.score, game.level = b.score, b.level
+    place(game.vehicle, a, b)
+    if catch:
+        starship = game.starship
+        starship.previous = (a.upper_x, a.upper_y, a.upper_angle) if a.seed == b.seed else None
+        starship.x, starship.y, starship.angle = b.upper_x, b.upper_y, b.upper_angle
+        starship.thrusting = bool(b.flags & UPPER_THRUST)
+        starship.attached = bool(b.flags & ATTACHED)
+        game.booster.phase = PHASES[b.phase]
+        game.tower.arm_angle = b.arm_angle
+        game.tower.closing = bool(b.flags & CLOSING)
+        if b.flags & WRECKED:
+            game.sim.bodies.pop("booster", None)
+    game.alpha = alpha
+    game.follow_camera()
+
+
+class Peer:
+    def __init__(self):
+        self.acked = None  # Newest tick the client has acknowledged
+        self.heard = time.monotonic()
+        self.packets = 0
+        self.bytes = 0  # Payload bytes sent, without UDP_OVERHEAD
+
+
+class SnapshotServer:
+    # Sends the game's snapshot to every client that has said hello. Game
+    # calls tick() once per simulation step.
+    def __init__(self, port=DEFAULT_PORT, rate=SEND_RATE, host="127.0.0.1"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.interval = max(1, round(FPS / rate))  # Simulation steps per snapshot
+        self.ticks = 0
+        self.history = {}  # tick -> Snapshot, the last HISTORY sent
+        self.clients = {}  # address -> Peer
+        self.snapshots = 0
+        self.serialize_ns = 0  # Capturing and encoding, for every client
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def poll(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(64)
+            except BlockingIOError:
+                return
+            except OSError:
+                continue  # A client's port has gone away; its timeout drops it
+            kind = data[:1]
+            if kind == HELLO:
+                self.clients.setdefault(address, Peer())
+            elif kind == BYE:
+                self.clients.pop(address, None)
+            elif kind == ACKNOWLEDGE and address in self.clients and len(data) == ACK.size:
+                peer = self.clients[address]
+                tick = ACK.unpack(data)[1]
+                peer.heard = time.monotonic()
+                if tick in self.history and (peer.acked is None or tick > peer.acked):
+                    peer.acked = tick
+
+    def tick(self, game):
+        tick = self.ticks
+        self.ticks += 1
+        if tick % self.interval:
+            return
+        self.poll()
+        start = time.perf_counter_ns()
+        snapshot = self.history[tick] = capture(game)
+        self.history.pop(tick - HISTORY * self.interval, None)
+        packets = []
+        for address, peer in self.clients.items():
+            base = self.history.get(peer.acked)
+            if base is None:
+                packets.append((address, encode(tick, snapshot)))
+            else:
+                packets.append((address, encode(tick, snapshot, peer.acked, base)))
+        self.serialize_ns += time.perf_counter_ns() - start
+        self.snapshots += 1
+        now = time.monotonic()
+        for address, packet in packets:
+            peer = self.clients[address]
+            if now - peer.heard > CLIENT_TIMEOUT:
+                del self.clients[address]
+                continue
+            try:
+                self.sock.sendto(packet, address)
+            except OSError:
+                continue
+            peer.packets += 1
+            peer.bytes += len(packet)
+
+    def stats(self):
+        # Serialization time per snapshot and bandwidth per client
+        seconds = self.snapshots * self.interval / FPS
+        return {
+            "snapshots": self.snapshots,
+            "serialize_us": self.serialize_ns / 1000 / max(self.snapshots, 1),
+            "clients": {
+                f"{host}:{port}": {
+                    "packets": peer.packets,
+                    "bytes_per_snapshot": peer.bytes / max(peer.packets, 1),
+                    "bytes_per_second": (peer.bytes + UDP_OVERHEAD * peer.packets) / max(seconds, 1e-9),
+                }
+                for (host, port), peer in self.clients.items()
+            },
+        }
+
+    def close(self):
+        self.sock.close()
+
+
+class SnapshotClient:
+    # Receives a server's snapshots. sample() gives the pair to draw between;
+    # loss is the share of arriving packets thrown away, to exercise the
+    # delta baselines in tests.
+    def __init__(self, address, rate=SEND_RATE, loss=0.0, seed=None):
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.delay = INTERP_INTERVALS * FPS / rate  # In simulation steps
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.snapshots = {}  # tick -> Snapshot, the newest HISTORY received
+        self.ticks = []  # Their ticks, sorted
+        self.render_tick = None
+        self.clock = None
+        self.hello_at = None
+        self.bytes = 0
+        self.dropped = 0  # Arrived without a baseline held here
+        self.hello()
+
+    def hello(self):
+        self.hello_at = time.monotonic()
+        self.sock.sendto(HELLO, self.address)
+
+    def poll(self):
+        while True:
+            try:
+                data = self.sock.recv(HEADER.size + FULL.size)
+            except BlockingIOError:
+                break
+            except OSError:
+                continue  # Nobody listening yet; the hello is repeated
+            if self.loss and self.rng.random() < self.loss:
+                continue
+            self.bytes += len(data)
+            if data[:1] != SNAPSHOT or len(data) < HEADER.size:
+                continue
+            decoded = decode(data, self.snapshots)
+            if decoded is None:
+                self.dropped += 1
+                continue
+            tick, snapshot = decoded
+            if tick not in self.snapshots:
+                self.snapshots[tick] = snapshot
+                bisect.insort(self.ticks, tick)
+                if len(self.ticks) > HISTORY:
+                    del self.snapshots[self.ticks.pop(0)]
+            self.sock.sendto(ACK.pack(ACKNOWLEDGE, tick), self.address)
+        if not self.ticks and time.monotonic() - self.hello_at > HELLO_INTERVAL:
+            self.hello()
+
+    @property
+    def newest(self):
+        return self.snapshots[self.ticks[-1]] if self.ticks else None
+
+    def sample(self, now=None):
+        # (a, b, alpha): the snapshots either side of the render time, which
+        # follows the local clock and trails the newest snapshot by delay
+        # steps, or None before the first snapshot
+        if not self.ticks:
+            return None
+        now = time.perf_counter() if now is None else now
+        newest = self.ticks[-1]
+        target = newest - self.delay
+        if self.render_tick is None or abs(self.render_tick - target) > self.delay:
+            self.render_tick = target  # First sample, or drifted: jump back in line
+        else:
+            self.render_tick = min(self.render_tick + (now - self.clock) * FPS, newest)
+        self.clock = now
+        i = bisect.bisect_right(self.ticks, self.render_tick)
+        if i == 0:
+            first = self.snapshots[self.ticks[0]]
+            return first, first, 1.0
+        if i == len(self.ticks):
+            return self.newest, self.newest, 1.0
+        start, end = self.ticks[i - 1], self.ticks[i]
+        return self.snapshots[start], self.snapshots[end], (self.render_tick - start) / (end - start)
+
+    def close(self):
+        try:
+            self.sock.sendto(BYE, self.address)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def spectate(address, fps=FPS):
+    # A window that shows another process's run
+    from starship_lander import Game
+    game = Game(sound=False)
+    client = SnapshotClient(address)
+    running = True
+    while running:
+        running = game.handle_events()
+        client.poll()
+        rendered = client.render_tick
+        sample = client.sample()
+        if sample is not None:
+            show(game, *sample)
+            # Local effects, one step for each simulation step drawn past
+            if rendered is not None:
+                for _ in range(min(int(client.render_tick) - int(rendered), 5)):
+                    game.update_particles()
+                    game.emit_exhaust()
+        game.draw()
+        game.present()
+        game.clock.tick(fps)
+    client.close()
+
+
+def local_test(ticks=1800, clients=2, rate=SEND_RATE, loss=0.0, seed=1, mode="screen"):
+    # Runs an autopilot game with a server and clients in this process over
+    # loopback, one poll per simulation step. Every snapshot a client decodes
+    # is checked against what the server captured at that tick. Returns the
+    # server's stats with the checks.
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from starship_lander import Game
+
+    game = Game(seed=seed, sound=False, autopilot=True, world=mode == "world", catch=mode == "catch")
+    server = game.server = SnapshotServer(port=0, rate=rate)
+    viewers = [SnapshotClient(server.address, rate, loss, seed + i) for i in range(clients)]
+    game.game_state = PLAYING
+    checked = mismatches = 0
+    interpolated = 0
+    for t in range(ticks):
+        if game.game_state != PLAYING:
+            game.reset_game()
+            game.game_state = PLAYING
+        game.tick()
+        for viewer in viewers:
+            seen = viewer.ticks[-1] if viewer.ticks else -1
+            viewer.poll()
+            for tick in viewer.ticks[bisect.bisect_right(viewer.ticks, seen):]:
+                checked += 1
+                mismatches += viewer.snapshots[tick] != server.history[tick]
+            sample = viewer.sample(now=t / FPS)
+            interpolated += sample is not None and 0 < sample[2] < 1
+    stats = server.stats()
+    stats.update(checked=checked, mismatches=mismatches, interpolated=interpolated,
+                 no_baseline=sum(viewer.dropped for viewer in viewers),
+                 full_bytes=HEADER.size + FULL.size)
+    for viewer in viewers:
+        viewer.close()
+    server.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectate a run over UDP, or test the snapshot link headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    watch = commands.add_parser("spectate", help="show the run a game started with --serve is playing")
+    watch.add_argument("address", nargs="?", default=str(DEFAULT_PORT), help="[host:]port of the server")
+    watch.add_argument("--fps", type=int, default=FPS)
+    test = commands.add_parser("test", help="run a server and clients over loopback and report on the link")
+    test.add_argument("--ticks", type=int, default=1800, help="simulation steps to run")
+    test.add_argument("--clients", type=int, default=2)
+    test.add_argument("--rate", type=int, default=SEND_RATE, help="snapshots per second")
+    test.add_argument("--loss", type=float, default=0.0, help="share of packets each client drops")
+    test.add_argument("--mode", choices=MODES, default="screen")
+    test.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "spectate":
+        spectate(parse_address(args.address), args.fps)
+        return
+    stats = local_test(args.ticks, args.clients, args.rate, args.loss, args.seed, args.mode)
+    print(f"{stats['snapshots']} snapshots at {args.rate}/s, serialization {stats['serialize_us']:.1f} us "
+          f"per snapshot for {args.clients} clients, {stats['full_bytes']} bytes when sent whole")
+    for address, client in stats["clients"].items():
+        print(f"client {address}: {client['packets']} packets, {client['bytes_per_snapshot']:.1f} bytes each, "
+              f"{client['bytes_per_second']:.0f} B/s with UDP headers")
+    print(f"{stats['checked']} snapshots decoded, {stats['mismatches']} mismatched, "
+          f"{stats['no_baseline']} without a baseline, {stats['interpolated']} interpolated samples")
+    if stats["mismatches"]:
+        raise SystemExit("decoded snapshots differ from the server's")
+
+
+if __name__ == "__main__":
+    main()
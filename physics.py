@@ -0,0 +1,301 @@
+"""Small rigid-body world for the booster-catch mission.
+
+Bodies are boxes that may be rotated. A body wraps any state object with x,
+y, vx, vy, angle, width and height, so the sim's own dataclasses
+(BoosterState, the tower arms, debris) take part directly. Free bodies are
+integrated here; driven bodies are moved by their own step function and
+static bodies only by the caller, and neither is pushed by a contact. Every
+step rebuilds a spatial hash of the bodies' bounding boxes, so only boxes
+that share a grid cell and overlap are tested against each other.
+
+    python physics.py --bodies 500
+"""
+import argparse
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from lander_sim import GRAVITY, GROUND_Y, SIM_DT, flat_ground
+
+# Body kinds
+FREE = "free"  # Integrated and pushed by the world
+DRIVEN = "driven"  # Moved by its own step function, never pushed
+STATIC = "static"  # Moved only by the caller
+
+CELL_SIZE = 64  # Spatial hash cell, a bit larger than most debris
+DEBRIS_RESTITUTION = 0.3
+DEBRIS_FRICTION = 0.8  # Velocity kept on each ground bounce
+REST_SPEED = 0.05  # Below this a body on the ground stops moving
+
+
+@dataclass
+class BoxState:
+    # Plain box for bodies with no state of their own: debris, tower parts
+    x: float
+    y: float
+    width: float = 4
+    height: float = 4
+    vx: float = 0
+    vy: float = 0
+    angle: float = 0
+    spin: float = 0  # Degrees per frame
+
+
+@dataclass(eq=False)
+class Body:
+    state: object
+    kind: str = FREE
+    mass: float = 1.0
+    restitution: float = DEBRIS_RESTITUTION
+    friction: float = DEBRIS_FRICTION
+    tag: str = ""  # What the body is, for whoever reads the contacts
+    on_ground: bool = False
+
+    @property
+    def resting(self):
+        return self.on_ground and self.state.vx == 0 and self.state.vy == 0
+
+    @property
+    def inverse_mass(self):
+        return 1.0 / self.mass if self.kind == FREE else 0.0
+
+    def axes(self):
+        # Unit vectors along the box's width and height; angles turn clockwise
+        # on screen, matching the ship's thrust direction
+        radians = math.radians(self.state.angle)
+        c, s = math.cos(radians), math.sin(radians)
+        return (c, s), (-s, c)
+
+    def extents(self):
+        # Half sizes of the axis-aligned box around the rotated box
+        radians = math.radians(self.state.angle)
+        c, s = abs(math.cos(radians)), abs(math.sin(radians))
+        hw, hh = self.state.width / 2, self.state.height / 2
+        return hw * c + hh * s, hw * s + hh * c
+
+    def bounds(self):
+        ex, ey = self.extents()
+        x, y = self.state.x, self.state.y
+        return x - ex, y - ey, x + ex, y + ey
+
+
+@dataclass
+class Contact:
+    a: Body
+    b: Body  # None for a ground contact
+    normal: tuple  # Unit vector from a towards b (up for the ground)
+    depth: float
+
+
+class SpatialHash:
+    # Uniform grid over world space; each entry sits in every cell its
+    # bounding box covers, and candidate pairs come from cells shared
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, index, x0, y0, x1, y1):
+        size = self.cell_size
+        cells = self.cells
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                cells[cx, cy].append(index)
+
+    def pairs(self):
+        found = set()
+        for members in self.cells.values():
+            if len(members) > 1:
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        found.add((a, b) if a < b else (b, a))
+        return found
+
+
+def box_overlap(a, b):
+    # Separating-axis test for two rotated boxes: (normal from a to b, depth)
+    # along the axis of least overlap, or None if they don't touch
+    sa, sb = a.state, b.state
+    dx, dy = sb.x - sa.x, sb.y - sa.y
+    a_axes, b_axes = a.axes(), b.axes()
+    best = None
+    for ax, ay in a_axes + b_axes:
+        reach = 0.0
+        for (ux, uy), half in zip(a_axes, (sa.width / 2, sa.height / 2)):
+            reach += half * abs(ax * ux + ay * uy)
+        for (ux, uy), half in zip(b_axes, (sb.width / 2, sb.height / 2)):
+            reach += half * abs(ax * ux + ay * uy)
+        distance = dx * ax + dy * ay
+        depth = reach - abs(distance)
+        if depth <= 0:
+            return None
+        if best is None or depth < best[1]:
+            sign = 1.0 if distance >= 0 else -1.0
+            best = ((ax * sign, ay * sign), depth)
+    return best
+
+
+class World:
+    def __init__(self, gravity=GRAVITY, wind_force=0.0, terrain=None, cell_size=CELL_SIZE):
+        self.gravity = gravity
+        self.wind_force = wind_force
+        self.terrain = terrain if terrain is not None else flat_ground(GROUND_Y)
+        self.bodies = []
+        self.grid = SpatialHash(cell_size)
+        self.candidates = 0  # Pairs the broadphase passed on last step
+
+    def add(self, body):
+        self.bodies.append(body)
+        return body
+
+    def remove(self, body):
+        self.bodies.remove(body)
+
+    def step(self, dt=SIM_DT):
+        # Integrate free bodies, then find and resolve contacts between every
+        # body and with the ground; returns the contacts that involve a
+        # driven body, which the world leaves to its owner
+        for body in self.bodies:
+            if body.kind == FREE:
+                self.integrate(body, dt)
+        contacts = [contact for body in self.bodies if (contact := self.ground_contact(body))]
+
+        bodies = self.bodies
+        pairs = self.broadphase()
+        self.candidates = len(pairs)
+        for i, j in pairs:
+            a, b = bodies[i], bodies[j]
+            if a.kind != FREE and b.kind != FREE:
+                if DRIVEN not in (a.kind, b.kind):
+                    continue  # Static against static never matters
+            elif a.resting and b.resting:
+                continue  # A settled pile stays settled
+            hit = box_overlap(a, b)
+            if hit is not None:
+                contact = Contact(a, b, *hit)
+                self.resolve(contact)
+                contacts.append(contact)
+        return [c for c in contacts if c.a.kind == DRIVEN or (c.b is not None and c.b.kind == DRIVEN)]
+
+    def broadphase(self):
+        # Index pairs of bodies whose bounding boxes overlap: the grid finds
+        # the pairs sharing a cell, and a box test drops those that only share
+        # the cell
+        grid = self.grid
+        grid.clear()
+        boxes = [body.bounds() for body in self.bodies]
+        for i, box in enumerate(boxes):
+            grid.insert(i, *box)
+        return {(i, j) for i, j in grid.pairs()
+                if boxes[i][0] <= boxes[j][2] and boxes[j][0] <= boxes[i][2]
+                and boxes[i][1] <= boxes[j][3] and boxes[j][1] <= boxes[i][3]}
+
+    def integrate(self, body, dt):
+        state = body.state
+        if body.on_ground and abs(state.vx) < REST_SPEED and abs(state.vy) < REST_SPEED:
+            state.vx = state.vy = 0
+            return  # At rest until something hits it
+        body.on_ground = False
+        state.vy += self.gravity * dt
+        state.vx += self.wind_force * dt
+        state.x += state.vx * dt
+        state.y += state.vy * dt
+        state.angle += getattr(state, "spin", 0) * dt
+
+    def ground_contact(self, body):
+        # Lowest point of the body's bounding box against the ground under
+        # its centre; free bodies are pushed out and bounce
+        state = body.state
+        bottom = state.y + body.extents()[1]
+        depth = bottom - self.terrain.height_at(state.x)
+        if depth < 0:
+            return None
+        if body.kind == FREE:
+            state.y -= depth
+            if state.vy > 0:
+                state.vy = -state.vy * body.restitution
+            state.vx *= body.friction
+            if hasattr(state, "spin"):
+                state.spin *= body.friction
+            body.on_ground = True
+        elif body.kind == STATIC:
+            return None
+        return Contact(body, None, (0.0, -1.0), depth)
+
+    def resolve(self, contact):
+        # Push the boxes apart in proportion to their inverse masses and
+        # cancel the closing speed along the contact normal
+        a, b = contact.a, contact.b
+        ia, ib = a.inverse_mass, b.inverse_mass
+        total = ia + ib
+        if total == 0:
+            return
+        nx, ny = contact.normal
+        sa, sb = a.state, b.state
+        push = contact.depth / total
+        sa.x -= nx * push * ia
+        sa.y -= ny * push * ia
+        sb.x += nx * push * ib
+        sb.y += ny * push * ib
+        closing = (sb.vx - sa.vx) * nx + (sb.vy - sa.vy) * ny
+        if closing < 0:
+            impulse = -(1 + min(a.restitution, b.restitution)) * closing / total
+            sa.vx -= impulse * ia * nx
+            sa.vy -= impulse * ia * ny
+            sb.vx += impulse * ib * nx
+            sb.vy += impulse * ib * ny
+            a.on_ground = b.on_ground = False
+
+
+def scatter_debris(world, rng, x, y, vx, vy, count, speed, size=(2, 8)):
+    # Fragments thrown out from (x, y) on top of the velocity (vx, vy)
+    bodies = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        v = rng.uniform(0.3, 1.0) * speed
+        state = BoxState(
+            x + rng.uniform(-5, 5), y + rng.uniform(-5, 5),
+            rng.uniform(*size), rng.uniform(*size),
+            vx + math.cos(angle) * v, vy + math.sin(angle) * v,
+            rng.uniform(0, 360), rng.uniform(-15, 15),
+        )
+        bodies.append(world.add(Body(state, mass=state.width * state.height, tag="debris")))
+    return bodies
+
+
+def brute_force_pairs(world):
+    # Every pair whose bounding boxes overlap, for checking the broadphase
+    boxes = [body.bounds() for body in world.bodies]
+    return {(i, j) for i in range(len(boxes)) for j in range(i + 1, len(boxes))
+            if boxes[i][0] <= boxes[j][2] and boxes[j][0] <= boxes[i][2]
+            and boxes[i][1] <= boxes[j][3] and boxes[j][1] <= boxes[i][3]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the world with a pile of debris.")
+    parser.add_argument("--bodies", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    world = World()
+    scatter_debris(world, random.Random(0), 600, 400, 0, 0, args.bodies, 12)
+    start = time.perf_counter()
+    candidates = 0
+    for _ in range(args.steps):
+        world.step()
+        candidates += world.candidates
+    elapsed = time.perf_counter() - start
+    touching = brute_force_pairs(world)
+    found = world.broadphase()
+    n = len(world.bodies)
+    print(f"{n} bodies x {args.steps} steps in {elapsed:.3f}s ({elapsed / args.steps * 1000:.2f} ms/step)")
+    print(f"{candidates / args.steps:.0f} candidate pairs per step of {n * (n - 1) // 2} possible; "
+          f"{len(touching - found)} overlapping pairs missed, {len(found - touching)} extra")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Per-phase frame profiler for the game loop.
+
+Game.run calls begin() at the top of a frame, mark(PHASE) after each phase
+and end() once the frame is done. A phase marked more than once in a frame,
+such as update and particles when several simulation steps run, adds up.
+Timings land in a fixed-size ring buffer with the live particle count, clock
+FPS, quality tier and simulation steps run. The loop only takes this path
+while the profiler is enabled, so a disabled profiler costs one branch per
+frame.
+"""
+import csv
+import json
+import time
+
+import numpy as np
+import pygame
+
+from quality import TIERS
+
+PHASES = ("events", "update", "particles", "draw", "present", "idle")
+EVENTS, UPDATE, PARTICLES, DRAW, PRESENT, IDLE = range(len(PHASES))
+PHASE_COLORS = np.array([
+    (120, 120, 255),  # events
+    (0, 200, 255),    # update
+    (255, 165, 0),    # particles
+    (0, 220, 0),      # draw
+    (255, 60, 60),    # present
+    (70, 70, 70),     # idle
+], dtype=np.uint8)
+
+OVERLAY_FRAMES = 240
+OVERLAY_HEIGHT = 100
+OVERLAY_MS_SCALE = 2.0  # Graph pixels per millisecond
+OVERLAY_MARGIN = 10
+
+
+class FrameProfiler:
+    def __init__(self, capacity=3600, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.show_overlay = False
+        self.times = np.zeros((capacity, len(PHASES)))  # milliseconds
+        self.particles = np.zeros(capacity, dtype=np.int32)
+        self.fps = np.zeros(capacity, dtype=np.float32)
+        self.quality = np.zeros(capacity, dtype=np.int8)  # Index into quality.TIERS
+        self.ticks = np.zeros(capacity, dtype=np.int8)  # Simulation steps in the frame
+        self.index = 0
+        self.count = 0
+        self._row = self.times[0]
+        self._last = 0
+        self._graph = np.zeros((OVERLAY_FRAMES, OVERLAY_HEIGHT, 3), dtype=np.uint8)
+        self._graph_surface = pygame.Surface((OVERLAY_FRAMES, OVERLAY_HEIGHT))
+
+    def begin(self):
+        self._row = self.times[self.index]
+        self._row[:] = 0
+        self._last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self._row[phase] += (now - self._last) * 1e-6
+        self._last = now
+
+    def frame_ms(self):
+        # Working time of the frame so far, before any idle wait
+        return float(self._row[:IDLE].sum())
+
+    def end(self, particle_count, fps, quality=0, ticks=1):
+        self.particles[self.index] = particle_count
+        self.fps[self.index] = fps
+        self.quality[self.index] = quality
+        self.ticks[self.index] = ticks
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def recent(self, frames=None):
+        # Row indices of the last frames in recording order
+        frames = self.count if frames is None else min(frames, self.count)
+        return (np.arange(self.index - frames, self.index)) % self.capacity
+
+    def summary(self):
+        rows = self.recent()
+        if len(rows) == 0:
+            return {}
+        times = self.times[rows]
+        frame = times[:, :IDLE].sum(axis=1)
+        physics = times[:, UPDATE] + times[:, PARTICLES]
+        result = {
+            phase: {"mean_ms": float(times[:, i].mean()),
+                    "p50_ms": float(np.percentile(times[:, i], 50)),
+                    "p99_ms": float(np.percentile(times[:, i], 99))}
+            for i, phase in enumerate(PHASES)
+        }
+        result["frame"] = {"mean_ms": float(frame.mean()),
+                           "p50_ms": float(np.percentile(frame, 50)),
+                           "p99_ms": float(np.percentile(frame, 99))}
+        # Simulation against rendering: update and particles, per frame and
+        # per step, beside draw and present
+        result["physics"] = {"mean_ms": float(physics.mean()),
+                             "p50_ms": float(np.percentile(physics, 50)),
+                             "p99_ms": float(np.percentile(physics, 99)),
+                             "per_tick_ms": float(physics.sum() / max(int(self.ticks[rows].sum()), 1))}
+        render = times[:, DRAW] + times[:, PRESENT]
+        result["render"] = {"mean_ms": float(render.mean()),
+                            "p50_ms": float(np.percentile(render, 50)),
+                            "p99_ms": float(np.percentile(render, 99))}
+        result["frames"] = len(rows)
+        result["ticks_per_frame"] = float(self.ticks[rows].mean())
+        result["mean_fps"] = float(self.fps[rows].mean())
+        result["max_particles"] = int(self.particles[rows].max())
+        tiers = np.bincount(self.quality[rows], minlength=len(TIERS))
+        result["quality_frames"] = {tier.name: int(count) for tier, count in zip(TIERS, tiers)}
+        return result
+
+    def dump(self, path):
+        # CSV gets one row per frame, anything else gets a JSON summary plus frames
+        rows = self.recent()
+        header = list(PHASES) + ["particle_count", "fps", "quality", "ticks"]
+        columns = [self.times[rows, i] for i in range(len(PHASES))]
+        columns += [self.particles[rows], self.fps[rows], self.quality[rows], self.ticks[rows]]
+        records = [list(values) for values in zip(*(column.tolist() for column in columns))]
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(records)
+        else:
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "columns": header, "frames": records}, f)
+
+    def draw_overlay(self, screen, font):
+        # Stacked per-phase bars for the last OVERLAY_FRAMES frames, newest on
+        # the right, built as one pixel array and blitted once
+        rows = self.recent(OVERLAY_FRAMES)
+        graph = self._graph
+        graph[:] = 0
+        if len(rows):
+            heights = np.cumsum(self.times[rows] * OVERLAY_MS_SCALE, axis=1)
+            y = np.arange(OVERLAY_HEIGHT)[None, :]
+            from_bottom = OVERLAY_HEIGHT - 1 - y
+            phase = (from_bottom[:, :, None] >= heights[:, None, :]).sum(axis=2)
+            visible = phase < len(PHASES)
+            offset = OVERLAY_FRAMES - len(rows)
+            graph[offset:][visible] = PHASE_COLORS[phase[visible]]
+        # 16.6 ms budget line
+        budget = OVERLAY_HEIGHT - 1 - int(1000 / 60 * OVERLAY_MS_SCALE)
+        if budget >= 0:
+            graph[:, budget] = (255, 255, 255)
+        pygame.surfarray.blit_array(self._graph_surface, graph)
+
+        # Top-right corner: the latest frame's numbers above the graph
+        x = screen.get_width() - OVERLAY_FRAMES - OVERLAY_MARGIN
+        y = OVERLAY_MARGIN
+        rect = pygame.Rect(x, y, OVERLAY_FRAMES, 0)
+        if len(rows):
+            last = self.times[rows[-1]]
+            text = " ".join(f"{phase[:4]} {ms:.1f}" for phase, ms in zip(PHASES, last))
+            text += f"  fps {self.fps[rows[-1]]:.0f}  particles {self.particles[rows[-1]]}"
+            text += f"  quality {TIERS[self.quality[rows[-1]]].name}  ticks {self.ticks[rows[-1]]}"
+            label = font.render(text, True, (255, 255, 255), (0, 0, 0))
+            rect = screen.blit(label, (screen.get_width() - label.get_width() - OVERLAY_MARGIN, y))
+            y += label.get_height()
+        return rect.union(screen.blit(self._graph_surface, (x, y)))
@@ -0,0 +1,78 @@
+"""Adaptive quality governor that keeps the game inside its frame budget.
+
+Game.run reports how long each frame took to build, without the wait for
+the next tick. When the mean over the last WINDOW frames passes
+DOWNGRADE_LOAD of the budget, the governor drops one tier: fewer and
+shorter-lived particles, fewer stars, no translucent overlays. It climbs
+back only after the load has stayed under UPGRADE_LOAD for UPGRADE_FRAMES,
+and every change waits for a full window at the new tier first. The gap
+between those thresholds stops it from flipping back and forth at the edge
+of the budget.
+"""
+from dataclasses import dataclass
+
+from lander_sim import FPS
+
+FRAME_BUDGET_MS = 1000 / FPS
+WINDOW = 15  # Frames averaged per decision
+DOWNGRADE_LOAD = 0.9  # Share of the budget above which quality drops
+UPGRADE_LOAD = 0.5  # ... and below which it may rise again
+UPGRADE_FRAMES = 2 * FPS  # Consecutive frames under UPGRADE_LOAD before it rises
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    name: str
+    emission: float  # Share of each effect's particles that are emitted
+    lifetime: float  # Scale on particle lifetimes
+    stars: int
+    overlays: bool  # Translucent overlays such as the catch zone
+
+
+TIERS = (
+    QualityTier("high", 1.0, 1.0, 50, True),
+    QualityTier("medium", 0.6, 0.8, 35, True),
+    QualityTier("low", 0.35, 0.6, 20, False),
+    QualityTier("minimal", 0.15, 0.4, 10, False),
+)
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, tiers=TIERS, window=WINDOW, upgrade_frames=UPGRADE_FRAMES):
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.window = window
+        self.upgrade_frames = upgrade_frames
+        self.level = 0  # Index into tiers; 0 is the best
+        self.times = [0.0] * window  # Ring of recent frame times, ms
+        self.frames = 0
+        self.since_change = 0
+        self.quiet = 0  # Consecutive frames with the load under UPGRADE_LOAD
+        self.changes = 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def load(self):
+        # Mean recent frame time as a share of the budget
+        return sum(self.times) / (len(self.times) * self.budget_ms)
+
+    def record(self, frame_ms):
+        # Returns True when this frame moved the tier
+        self.times[self.frames % self.window] = frame_ms
+        self.frames += 1
+        self.since_change += 1
+        if self.since_change < self.window:
+            return False
+        load = self.load()
+        self.quiet = self.quiet + 1 if load < UPGRADE_LOAD else 0
+        if load > DOWNGRADE_LOAD and self.level < len(self.tiers) - 1:
+            self.level += 1
+        elif self.quiet >= self.upgrade_frames and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        self.since_change = self.quiet = 0
+        self.changes += 1
+        return True
@@ -0,0 +1,207 @@
+"""Compact input recordings and headless max-speed replay.
+
+A recording is a short file header followed by one record per episode: the
+episode seed, level, mode (single screen, scrolling world or booster catch),
+outcome and the per-frame control state packed as a 4-bit mask (thrust, left,
+right, boost), two frames per byte, zlib-compressed. Version 1 files, which
+predate the world mode, still load.
+Replaying feeds the frames back through Game.update with no display and no
+frame cap; the outcome and score must come out bit-identical.
+
+    python starship_lander.py --record run.slr
+    python replay.py run.slr --verify
+    python replay.py run.slr --profile
+    python replay.py run.slr --autopilot
+"""
+import argparse
+import os
+import struct
+import time
+import zlib
+
+from lander_sim import CONTROL_STATES, PLAYING
+
+MAGIC = b"SLRP"
+VERSION = 2
+FILE_HEADER = struct.Struct("<4sB")
+# seed, level, status code, flags, score, frame count, payload size
+EPISODE_HEADER = struct.Struct("<IHBBiII")
+EPISODE_HEADER_V1 = struct.Struct("<IHBiII")
+FLAG_WORLD = 1
+FLAG_CATCH = 2
+STATUS_CODES = {PLAYING: 0, "win": 1, "lose": 2}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+
+def pack_frames(frames):
+    # Two 4-bit control masks per byte, first frame in the low nibble
+    data = bytearray((len(frames) + 1) // 2)
+    for i, bits in enumerate(frames):
+        data[i >> 1] |= bits << (4 * (i & 1))
+    return zlib.compress(bytes(data), 9)
+
+
+def unpack_frames(payload, count):
+    data = zlib.decompress(payload)
+    return [(data[i >> 1] >> (4 * (i & 1))) & 0xF for i in range(count)]
+
+
+class Episode:
+    def __init__(self, seed, level, frames=None, status=PLAYING, score=0, world=False, catch=False):
+        self.seed = seed
+        self.level = level
+        self.world = world
+        self.catch = catch
+        self.frames = frames if frames is not None else []
+        self.status = status
+        self.score = score
+
+    def controls(self):
+        return [CONTROL_STATES[bits] for bits in self.frames]
+
+
+class InputRecorder:
+    # Appends each finished episode to the file as soon as it ends, so a crash
+    # loses at most the episode in progress
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.file.flush()
+        self.episode = None
+        self.written = 0  # Episodes in the file so far
+
+    def begin(self, seed, level, world=False, catch=False):
+        self.episode = Episode(seed, level, world=world, catch=catch)
+
+    def record(self, controls):
+        if self.episode is not None:
+            self.episode.frames.append(controls.bits)
+
+    def end(self, status, score):
+        episode = self.episode
+        if episode is None or not episode.frames:
+            return
+        payload = pack_frames(episode.frames)
+        flags = (FLAG_WORLD if episode.world else 0) | (FLAG_CATCH if episode.catch else 0)
+        self.file.write(EPISODE_HEADER.pack(episode.seed, episode.level, STATUS_CODES[status], flags, score,
+                                            len(episode.frames), len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        self.episode = None
+        self.written += 1
+
+    def reference(self):
+        # Where the last written episode is: "path#index"
+        return f"{self.path}#{self.written - 1}" if self.written else None
+
+    def close(self):
+        self.file.close()
+
+
+def read_recording(path):
+    episodes = []
+    with open(path, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f"{path} is not a version {VERSION} Starship Lander recording")
+        episode_header = EPISODE_HEADER if version == VERSION else EPISODE_HEADER_V1
+        while True:
+            header = f.read(episode_header.size)
+            if len(header) < episode_header.size:
+                break
+            if version == VERSION:
+                seed, level, status, flags, score, count, size = episode_header.unpack(header)
+            else:
+                seed, level, status, score, count, size = episode_header.unpack(header)
+                flags = 0
+            payload = f.read(size)
+            if len(payload) < size:
+                break  # Truncated by a crash mid-write
+            episodes.append(Episode(seed, level, unpack_frames(payload, count), STATUS_NAMES[status], score,
+                                    bool(flags & FLAG_WORLD), bool(flags & FLAG_CATCH)))
+    return episodes
+
+
+def replay_episode(game, episode):
+    # Runs one recorded episode through Game.update; returns (status, score)
+    game.level = episode.level
+    game.world = episode.world
+    game.catch = episode.catch
+    game.reset_game(episode.seed)
+    game.game_state = PLAYING
+    for controls in episode.controls():
+        if game.game_state != PLAYING:
+            break
+        game.update(controls)
+    return game.game_state, game.score
+
+
+def autopilot_episode(game, episode):
+    # The rollout autopilot on the recorded episode's seed, level and mode, as
+    # a baseline for the recorded score. It plans without a time budget, so
+    # the baseline is the same on every machine.
+    from autopilot import Autopilot, CatchAutopilot
+    pilot = (CatchAutopilot if episode.catch else Autopilot)(episode.seed, budget_ms=None)
+    game.level = episode.level
+    game.world = episode.world
+    game.catch = episode.catch
+    game.reset_game(episode.seed)
+    game.game_state = PLAYING
+    while game.game_state == PLAYING:
+        game.update(pilot(game.sim))
+    return game.game_state, game.score
+
+
+def headless_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from starship_lander import Game
+    return Game(sound=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Starship Lander recording headless at full speed.")
+    parser.add_argument("recording")
+    parser.add_argument("--verify", action="store_true", help="exit non-zero if any outcome differs")
+    parser.add_argument("--profile", action="store_true", help="run the replay under cProfile")
+    parser.add_argument("--autopilot", action="store_true", help="also fly each episode with the autopilot")
+    args = parser.parse_args()
+
+    episodes = read_recording(args.recording)
+    game = headless_game()
+
+    def run():
+        results = []
+        for episode in episodes:
+            start = time.perf_counter()
+            results.append((replay_episode(game, episode), time.perf_counter() - start))
+        return results
+
+    if args.profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        results = profiler.runcall(run)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    else:
+        results = run()
+
+    mismatches = 0
+    for i, (episode, ((status, score), elapsed)) in enumerate(zip(episodes, results)):
+        ok = (status, score) == (episode.status, episode.score)
+        mismatches += not ok
+        frames = len(episode.frames)
+        mode = " catch" if episode.catch else " world" if episode.world else ""
+        baseline = ""
+        if args.autopilot:
+            baseline = " autopilot={}/{}".format(*autopilot_episode(game, episode))
+        print(f"episode {i}: seed={episode.seed} level={episode.level}{mode} frames={frames} "
+              f"recorded={episode.status}/{episode.score} replayed={status}/{score}{baseline} "
+              f"{'ok' if ok else 'MISMATCH'} ({frames / max(elapsed, 1e-9):.0f} frames/s)")
+    if args.verify and mismatches:
+        raise SystemExit(f"{mismatches} of {len(episodes)} episodes did not reproduce")
+
+
+if __name__ == "__main__":
+    main()
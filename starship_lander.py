@@ -1,38 +1,35 @@
 import pygame
+import numpy as np
 import math
 import random
 import os
-import json
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
-
-# Constants
-WIDTH, HEIGHT = 1200, 800
-FPS = 60
-GRAVITY = 0.2  # Reduced for space-like feel
-THRUST_POWER = 0.8
-SIDE_THRUST = 0.3
-EMERGENCY_BOOST = 3.0
-MAX_FUEL = 2000
-LANDING_VELOCITY_THRESHOLD = 3
-LANDING_ANGLE_THRESHOLD = 10  # degrees
-
-# SpaceX Starship dimensions (scaled for game)
-BOOSTER_HEIGHT = 70
-BOOSTER_WIDTH = 9
-STARSHIP_HEIGHT = 50
-STARSHIP_WIDTH = 9
-FULL_STACK_HEIGHT = BOOSTER_HEIGHT + STARSHIP_HEIGHT
-TOWER_HEIGHT = 143
-CHOPSTICKS_LENGTH = 25
-
-# Game phases
-PHASE_LAUNCH = "launch"
-PHASE_SEPARATION = "separation"
-PHASE_RETURN = "return"
-PHASE_CATCH = "catch"
+import time
+import functools
+from collections import OrderedDict
+
+# Constants, state and physics come from the headless simulation core
+from lander_sim import (
+    WIDTH, HEIGHT, FPS, BOOST_FUEL, MAX_FUEL,
+    BOOSTER_HEIGHT, BOOSTER_WIDTH, STARSHIP_HEIGHT, STARSHIP_WIDTH,
+    PHASE_RETURN,
+    EVENT_LANDED, EVENT_CRASHED, EVENT_SEPARATION,
+    PAD_X, PAD_Y, MAX_LEVEL, CHUNK_WIDTH, TERRAIN_STEP,
+    Controls, ShipState, BoosterState, StarshipState, PadState, SimState,
+    apply_level, step, step_ship, step_booster, step_starship, pad_contains, altitude, generate_terrain, terrain_heights,
+    Heightfield, ChunkedTerrain, new_mission, MODES, STATUSES,
+)
+from vector_sim import height_at, slope_at
+from catch_sim import (
+    MAST_WIDTH, ARM_THICKNESS, CATCH_ZONE_WIDTH, CATCH_ZONE_HEIGHT,
+    TowerState, new_catch, apply_catch_level, step_catch,
+)
+from autopilot import Autopilot, CatchAutopilot
+from leaderboard import LEADERBOARD_PATH, Leaderboard, Run
+from quality import QualityGovernor
+from profiler import FrameProfiler, EVENTS, UPDATE, PARTICLES, DRAW, PRESENT, IDLE
+from audio import SYNTHS, VoicePool
+from netplay import place
+from assets import ASSET_CACHE_DIR, AssetLoader, SoundAsset, SpriteSheet, init_audio, init_fonts, init_video
 
 # Colors
 BLACK = (0, 0, 0)
@@ -43,588 +40,1196 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 ORANGE = (255, 165, 0)
 
-class Particle:
-    def __init__(self, x, y, vx, vy, color, lifetime):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
+# Game loop
+SIM_RATE = FPS  # Fixed simulation steps per second; scores and recordings count these
+SIM_STEP = 1 / SIM_RATE  # seconds
+MAX_CATCH_UP = 5  # Most steps run for one frame; beyond that the game slows down instead
+
+# Engine loop volume
+ENGINE_VOLUME = 0.7  # Main engine burning
+BOOST_VOLUME = 1.0  # Emergency boost on top
+
+# Text
+TITLE_FONT_SIZE = 48
+TEXT_FONT_SIZE = 24
+TEXT_CACHE_SIZE = 256
+NUMBER_GLYPHS = "0123456789.-"
+MENU_TOP_RUNS = 5  # Leaderboard entries listed on the menu
+
+# Vehicle sprites
+ROTATION_STEP = 2  # degrees between pre-rendered rotations
+ROTATION_SUBSTEPS = 4  # finer sprites made on demand when interpolating
+ROTATION_CACHE_EXTRA = 180  # sub-step sprites kept per body before eviction
+BOOSTER_BODY_COLOR = (169, 169, 169)  # Stainless steel color
+BOOSTER_FIN_COLOR = (105, 105, 105)
+BOOSTER_FIN_SIZE = 8
+BOOSTER_ENGINE_COLOR = (255, 100, 0)
+STARSHIP_BODY_COLOR = (192, 192, 192)  # Stainless steel
+STARSHIP_NOSE_HEIGHT = 5
+
+# Scrolling world
+CAMERA_LEAD = 0.45  # Followed ship sits this far down the screen
+STAR_PARALLAX = 0.1  # Star layer scrolls at this fraction of the camera
+PAD_MARKER_SIZE = 10
+
+# Race opponent, drawn from its snapshots
+GHOST_TINT = (120, 220, 255, 110)  # Multiplies the opponent's body colours and alpha
+
+# Particle rendering
+PARTICLE_ALPHA_LEVELS = 16
+PARTICLE_RADIUS = 2
+PARTICLE_STYLES = [((255, 150, 0), PARTICLE_RADIUS), (ORANGE, PARTICLE_RADIUS), (RED, PARTICLE_RADIUS)]
+
+# Particle physics, per simulation step
+PARTICLE_GRAVITY = 0.08
+PARTICLE_DRAG = 0.03  # Share of velocity lost to the air
+PARTICLE_BOUNCE = 0.35  # Share of the speed into the ground that comes back out
+PARTICLE_FRICTION = 0.6  # Share of the speed along the ground kept on impact
+PARTICLE_SETTLE_SPEED = 0.4  # Slower rebounds than this come to rest
+
+def read_controls(keys):
+    # Map the pygame key state onto the simulation's input state
+    return Controls(
+        thrust=bool(keys[pygame.K_UP] or keys[pygame.K_w]),
+        left=bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+        right=bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+        boost=bool(keys[pygame.K_SPACE]),
+    )
+
+_fonts = {}
+
+def get_font(size):
+    # Shared font registry: each size is loaded once for the whole game
+    font = _fonts.get(size)
+    if font is None:
+        init_fonts()
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(size, text, color):
+    return get_font(size).render(text, True, color)
+
+def blit_centered(screen, surface, y):
+    return screen.blit(surface, (WIDTH//2 - surface.get_width()//2, y))
+
+class NumberGlyphs:
+    # Digits rasterized once and composited into fixed-width cells, so a
+    # changing readout never renders a whole new string
+    def __init__(self, size, color):
+        font = get_font(size)
+        self.size = size
         self.color = color
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifetime -= 1
-
-    def draw(self, screen):
-        if self.lifetime > 0:
-            alpha = int(255 * (self.lifetime / self.max_lifetime))
-            # Create a surface for alpha blending
-            particle_surface = pygame.Surface((4, 4), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, (*self.color[:3], alpha), (2, 2), 2)
-            screen.blit(particle_surface, (int(self.x) - 2, int(self.y) - 2))
+        self.glyphs = {char: font.render(char, True, color) for char in NUMBER_GLYPHS}
+        self.cell = max(glyph.get_width() for glyph in self.glyphs.values())
+
+    def layout(self, text, x, y):
+        # Blit list for text starting at (x, y), and the x where it ends
+        if any(char not in self.glyphs for char in text):
+            surface = render_text(self.size, text, self.color)
+            return [(surface, (x, y))], x + surface.get_width()
+        blits = []
+        for char in text:
+            glyph = self.glyphs[char]
+            blits.append((glyph, (x + (self.cell - glyph.get_width()) // 2, y)))
+            x += self.cell
+        return blits, x
+
+class RotationCache:
+    # Rotated copies of an upright body sprite whose centre is the vehicle's
+    # (x, y). Whole steps are rendered up front; with interpolation, angles
+    # between steps get sub-step sprites on first use, and the least recently
+    # used of those are evicted once there are more than `extra`.
+    def __init__(self, body, step=ROTATION_STEP, substeps=ROTATION_SUBSTEPS, extra=ROTATION_CACHE_EXTRA,
+                 steps=None):
+        self.body = body
+        self.step = step
+        self.substeps = substeps
+        self.extra = extra
+        # Whole-step sprites may come ready-made from the asset loader
+        self.steps = steps or [self.rotate(i * step) for i in range(round(360 / step))]
+        self.fine = OrderedDict()
+
+    def rotate(self, angle):
+        # Game angles turn clockwise, pygame's counter-clockwise
+        return pygame.transform.rotate(self.body, -angle)
+
+    def get(self, angle, interpolate=False):
+        angle %= 360
+        if interpolate:
+            fine_step = self.step / self.substeps
+            index = round(angle / fine_step) % round(360 / fine_step)
+            if index % self.substeps:
+                sprite = self.fine.get(index)
+                if sprite is None:
+                    sprite = self.fine[index] = self.rotate(index * fine_step)
+                    if len(self.fine) > self.extra:
+                        self.fine.popitem(last=False)
+                else:
+                    self.fine.move_to_end(index)
+                return sprite
+            return self.steps[index // self.substeps]
+        return self.steps[round(angle / self.step) % len(self.steps)]
+
+    def blit(self, screen, x, y, angle, interpolate=False):
+        sprite = self.get(angle, interpolate)
+        return screen.blit(sprite, sprite.get_rect(center=(round(x), round(y))))
+
+_rotation_caches = {}
+_asset_loader = None  # The running Game's loader, which rotation_cache draws on
+_asset_loaders = {}  # (sound, cache directory) -> loader, reused by later Games
+
+def sprite_name(render_body, size):
+    return "sprite-" + "-".join([render_body.__name__, *map(str, size)])
+
+def rotation_cache(render_body, *size):
+    # One cache per body renderer and size, shared by every vehicle instance;
+    # sheets in the asset manifest come from the loader
+    key = (render_body, size)
+    cache = _rotation_caches.get(key)
+    if cache is None:
+        name = sprite_name(render_body, size)
+        if _asset_loader is not None and name in _asset_loader and _asset_loader.get(name):
+            body, steps = _asset_loader.get(name)
+            cache = RotationCache(body, steps=steps)
+        else:
+            cache = RotationCache(render_body(*size))
+        _rotation_caches[key] = cache
+    return cache
+
+def body_surface(half_width, half_height):
+    size = (2 * math.ceil(half_width) + 2, 2 * math.ceil(half_height) + 2)
+    return pygame.Surface(size, pygame.SRCALPHA), size[0] / 2, size[1] / 2
+
+def render_ship_body(width, height):
+    surface, cx, cy = body_surface(width/2, height/2)
+    pygame.draw.polygon(surface, WHITE, [
+        (cx, cy - height/2),
+        (cx - width/2, cy + height/2),
+        (cx + width/2, cy + height/2)
+    ])
+    return surface
+
+def render_booster_body(width, height, engine_count):
+    engine_rows = engine_count // 11
+    surface, cx, cy = body_surface(width/2 + BOOSTER_FIN_SIZE, height/2 + 3 * engine_rows + 2)
+    pygame.draw.rect(surface, BOOSTER_BODY_COLOR, (cx - width/2, cy - height/2, width, height))
+
+    # Grid fins (simplified)
+    fin_size = BOOSTER_FIN_SIZE
+    pygame.draw.rect(surface, BOOSTER_FIN_COLOR, (cx - width/2 - fin_size, cy - height/4, fin_size, fin_size))
+    pygame.draw.rect(surface, BOOSTER_FIN_COLOR, (cx + width/2, cy - height/4, fin_size, fin_size))
+
+    # Engines at bottom, 11 per row (approximate)
+    engine_y = cy + height/2
+    for i in range(engine_rows):
+        for j in range(11):
+            if i * 11 + j < engine_count:
+                engine_x = cx - width/2 + (j + 0.5) * (width / 11)
+                pygame.draw.circle(surface, BOOSTER_ENGINE_COLOR, (int(engine_x), int(engine_y + i * 3)), 2)
+    return surface
+
+def render_starship_body(width, height):
+    surface, cx, cy = body_surface(width/2, height/2 + STARSHIP_NOSE_HEIGHT)
+    pygame.draw.rect(surface, STARSHIP_BODY_COLOR, (cx - width/2, cy - height/2, width, height))
+
+    # Nose cone on top of the body
+    top = cy - height/2
+    pygame.draw.polygon(surface, STARSHIP_BODY_COLOR, [
+        (cx, top - STARSHIP_NOSE_HEIGHT),
+        (cx - width/2, top),
+        (cx + width/2, top)
+    ])
+    return surface
+
+def render_ghost_body(render_body, *size):
+    # The same body, tinted and see-through
+    surface = render_body(*size)
+    surface.fill(GHOST_TINT, special_flags=pygame.BLEND_RGBA_MULT)
+    return surface
+
+# Vehicle sprites baked by the asset loader: (renderer, size)
+SPRITES = (
+    (render_ship_body, (ShipState.width, ShipState.height)),
+    (render_booster_body, (BOOSTER_WIDTH, BOOSTER_HEIGHT, BoosterState.engine_count)),
+    (render_starship_body, (STARSHIP_WIDTH, STARSHIP_HEIGHT)),
+)
+# Sound effects: (name, file, volume); missing files are synthesized
+SOUNDS = (
+    ("thrust", "thrust.wav", 0.3),
+    ("crash", "crash.wav", 0.5),
+    ("success", "success.wav", 0.5),
+)
+
+def asset_manifest(sound=True):
+    # Sprite sheets, then sounds. Fonts are not in it: get_font makes them on
+    # the game's thread, and the mixer is started here, on the same thread.
+    manifest = [SpriteSheet(sprite_name(render, size), render, size, ROTATION_STEP) for render, size in SPRITES]
+    if sound:
+        mixer = pygame.mixer.get_init() if init_audio() else None
+        manifest += [SoundAsset(name, path, volume, SYNTHS[name], mixer) for name, path, volume in SOUNDS]
+    return manifest
+
+def load_assets(sound=True, cache_dir=ASSET_CACHE_DIR):
+    # Starts loading in the background, once per process for each setting
+    global _asset_loader
+    key = (sound, cache_dir)
+    loader = _asset_loaders.get(key)
+    if loader is None:
+        loader = _asset_loaders[key] = AssetLoader(asset_manifest(sound), cache_dir).start()
+    _asset_loader = loader
+    return loader
+
+class ParticleAtlas:
+    # Pre-rendered particle sprites keyed by (color, quantized alpha, radius).
+    # Sprites live in one flat list indexed by style * alpha_levels + alpha bucket
+    # so a whole frame can be looked up from NumPy index arrays.
+    def __init__(self, alpha_levels=PARTICLE_ALPHA_LEVELS):
+        self.alpha_levels = alpha_levels
+        self.sprites = []
+
+    def bake(self, color, radius):
+        size = radius * 2
+        for bucket in range(self.alpha_levels):
+            alpha = round(255 * (bucket + 1) / self.alpha_levels)
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color[:3], alpha), (radius, radius), radius)
+            self.sprites.append(sprite)
+
+    def buckets(self, lifetime, max_lifetime):
+        levels = self.alpha_levels
+        buckets = (lifetime * levels / max_lifetime).astype(np.int32)
+        return np.clip(buckets, 0, levels - 1, out=buckets)
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    # Struct-of-arrays particle storage: live particles occupy [0, count) in
+    # every array, dead ones are swap-removed so the live range stays packed.
+    # The palette holds (color, radius) styles; each one is baked into the
+    # sprite atlas when first seen.
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.palette = []
+        self.palette_index = {}
+        self.palette_radius = np.zeros(0, dtype=np.int32)
+        self.atlas = ParticleAtlas()
+        self.rng = np.random.default_rng()
+        self.ground = None  # (heights, rise, world x of column 0) of the ground particles land on
+        self.emission = 1.0  # Quality scales on what effects ask for
+        self.lifetime_scale = 1.0
+        self._allocate(capacity)
+        for color, radius in PARTICLE_STYLES:
+            self.color_index(color, radius)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetime = np.ones(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+
+    def _arrays(self):
+        return (self.pos, self.vel, self.lifetime, self.max_lifetime, self.color)
+
+    def _grow(self, needed):
+        old = self._arrays()
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        self._allocate(capacity)
+        for new, arr in zip(self._arrays(), old):
+            new[:self.count] = arr[:self.count]
+
+    def color_index(self, color, radius=PARTICLE_RADIUS):
+        style = (tuple(color[:3]), radius)
+        index = self.palette_index.get(style)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(style)
+            self.palette_index[style] = index
+            self.palette_radius = np.append(self.palette_radius, np.int32(radius))
+            self.atlas.bake(*style)
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def set_quality(self, emission, lifetime_scale):
+        self.emission = emission
+        self.lifetime_scale = lifetime_scale
+
+    def quota(self, n):
+        # How many of an effect's n particles to emit at the current quality
+        return max(1, round(n * self.emission))
+
+    def emit(self, n, x, y, vx, vy, color, lifetime, radius=PARTICLE_RADIUS):
+        # Positions/velocities may be scalars or arrays of length n
+        if n <= 0:
+            return
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+        live = slice(self.count, self.count + n)
+        self.pos[live, 0] = x
+        self.pos[live, 1] = y
+        self.vel[live, 0] = vx
+        self.vel[live, 1] = vy
+        lifetime = lifetime * self.lifetime_scale
+        self.lifetime[live] = lifetime
+        self.max_lifetime[live] = lifetime
+        self.color[live] = self.color_index(color, radius)
+        self.count += n
 
     def add_particle(self, x, y, vx, vy, color, lifetime):
-        self.particles.append(Particle(x, y, vx, vy, color, lifetime))
-
-    def update(self):
-        self.particles = [p for p in self.particles if p.lifetime > 0]
-        for particle in self.particles:
-            particle.update()
-
-    def draw(self, screen):
-        for particle in self.particles:
-            particle.draw(screen)
-
-class Booster:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = 0
-        self.vy = 0
-        self.angle = 0
-        self.fuel = MAX_FUEL
-        self.thrusting = False
-        self.left_thrust = False
-        self.right_thrust = False
-        self.width = BOOSTER_WIDTH
-        self.height = BOOSTER_HEIGHT
-        self.engine_count = 33
-        self.mass = 200000  # kg (empty booster mass)
-        self.phase = PHASE_LAUNCH
-
-    def update(self, keys, gravity, wind_force, thrust_sound=None):
-        # Apply gravity
-        self.vy += gravity
-
-        # Apply wind
-        self.vx += wind_force
-
-        # Launch phase - automatic full thrust upward
-        if self.phase == PHASE_LAUNCH:
-            if self.fuel > 0:
-                thrust_y = -THRUST_POWER * 2  # Strong upward thrust
-                self.vy += thrust_y
-                self.fuel -= 2
-                if thrust_sound and not self.thrusting:
-                    thrust_sound.play(-1)
-                self.thrusting = True
-            else:
-                self.thrusting = False
-                if thrust_sound:
-                    thrust_sound.stop()
-
-        # Return phase - player controlled
-        elif self.phase == PHASE_RETURN:
-            self.thrusting = keys[pygame.K_UP] or keys[pygame.K_w]
-            self.left_thrust = keys[pygame.K_LEFT] or keys[pygame.K_a]
-            self.right_thrust = keys[pygame.K_RIGHT] or keys[pygame.K_d]
-
-            if self.thrusting and self.fuel > 0:
-                thrust_x = math.sin(math.radians(self.angle)) * THRUST_POWER
-                thrust_y = -math.cos(math.radians(self.angle)) * THRUST_POWER
-                self.vx += thrust_x
-                self.vy += thrust_y
-                self.fuel -= 1
-                if thrust_sound and not hasattr(self, 'was_thrusting'):
-                    thrust_sound.play(-1)
-                self.was_thrusting = True
-            elif thrust_sound and hasattr(self, 'was_thrusting') and self.was_thrusting:
-                thrust_sound.stop()
-                self.was_thrusting = False
-
-            # Side thrust for rotation
-            if self.left_thrust and self.fuel > 0:
-                self.angle -= 1.5
-                self.fuel -= 0.3
-            if self.right_thrust and self.fuel > 0:
-                self.angle += 1.5
-                self.fuel -= 0.3
-
-        # Update position
-        self.x += self.vx
-        self.y += self.vy
-
-    def draw(self, screen, particle_system):
-        # Draw booster as rectangular body with engines
-        body_color = (169, 169, 169)  # Stainless steel color
-        pygame.draw.rect(screen, body_color, (self.x - self.width/2, self.y - self.height/2, self.width, self.height))
-
-        # Draw grid fins (simplified)
-        fin_color = (105, 105, 105)
-        fin_size = 8
-        pygame.draw.rect(screen, fin_color, (self.x - self.width/2 - fin_size, self.y - self.height/4, fin_size, fin_size))
-        pygame.draw.rect(screen, fin_color, (self.x + self.width/2, self.y - self.height/4, fin_size, fin_size))
-
-        # Draw engines at bottom
-        engine_color = (255, 100, 0)
-        engine_y = self.y + self.height/2
-        for i in range(self.engine_count // 11):  # 3 rows
-            for j in range(11):  # 11 engines per row (approximate)
-                if i * 11 + j < self.engine_count:
-                    engine_x = self.x - self.width/2 + (j + 0.5) * (self.width / 11)
-                    pygame.draw.circle(screen, engine_color, (int(engine_x), int(engine_y + i * 3)), 2)
-
-        # Add thrust particles during thrusting
+        self.emit(1, x, y, vx, vy, color, lifetime)
+
+    def update(self, view=None):
+        # Gravity and drag, then a bounce off the ground for every particle
+        # that went into it. Particles outside view (a world-space Rect), if
+        # given, are dropped rather than simulated.
+        n = self.count
+        if n == 0:
+            return
+        pos, vel = self.pos[:n], self.vel[:n]
+        vel[:, 1] += PARTICLE_GRAVITY
+        vel *= 1 - PARTICLE_DRAG
+        pos += vel
+        self.lifetime[:n] -= 1
+        if self.ground is not None:
+            self.collide(pos, vel)
+        if view is not None:
+            outside = ((pos[:, 0] < view.left) | (pos[:, 0] >= view.right) |
+                       (pos[:, 1] < view.top) | (pos[:, 1] >= view.bottom))
+            self.lifetime[:n][outside] = 0
+        self._compact()
+
+    def collide(self, pos, vel):
+        # Particles below the ground go back onto it. The speed into the
+        # surface reflects, scaled by PARTICLE_BOUNCE, the speed along it is
+        # scaled by PARTICLE_FRICTION, and a rebound slower than
+        # PARTICLE_SETTLE_SPEED leaves the particle at rest where it is.
+        heights, rise, origin = self.ground
+        x = pos[:, 0] - origin
+        ground = height_at(heights, rise, 0, x)
+        hit = np.flatnonzero(pos[:, 1] > ground)
+        if len(hit) == 0:
+            return
+        slope = slope_at(heights, rise, 0, x[hit])
+        # Unit normal out of the ground, which is up the screen: (slope, -1)
+        length = np.sqrt(1 + slope * slope)
+        normal = np.stack((slope / length, -1 / length), axis=1)
+        v = vel[hit].astype(np.float64)
+        into = (v * normal).sum(axis=1)  # Negative while moving into the ground
+        tangent = v - into[:, None] * normal
+        out = tangent * PARTICLE_FRICTION - into[:, None] * normal * PARTICLE_BOUNCE
+        out[-into * PARTICLE_BOUNCE < PARTICLE_SETTLE_SPEED] = 0
+        vel[hit] = out
+        pos[hit, 1] = ground[hit]
+
+    def _compact(self):
+        # Swap-remove: holes in the surviving prefix are filled with the live
+        # particles found past it, so no array is reallocated or shifted
+        n = self.count
+        alive = self.lifetime[:n] > 0
+        n_alive = int(np.count_nonzero(alive))
+        if n_alive == n:
+            return
+        holes = np.flatnonzero(~alive[:n_alive])
+        movers = np.flatnonzero(alive[n_alive:n]) + n_alive
+        for arr in self._arrays():
+            arr[holes] = arr[movers]
+        self.count = n_alive
+
+    def clear(self):
+        self.count = 0
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def set_terrain(self, terrain, pad=None):
+        # Particles bounce off the ground and the pad; None lets them fall through
+        if terrain is None:
+            self.ground = None
+        else:
+            self.set_ground(terrain.heights, terrain.rise, 0, pad)
+
+    def set_ground(self, heights, rise, origin, pad=None):
+        # Height lookup for the columns from world x origin on. A pad in
+        # range raises the columns under it to its top.
+        heights = np.frombuffer(heights)
+        rise = np.frombuffer(rise)
+        if pad is not None:
+            first = max(math.floor(pad.x - pad.width/2 - origin), 0)
+            last = min(math.ceil(pad.x + pad.width/2 - origin), len(heights) - 1)
+            if first <= last:
+                heights = heights.copy()
+                np.minimum(heights[first:last + 1], pad.y - pad.height, out=heights[first:last + 1])
+                rise = np.diff(heights)
+        self.ground = (heights[None], rise[None], origin)
+
+    def draw(self, screen, offset=(0, 0), alpha=1.0):
+        # offset is the world position of the screen's top-left corner;
+        # particles that would land off screen are not blitted. alpha < 1
+        # draws them that far from the last simulation step to the current one
+        n = self.count
+        if n == 0:
+            return None
+        atlas = self.atlas
+        color = self.color[:n]
+        lifetime = self.lifetime[:n]
+        max_lifetime = self.max_lifetime[:n]
+        positions = self.pos[:n]
+        if alpha < 1:
+            positions = positions - self.vel[:n] * np.float32(1 - alpha)
+        if offset != (0, 0):
+            positions = positions - np.array(offset, dtype=np.float32)
+            width, height = screen.get_size()
+            margin = 2 * int(self.palette_radius.max())
+            visible = ((positions[:, 0] > -margin) & (positions[:, 0] < width + margin) &
+                       (positions[:, 1] > -margin) & (positions[:, 1] < height + margin))
+            if not visible.all():
+                if not visible.any():
+                    return None
+                positions, color = positions[visible], color[visible]
+                lifetime, max_lifetime = lifetime[visible], max_lifetime[visible]
+        sprite_ids = color * atlas.alpha_levels + atlas.buckets(lifetime, max_lifetime)
+        radii = self.palette_radius[color]
+        positions = positions.astype(np.int32) - radii[:, None]
+        sprites = map(atlas.sprites.__getitem__, sprite_ids.tolist())
+        screen.blits(zip(sprites, map(tuple, positions.tolist())), doreturn=False)
+        # Bounding box of everything drawn, for dirty-rect updates
+        low = positions.min(axis=0)
+        high = positions.max(axis=0) + 2 * int(radii.max())
+        return pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]), int(high[1] - low[1]))
+
+class Interpolated:
+    # Vehicle pose between simulation steps: remember() keeps the pose from
+    # before a step, and pose(alpha) lies that share of the way to the
+    # current one
+    previous = None
+
+    def remember(self):
+        self.previous = (self.x, self.y, self.angle)
+
+    def pose(self, alpha):
+        if self.previous is None or alpha >= 1:
+            return self.x, self.y, self.angle
+        x, y, angle = self.previous
+        if abs(self.x - x) > WIDTH / 2:
+            return self.x, self.y, self.angle  # Wrapped around the screen edge
+        return x + (self.x - x) * alpha, y + (self.y - y) * alpha, angle + (self.angle - angle) * alpha
+
+    def blit(self, screen, sprites, offset, alpha):
+        x, y, angle = self.pose(alpha)
+        return sprites.blit(screen, x - offset[0], y - offset[1], angle, interpolate=alpha < 1)
+
+class Booster(Interpolated, BoosterState):
+    def update(self, controls, gravity, wind_force):
+        return step_booster(self, controls, gravity, wind_force)
+
+    def draw(self, screen, offset=(0, 0), alpha=1.0):
+        # Draw booster as rectangular body with grid fins and engines
+        sprites = rotation_cache(render_booster_body, self.width, self.height, self.engine_count)
+        return self.blit(screen, sprites, offset, alpha)
+
+    def emit_exhaust(self, particle_system):
+        # Thrust particles, once per simulation step
         if self.thrusting:
-            for _ in range(10):
-                particle_system.add_particle(
-                    self.x + random.uniform(-self.width/2, self.width/2),
-                    self.y + self.height/2,
-                    random.uniform(-0.5, 0.5), random.uniform(2, 5),
-                    (255, 150, 0), 30
-                )
-
-class Starship:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = 0
-        self.vy = 0
-        self.angle = 0
-        self.width = STARSHIP_WIDTH
-        self.height = STARSHIP_HEIGHT
-        self.attached = True
-
-    def update(self, gravity):
-        if not self.attached:
-            self.vy += gravity
-            self.x += self.vx
-            self.y += self.vy
+            rng = particle_system.rng
+            n = particle_system.quota(10)
+            particle_system.emit(
+                n,
+                self.x + rng.uniform(-self.width/2, self.width/2, n),
+                self.y + self.height/2,
+                rng.uniform(-0.5, 0.5, n), rng.uniform(2, 5, n),
+                (255, 150, 0), 30
+            )
 
-    def draw(self, screen):
-        # Draw Starship as cylindrical body
-        body_color = (192, 192, 192)  # Stainless steel
-        pygame.draw.rect(screen, body_color, (self.x - self.width/2, self.y - self.height/2, self.width, self.height))
-
-        # Draw nose cone
-        nose_points = [
-            (self.x, self.y - self.height/2),
-            (self.x - self.width/4, self.y - self.height/2 - 5),
-            (self.x + self.width/4, self.y - self.height/2 - 5)
-        ]
-        pygame.draw.polygon(screen, body_color, nose_points)
-
-class MechazillaTower:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.height = TOWER_HEIGHT
-        self.chopsticks_length = CHOPSTICKS_LENGTH
-        self.left_arm_angle = 0
-        self.right_arm_angle = 0
-        self.arms_extended = False
-        self.catch_zone_x = x
-        self.catch_zone_y = y - 20  # Catch point above ground
-        self.catch_zone_width = 15
-        self.catch_zone_height = 10
-
-    def update(self, booster):
-        # Check if booster is in catch zone
-        if (abs(booster.x - self.catch_zone_x) < self.catch_zone_width and
-            abs(booster.y - self.catch_zone_y) < self.catch_zone_height and
-            abs(booster.vy) < 2 and abs(booster.angle) < 5):
-            self.arms_extended = True
-            self.left_arm_angle = -30
-            self.right_arm_angle = 30
-        else:
-            self.arms_extended = False
-            self.left_arm_angle = 0
-            self.right_arm_angle = 0
+class Starship(Interpolated, StarshipState):
+    def update(self, booster, gravity, wind_force):
+        step_starship(self, booster, gravity, wind_force)
+
+    def draw(self, screen, offset=(0, 0), alpha=1.0):
+        # Draw Starship as cylindrical body with nose cone
+        sprites = rotation_cache(render_starship_body, self.width, self.height)
+        return self.blit(screen, sprites, offset, alpha)
+
+    def emit_exhaust(self, particle_system):
+        if self.thrusting and not self.attached:
+            rng = particle_system.rng
+            n = particle_system.quota(5)
+            particle_system.emit(
+                n,
+                self.x, self.y + self.height/2,
+                rng.uniform(-0.5, 0.5, n), rng.uniform(2, 4, n),
+                ORANGE, 20
+            )
 
-    def draw(self, screen):
+class MechazillaTower(TowerState):
+    catch_surface = None  # Semi-transparent catch zone overlay, rendered once
+
+    def draw(self, screen, booster, offset=(0, 0), overlay=True):
+        ox, oy = offset
         # Draw tower structure
         tower_color = (100, 100, 100)
-        pygame.draw.rect(screen, tower_color, (self.x - 5, self.y - self.height, 10, self.height))
+        top = self.y - self.height - oy
+        pygame.draw.rect(screen, tower_color, (self.x - MAST_WIDTH/2 - ox, top, MAST_WIDTH, self.height))
 
         # Draw platform at top
-        pygame.draw.rect(screen, tower_color, (self.x - 20, self.y - self.height, 40, 10))
-
-        # Draw chopsticks arms
-        arm_color = (80, 80, 80)
-
-        # Left arm
-        left_arm_end_x = self.x - self.chopsticks_length * math.cos(math.radians(self.left_arm_angle))
-        left_arm_end_y = (self.y - self.height + 5) + self.chopsticks_length * math.sin(math.radians(self.left_arm_angle))
-        pygame.draw.line(screen, arm_color, (self.x - 15, self.y - self.height + 5),
-                        (left_arm_end_x, left_arm_end_y), 3)
-
-        # Right arm
-        right_arm_end_x = self.x + self.chopsticks_length * math.cos(math.radians(self.right_arm_angle))
-        right_arm_end_y = (self.y - self.height + 5) + self.chopsticks_length * math.sin(math.radians(self.right_arm_angle))
-        pygame.draw.line(screen, arm_color, (self.x + 15, self.y - self.height + 5),
-                        (right_arm_end_x, right_arm_end_y), 3)
-
-        # Draw catch zone (semi-transparent)
-        catch_surface = pygame.Surface((self.catch_zone_width * 2, self.catch_zone_height * 2), pygame.SRCALPHA)
-        pygame.draw.rect(catch_surface, (0, 255, 0, 100), (0, 0, self.catch_zone_width * 2, self.catch_zone_height * 2))
-        screen.blit(catch_surface, (self.catch_zone_x - self.catch_zone_width, self.catch_zone_y - self.catch_zone_height))
-
-class Ship:  # Legacy ship class for compatibility
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = 0
-        self.vy = 2  # Initial downward velocity
-        self.angle = 0  # Rotation angle in degrees
-        self.fuel = MAX_FUEL
-        self.thrusting = False
-        self.left_thrust = False
-        self.right_thrust = False
-        self.emergency_boost = False
-        self.width = 20
-        self.height = 40
-        self.was_thrusting = False  # Track previous thrust state
-
-    def update(self, keys, gravity, wind_force, thrust_sound=None):
-        # Handle input
-        self.thrusting = keys[pygame.K_UP] or keys[pygame.K_w]
-        self.left_thrust = keys[pygame.K_LEFT] or keys[pygame.K_a]
-        self.right_thrust = keys[pygame.K_RIGHT] or keys[pygame.K_d]
-        self.emergency_boost = keys[pygame.K_SPACE]
-
-        # Apply gravity
-        self.vy += gravity
-
-        # Apply wind
-        self.vx += wind_force
-
-        # Apply thrust
-        if self.thrusting and self.fuel > 0:
-            thrust_x = math.sin(math.radians(self.angle)) * THRUST_POWER
-            thrust_y = -math.cos(math.radians(self.angle)) * THRUST_POWER
-            self.vx += thrust_x
-            self.vy += thrust_y
-            self.fuel -= 1
-            # Play thrust sound only when starting to thrust
-            if thrust_sound and not self.was_thrusting:
-                thrust_sound.play(-1)  # Loop the sound
-        elif thrust_sound and self.was_thrusting:
-            thrust_sound.stop()  # Stop when not thrusting
-
-        self.was_thrusting = self.thrusting
-
-        # Apply side thrust for rotation
-        if self.left_thrust and self.fuel > 0:
-            self.angle -= 2
-            self.fuel -= 0.5
-        if self.right_thrust and self.fuel > 0:
-            self.angle += 2
-            self.fuel -= 0.5
-
-        # Emergency boost
-        if self.emergency_boost and self.fuel > 50:
-            thrust_x = math.sin(math.radians(self.angle)) * EMERGENCY_BOOST
-            thrust_y = -math.cos(math.radians(self.angle)) * EMERGENCY_BOOST
-            self.vx += thrust_x
-            self.vy += thrust_y
-            self.fuel -= 50
-
-        # Update position
-        self.x += self.vx
-        self.y += self.vy
-
-        # Keep ship on screen (wrap around)
-        if self.x < 0:
-            self.x = WIDTH
-        elif self.x > WIDTH:
-            self.x = 0
-
-    def draw(self, screen, particle_system):
+        pygame.draw.rect(screen, tower_color, (self.x - 20 - ox, top, 40, 10))
+
+        # Draw the chopsticks arm from its pivot on the mast
+        pivot = (self.x + MAST_WIDTH/2 - ox, self.arm_y - oy)
+        radians = math.radians(self.arm_angle)
+        end = (pivot[0] + self.arm_length * math.cos(radians), pivot[1] + self.arm_length * math.sin(radians))
+        pygame.draw.line(screen, (80, 80, 80), pivot, end, ARM_THICKNESS)
+
+        # Draw catch zone (semi-transparent, or an outline at low quality)
+        # while the arms wait
+        if not self.closing:
+            corner = (self.catch_x - CATCH_ZONE_WIDTH - ox, self.catch_y(booster) - CATCH_ZONE_HEIGHT - oy)
+            if not overlay:
+                pygame.draw.rect(screen, GREEN, (*corner, CATCH_ZONE_WIDTH * 2, CATCH_ZONE_HEIGHT * 2), 1)
+                return
+            if MechazillaTower.catch_surface is None:
+                surface = pygame.Surface((CATCH_ZONE_WIDTH * 2, CATCH_ZONE_HEIGHT * 2), pygame.SRCALPHA)
+                surface.fill((0, 255, 0, 100))
+                MechazillaTower.catch_surface = surface
+            screen.blit(self.catch_surface, corner)
+
+def draw_debris(screen, bodies, offset=(0, 0)):
+    # Wreckage boxes as filled polygons at their current rotation
+    ox, oy = offset
+    view = screen.get_rect()
+    for body in bodies:
+        state = body.state
+        x, y = state.x - ox, state.y - oy
+        if not view.collidepoint(x, y):
+            continue
+        (ux, uy), (vx, vy) = body.axes()
+        hw, hh = state.width / 2, state.height / 2
+        pygame.draw.polygon(screen, BOOSTER_FIN_COLOR, [
+            (x + sx * hw * ux + sy * hh * vx, y + sx * hw * uy + sy * hh * vy)
+            for sx, sy in ((-1, -1), (1, -1), (1, 1), (-1, 1))
+        ])
+
+class Ship(Interpolated, ShipState):  # Legacy ship class for compatibility
+    def update(self, controls, gravity, wind_force):
+        return step_ship(self, controls, gravity, wind_force)
+
+    def draw(self, screen, offset=(0, 0), alpha=1.0):
         # Draw ship as a simple rocket shape
-        points = [
-            (self.x, self.y - self.height/2),
-            (self.x - self.width/2, self.y + self.height/2),
-            (self.x + self.width/2, self.y + self.height/2)
-        ]
+        sprites = rotation_cache(render_ship_body, self.width, self.height)
+        return self.blit(screen, sprites, offset, alpha)
 
-        # Rotate points
-        rotated_points = []
-        for px, py in points:
-            dx = px - self.x
-            dy = py - self.y
-            rotated_x = dx * math.cos(math.radians(self.angle)) - dy * math.sin(math.radians(self.angle))
-            rotated_y = dx * math.sin(math.radians(self.angle)) + dy * math.cos(math.radians(self.angle))
-            rotated_points.append((self.x + rotated_x, self.y + rotated_y))
-
-        pygame.draw.polygon(screen, WHITE, rotated_points)
-
-        # Add thrust particles
+    def emit_exhaust(self, particle_system):
         if self.thrusting:
-            for _ in range(5):
-                particle_system.add_particle(
-                    self.x, self.y + self.height/2,
-                    random.uniform(-1, 1), random.uniform(1, 3),
-                    ORANGE, 20
-                )
-
-class Terrain:
-    def __init__(self):
+            rng = particle_system.rng
+            n = particle_system.quota(5)
+            particle_system.emit(
+                n,
+                self.x, self.y + self.height/2,
+                rng.uniform(-1, 1, n), rng.uniform(1, 3, n),
+                ORANGE, 20
+            )
+
+class Terrain(Heightfield):
+    def __init__(self, rng=random):
+        self.rng = rng
         self.points = []
         self.generate_terrain()
 
     def generate_terrain(self):
-        self.points = []
-        for x in range(0, WIDTH + 50, 50):
-            y = HEIGHT - 100 + random.randint(-20, 20)
-            self.points.append((x, y))
-        self.points.append((WIDTH, HEIGHT))
-        self.points.append((0, HEIGHT))
+        self.points = generate_terrain(self.rng)
+        super().__init__(terrain_heights(self.points))
 
     def draw(self, screen):
         pygame.draw.polygon(screen, GREEN, self.points)
 
-class LandingPad:
-    def __init__(self, x, y, width=100):
-        self.x = x
-        self.y = y
+class WorldTerrain(ChunkedTerrain):
+    # Chunked terrain for scrolling missions; each chunk's ground is drawn
+    # once into its own surface and dropped again with the chunk
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.surfaces = {}
+
+    def chunk_surface(self, index):
+        surface = self.surfaces.get(index)
+        if surface is None:
+            heights = self.chunk(index)[0]
+            points = [(x, heights[x] - self.top) for x in range(0, CHUNK_WIDTH + 1, TERRAIN_STEP)]
+            points += [(CHUNK_WIDTH, HEIGHT - self.top), (0, HEIGHT - self.top)]
+            surface = self.surfaces[index] = pygame.Surface((CHUNK_WIDTH, HEIGHT - self.top), pygame.SRCALPHA)
+            pygame.draw.polygon(surface, GREEN, points)
+        return surface
+
+    def retain(self, x_min, x_max):
+        super().retain(x_min, x_max)
+        for index in [i for i in self.surfaces if i not in self.chunks]:
+            del self.surfaces[index]
+
+    def draw(self, screen, camera):
+        view = camera.rect
+        if view.bottom <= self.top:
+            return
+        blits = [(self.chunk_surface(index), (index * CHUNK_WIDTH - view.x, self.top - view.y))
+                 for index in range(view.left // CHUNK_WIDTH, (view.right - 1) // CHUNK_WIDTH + 1)]
+        screen.blits(blits, doreturn=False)
+
+class Camera:
+    # World position of the screen's top-left corner. It keeps the followed
+    # point centred across and a little above the middle, and never scrolls
+    # below the fixed single-screen view, where the ground sits near the
+    # bottom edge.
+    def __init__(self, width=WIDTH, height=HEIGHT):
         self.width = width
-        self.height = 10
+        self.height = height
+        self.x = 0
+        self.y = 0
 
-    def draw(self, screen):
-        pygame.draw.rect(screen, YELLOW, (self.x - self.width/2, self.y - self.height, self.width, self.height))
+    def follow(self, x, y):
+        self.x = round(x - self.width / 2)
+        self.y = min(round(y - self.height * CAMERA_LEAD), 0)
 
-    def check_landing(self, ship):
-        ship_bottom = ship.y + ship.height/2
-        ship_left = ship.x - ship.width/2
-        ship_right = ship.x + ship.width/2
+    @property
+    def offset(self):
+        return self.x, self.y
 
-        if (ship_bottom >= self.y - self.height and
-            ship_bottom <= self.y and
-            ship_left >= self.x - self.width/2 and
-            ship_right <= self.x + self.width/2):
-            return True
-        return False
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def visible(self, rect):
+        return self.rect.colliderect(rect)
+
+class LandingPad(PadState):
+    def draw(self, screen, offset=(0, 0)):
+        return pygame.draw.rect(screen, YELLOW, (self.x - self.width/2 - offset[0], self.y - self.height - offset[1],
+                                                 self.width, self.height))
+
+    def check_landing(self, ship):
+        return pad_contains(self, ship)
 
 class HUD:
     def __init__(self):
-        self.font = pygame.font.Font(None, 24)
-
-    def draw(self, screen, ship, score, level, altitude):
+        self.font_size = TEXT_FONT_SIZE
+        self.numbers = NumberGlyphs(self.font_size, WHITE)
+        self.lines = {}  # row -> (formatted value, blit list)
+
+    def layout_line(self, label, value, unit, x, y):
+        label_surface = render_text(self.font_size, label, WHITE)
+        blits = [(label_surface, (x, y))]
+        digits, x = self.numbers.layout(value, x + label_surface.get_width(), y)
+        blits.extend(digits)
+        if unit:
+            blits.append((render_text(self.font_size, unit, WHITE), (x, y)))
+        return blits
+
+    def draw(self, screen, ship, score, level, altitude, quality):
         # Fuel bar
         fuel_percentage = ship.fuel / MAX_FUEL
-        pygame.draw.rect(screen, RED, (10, 10, 200, 20))
+        rect = pygame.draw.rect(screen, RED, (10, 10, 200, 20))
         pygame.draw.rect(screen, GREEN, (10, 10, 200 * fuel_percentage, 20))
 
-        # Text info
-        texts = [
-            f"Fuel: {int(ship.fuel)}",
-            f"Altitude: {int(altitude)}m",
-            f"Vertical Speed: {ship.vy:.1f} m/s",
-            f"Horizontal Speed: {ship.vx:.1f} m/s",
-            f"Angle: {int(ship.angle)}°",
-            f"Score: {score}",
-            f"Level: {level}"
+        # Text info: label, formatted value, unit
+        rows = [
+            ("Fuel: ", f"{int(ship.fuel)}", ""),
+            ("Altitude: ", f"{int(altitude)}", "m"),
+            ("Vertical Speed: ", f"{ship.vy:.1f}", " m/s"),
+            ("Horizontal Speed: ", f"{ship.vx:.1f}", " m/s"),
+            ("Angle: ", f"{int(ship.angle)}", "°"),
+            ("Score: ", f"{score}", ""),
+            ("Level: ", f"{level}", ""),
+            ("Quality: ", quality, ""),
         ]
 
-        for i, text in enumerate(texts):
-            text_surface = self.font.render(text, True, WHITE)
-            screen.blit(text_surface, (10, 40 + i * 25))
+        blits = []
+        for i, (label, value, unit) in enumerate(rows):
+            line = self.lines.get(i)
+            if line is None or line[0] != value:
+                # Lay the line out again only when its value changed
+                line = self.lines[i] = (value, self.layout_line(label, value, unit, 10, 40 + i * 25))
+            blits.extend(line[1])
+        return rect.unionall(screen.blits(blits))
+
+def engine_level(vehicle):
+    # Engine loop volume for what the vehicle's engines are doing now
+    if vehicle.fuel <= 0:
+        return 0.0
+    if getattr(vehicle, "emergency_boost", False) and vehicle.fuel > BOOST_FUEL:
+        return BOOST_VOLUME
+    return ENGINE_VOLUME if vehicle.thrusting else 0.0
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, recorder=None, sound=True, profile_path=None, world=False, catch=False,
+                 autopilot=False, leaderboard=None, asset_cache=ASSET_CACHE_DIR, render_fps=FPS,
+                 server=None, ghost=None, telemetry=None):
+        init_video()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Starship Lander")
         self.clock = pygame.time.Clock()
+        # The simulation ticks at SIM_RATE whatever the frame rate: real time
+        # builds up in sim_time and is spent in whole steps, and each frame
+        # draws alpha of the way from the previous step to the latest
+        self.render_fps = render_fps  # Frame rate cap; 0 for none
+        self.sim_time = 0.0
+        self.frame_start = None
+        self.alpha = 1.0
+        # Every random choice in a run derives from this seed: each episode
+        # draws its own seed from it for terrain, stars and particles
+        self.rng = random.Random(seed)
+        self.recorder = recorder
+        self.leaderboard = leaderboard
+        self.profile_path = profile_path
+        self.profiler = FrameProfiler(enabled=profile_path is not None)
+        # Trades particles, stars and overlays for frame time on slow machines
+        self.governor = QualityGovernor()
         self.particle_system = ParticleSystem()
         self.hud = HUD()
+        # Scrolling missions over chunked terrain instead of the single screen
+        self.world = world or catch
+        # Launch, separation and booster return to the tower (a world mode)
+        self.catch = catch
+        # Rollout autopilot flying instead of the keyboard, toggled with P
+        self.use_autopilot = autopilot
+        self.autopilot = None
+        self.camera = Camera()
+        # Layered rendering: a cached static background plus the screen areas
+        # touched by moving objects last frame and this frame
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.dirty_rects = []
+        self.update_rects = []
+        self.full_redraw = True
+        self.drawn_state = None
         self.level = 1
         self.score = 0
-        self.high_score = self.load_high_score()
+        self.high_score = leaderboard.best(self.mode) if leaderboard else 0
+        self.top_runs = []  # Menu table, read from the leaderboard on each visit
         self.game_state = "menu"  # menu, playing, win, lose
-        self.wind_force = 0
-        self.level_gravity = GRAVITY
-        self.load_sounds()
+        # Sounds and sprites load in the background; the menu doesn't wait
+        self.assets = load_assets(sound, asset_cache)
+        self.voices = None  # Mixer channels, set up once a sound has loaded
+        # netplay: a SnapshotServer sending this run to spectators and racers,
+        # and a SnapshotClient for a race opponent drawn as a ghost
+        self.server = server
+        self.ghost = ghost
+        self.telemetry = telemetry  # TelemetryRing getting a row per simulation step
         self.reset_game()
 
-    def load_sounds(self):
-        # Audio placeholders - replace with actual sound files
-        try:
-            self.thrust_sound = pygame.mixer.Sound("thrust.wav")  # Engine thrust sound
-            self.crash_sound = pygame.mixer.Sound("crash.wav")    # Crash/explosion sound
-            self.success_sound = pygame.mixer.Sound("success.wav") # Successful landing sound
-            self.thrust_sound.set_volume(0.3)
-            self.crash_sound.set_volume(0.5)
-            self.success_sound.set_volume(0.5)
-        except:
-            # If sound files don't exist, create silent placeholders
-            self.thrust_sound = None
-            self.crash_sound = None
-            self.success_sound = None
-            print("Sound files not found. Add thrust.wav, crash.wav, and success.wav to the game directory.")
-
-    def reset_game(self):
+    def sound(self, name):
+        # None until the loader has it, or if it could not be loaded
+        return self.assets.ready(name) if name in self.assets else None
+
+    def play_sound(self, name, priority=0):
+        sound = self.sound(name)
+        if sound is not None:
+            if self.voices is None:
+                self.voices = VoicePool()
+            self.voices.play(sound, priority)
+
+    def update_audio(self):
+        # The engine loop runs throughout and follows the flown vehicle's
+        # throttle, so thrust taps only move a volume
+        thrust = self.sound("thrust")
+        if thrust is None:
+            return
+        if self.voices is None:
+            self.voices = VoicePool()
+        self.voices.set_loop(thrust)
+        self.voices.throttle(engine_level(self.vehicle) if self.game_state == "playing" else 0.0)
+
+    def reset_game(self, seed=None):
+        self.episode_seed = self.rng.getrandbits(32) if seed is None else seed
+        self.star_seed = self.episode_seed ^ 0x5EED
+        self.particle_system.clear()
+        self.particle_system.seed(self.episode_seed)
         self.ship = Ship(WIDTH // 2, 50)
-        self.terrain = Terrain()
-        self.landing_pad = LandingPad(WIDTH // 2, HEIGHT - 120)
+        self.landing_pad = LandingPad(PAD_X, PAD_Y)
+        self.vehicle = self.ship  # Whatever the player flies: followed, shown on the HUD
+        if self.catch:
+            self.terrain = WorldTerrain(self.episode_seed)
+            self.booster = self.vehicle = Booster(0, 0)
+            self.starship = Starship(0, 0)
+            self.tower = MechazillaTower(0, 0)
+            self.sim = new_catch(self.level, self.episode_seed, self.booster, self.starship, self.tower, self.terrain)
+        elif self.world:
+            self.terrain = WorldTerrain(self.episode_seed)
+            self.sim = new_mission(self.level, self.episode_seed, self.ship, self.landing_pad, self.terrain)
+        else:
+            self.terrain = Terrain(random.Random(self.episode_seed))
+            self.sim = SimState(ship=self.ship, pad=self.landing_pad, terrain=self.terrain)
+            self.particle_system.set_terrain(self.terrain, self.landing_pad)
+        self.ghost_vehicle = Booster(0, 0) if self.catch else Ship(0, 0)
         self.score = 0
         self.set_level_difficulty()
+        self.autopilot = self.make_autopilot() if self.use_autopilot else None
+        self.follow_camera()
+        self.build_background()
+        if self.recorder:
+            self.recorder.begin(self.episode_seed, self.level, self.world, self.catch)
+
+    def build_background(self):
+        # Stars, terrain and pad never change within a level; a scrolling
+        # world keeps only the stars, as a layer that tiles sideways
+        background = self.background
+        background.fill(BLACK)
+        star_bottom = HEIGHT if self.world else HEIGHT//2
+        star_rng = random.Random(self.star_seed)  # A lower star count keeps the first stars
+        for _ in range(self.governor.tier.stars):
+            x = star_rng.randint(0, WIDTH)
+            y = star_rng.randint(0, star_bottom)
+            pygame.draw.circle(background, WHITE, (x, y), 1)
+        if not self.world:
+            self.terrain.draw(background)
+            self.landing_pad.draw(background)
+        self.full_redraw = True
+
+    def follow_camera(self):
+        # Scroll to the ship and keep only the terrain around the view
+        if not self.world:
+            return
+        self.camera.follow(self.vehicle.x, self.vehicle.y)
+        view = self.camera.rect
+        self.terrain.retain(view.left, view.right)
+        self.particle_system.set_ground(*self.terrain.window(view.left, view.right),
+                                        None if self.catch else self.landing_pad)
+
+    def make_autopilot(self):
+        return (CatchAutopilot if self.catch else Autopilot)(self.episode_seed)
 
     def set_level_difficulty(self):
-        if self.level == 1:
-            self.level_gravity = GRAVITY
-            self.wind_force = 0
-            self.ship.fuel = MAX_FUEL
-        elif self.level == 2:
-            self.level_gravity = GRAVITY * 1.2
-            self.wind_force = 0.05
-            self.ship.fuel = MAX_FUEL * 0.8
-        elif self.level == 3:
-            self.level_gravity = GRAVITY * 1.5
-            self.wind_force = 0.1
-            self.ship.fuel = MAX_FUEL * 0.6
+        if self.catch:
+            apply_catch_level(self.sim, self.level)
         else:
-            self.level_gravity = GRAVITY * 2.0
-            self.wind_force = 0.15
-            self.ship.fuel = MAX_FUEL * 0.4
+            apply_level(self.sim, self.level)
 
-    def add_explosion_particles(self):
-        # Add explosion particles at ship's position
-        for _ in range(50):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 8)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            self.particle_system.add_particle(
-                self.ship.x, self.ship.y,
-                vx, vy,
-                RED, 60
-            )
+    @property
+    def level_gravity(self):
+        return self.sim.gravity
 
-    def load_high_score(self):
-        try:
-            with open("high_score.json", "r") as f:
-                return json.load(f)
-        except:
-            return 0
+    @property
+    def wind_force(self):
+        return self.sim.wind_force
 
-    def save_high_score(self):
-        with open("high_score.json", "w") as f:
-            json.dump(self.high_score, f)
-
-    def update(self):
+    def add_explosion_particles(self):
+        # Add explosion particles at the vehicle's position
+        rng = self.particle_system.rng
+        n = self.particle_system.quota(50)
+        angle = rng.uniform(0, 2 * math.pi, n)
+        speed = rng.uniform(2, 8, n)
+        self.particle_system.emit(
+            n,
+            self.vehicle.x, self.vehicle.y,
+            np.cos(angle) * speed, np.sin(angle) * speed,
+            RED, 60
+        )
+
+    @property
+    def mode(self):
+        return "catch" if self.catch else "world" if self.world else "screen"
+
+    def record_run(self):
+        # The finished episode goes to the leaderboard's writer thread
+        self.high_score = max(self.high_score, self.score)
+        if self.leaderboard:
+            sim = self.sim
+            self.leaderboard.record(Run(
+                self.score, sim.level, self.vehicle.fuel, sim.frame / FPS, self.episode_seed, self.mode,
+                self.game_state, self.recorder.reference() if self.recorder else None))
+
+    def update(self, controls=None):
         if self.game_state == "playing":
-            keys = pygame.key.get_pressed()
-            self.ship.update(keys, self.level_gravity, self.wind_force, self.thrust_sound)
-            self.particle_system.update()
-
-            # Check collisions
-            altitude = HEIGHT - self.ship.y - self.ship.height/2
-            if self.ship.y + self.ship.height/2 >= HEIGHT - 100:  # Ground collision
-                if self.landing_pad.check_landing(self.ship):
-                    if abs(self.ship.vy) < LANDING_VELOCITY_THRESHOLD and abs(self.ship.angle) < LANDING_ANGLE_THRESHOLD:
-                        self.game_state = "win"
-                        self.score += int(self.ship.fuel * 0.1) + 1000
-                        self.level += 1
-                        if self.level > 4:
-                            self.level = 1  # Reset to level 1 after completing all levels
-                        # Play success sound
-                        if self.success_sound:
-                            self.success_sound.play()
-                    else:
-                        self.game_state = "lose"
-                        # Play crash sound
-                        if self.crash_sound:
-                            self.crash_sound.play()
-                        # Add explosion particles
-                        self.add_explosion_particles()
+            if controls is None:
+                if self.autopilot:
+                    controls = self.autopilot(self.sim)
                 else:
-                    self.game_state = "lose"
-                    # Play crash sound
-                    if self.crash_sound:
-                        self.crash_sound.play()
-                    # Add explosion particles
-                    self.add_explosion_particles()
-
-            # Update score
-            self.score += 1
+                    controls = read_controls(pygame.key.get_pressed())
+            if self.recorder:
+                self.recorder.record(controls)
+            events = step_catch(self.sim, controls) if self.catch else step(self.sim, controls)
+            self.score = self.sim.score
+            self.game_state = self.sim.status
+            if self.telemetry:
+                self.telemetry.record(self, controls)
+            if self.game_state != "playing":
+                if self.recorder:
+                    self.recorder.end(self.game_state, self.score)
+                self.record_run()
+            for event in events:
+                self.on_sim_event(event)
+            self.follow_camera()
+        self.update_audio()
+        if self.server:
+            self.server.tick(self)
+
+    def update_particles(self):
+        if self.game_state == "playing":
+            self.particle_system.update(self.camera.rect if self.world else None)
+
+    @property
+    def vehicles(self):
+        # Everything drawn between simulation steps
+        return (self.starship, self.booster) if self.catch else (self.ship,)
+
+    def remember_poses(self):
+        for vehicle in self.vehicles:
+            vehicle.remember()
+
+    def emit_exhaust(self):
+        if self.game_state != "playing":
+            return
+        if self.catch:
+            self.starship.emit_exhaust(self.particle_system)
+            if not self.sim.wrecked:
+                self.booster.emit_exhaust(self.particle_system)
+        else:
+            self.ship.emit_exhaust(self.particle_system)
+
+    def tick(self, controls=None):
+        # One fixed simulation step and the effects that follow it
+        self.remember_poses()
+        self.update(controls)
+        self.update_particles()
+        self.emit_exhaust()
+
+    def due_ticks(self, now):
+        # Whole simulation steps owed for the real time since the last frame.
+        # At most MAX_CATCH_UP steps' worth is kept, so after a stall the
+        # game slows down rather than running ever more steps to catch up.
+        if self.frame_start is not None:
+            self.sim_time = min(self.sim_time + now - self.frame_start, MAX_CATCH_UP * SIM_STEP)
+        self.frame_start = now
+        ticks = int(self.sim_time / SIM_STEP)
+        self.sim_time -= ticks * SIM_STEP
+        self.alpha = self.sim_time / SIM_STEP
+        return ticks
+
+    def on_sim_event(self, event):
+        # Sound and effect hooks for events reported by the simulation
+        # (thrust start and stop need nothing: update_audio follows the throttle)
+        if event == EVENT_LANDED:
+            self.level += 1
+            if self.level > MAX_LEVEL:
+                self.level = 1  # Reset to level 1 after completing all levels
+            self.play_sound("success", priority=1)
+        elif event == EVENT_CRASHED:
+            self.play_sound("crash", priority=1)
+            self.add_explosion_particles()
+        elif event == EVENT_SEPARATION:
+            # Puff of vented gas at the interstage
+            rng = self.particle_system.rng
+            n = self.particle_system.quota(20)
+            self.particle_system.emit(
+                n,
+                self.booster.x, self.booster.y - self.booster.height/2,
+                rng.uniform(-3, 3, n), rng.uniform(-1, 1, n),
+                WHITE, 30
+            )
 
     def draw(self):
-        self.screen.fill(BLACK)
+        if self.game_state != self.drawn_state:
+            self.full_redraw = True
+        self.drawn_state = self.game_state
 
-        if self.game_state == "menu":
-            self.draw_menu()
-        elif self.game_state == "playing":
+        if self.game_state == "playing":
             self.draw_game()
-        elif self.game_state == "win":
-            self.draw_win_screen()
-        elif self.game_state == "lose":
-            self.draw_lose_screen()
+        elif self.full_redraw:
+            # Menu and result screens are static: draw them once per visit
+            self.screen.fill(BLACK)
+            if self.game_state == "menu":
+                self.draw_menu()
+            elif self.game_state == "win":
+                self.draw_win_screen()
+            elif self.game_state == "lose":
+                self.draw_lose_screen()
+
+    def draw_profiler_overlay(self):
+        rect = self.profiler.draw_overlay(self.screen, get_font(TEXT_FONT_SIZE))
+        self.update_rects.append(rect)
+        if self.game_state == "playing":
+            self.dirty_rects.append(rect)
 
-        pygame.display.flip()
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        elif self.update_rects:
+            pygame.display.update(self.update_rects)
+        self.full_redraw = False
+        self.update_rects = []
 
     def draw_menu(self):
-        font = pygame.font.Font(None, 48)
-        title = font.render("Starship Lander", True, WHITE)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//2 - 100))
+        blit_centered(self.screen, render_text(TITLE_FONT_SIZE, "Starship Lander", WHITE), HEIGHT//2 - 100)
 
-        font = pygame.font.Font(None, 24)
         instructions = [
             "Use UP/W to thrust, LEFT/RIGHT/A/D to rotate",
-            "SPACE for emergency boost",
+            "SPACE for emergency boost, P toggles the autopilot",
             "Land with low speed and minimal tilt",
             "Press SPACE to start"
         ]
 
         for i, instruction in enumerate(instructions):
-            text = font.render(instruction, True, WHITE)
-            self.screen.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 - 50 + i * 30))
+            blit_centered(self.screen, render_text(TEXT_FONT_SIZE, instruction, WHITE), HEIGHT//2 - 50 + i * 30)
 
-        high_score_text = font.render(f"High Score: {self.high_score}", True, YELLOW)
-        self.screen.blit(high_score_text, (WIDTH//2 - high_score_text.get_width()//2, HEIGHT//2 + 100))
+        blit_centered(self.screen, render_text(TEXT_FONT_SIZE, f"High Score: {self.high_score}", YELLOW), HEIGHT//2 + 100)
+        if self.leaderboard:
+            self.top_runs = self.leaderboard.top(MENU_TOP_RUNS, self.mode)
+        for i, run in enumerate(self.top_runs):
+            line = f"{i + 1}. {run.score}  level {run.level}  {run.duration:.0f}s"
+            blit_centered(self.screen, render_text(TEXT_FONT_SIZE, line, WHITE), HEIGHT//2 + 140 + i * 30)
 
     def draw_game(self):
-        # Draw stars
-        for _ in range(50):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT//2)
-            pygame.draw.circle(self.screen, WHITE, (x, y), 1)
-
-        self.terrain.draw(self.screen)
-        self.landing_pad.draw(self.screen)
-        self.ship.draw(self.screen, self.particle_system)
-        self.particle_system.draw(self.screen)
+        if self.world:
+            self.draw_world()
+            return
+        screen = self.screen
+        if self.full_redraw:
+            screen.blit(self.background, (0, 0))
+            self.dirty_rects = []
+        else:
+            # Erase last frame's moving objects from the cached background
+            for rect in self.dirty_rects:
+                screen.blit(self.background, rect, rect)
+
+        rects = [
+            self.ship.draw(screen, alpha=self.alpha),
+            self.particle_system.draw(screen, alpha=self.alpha),
+            self.hud.draw(screen, self.vehicle, self.score, self.level, altitude(self.vehicle),
+                          self.governor.tier.name),
+        ]
+        if self.ghost:
+            rects.append(self.draw_ghost())
+        rects = [rect.clip(screen.get_rect()) for rect in rects if rect]
+        self.update_rects = self.dirty_rects + rects
+        self.dirty_rects = rects
+
+    def draw_world(self):
+        # The camera moves every frame, so the whole screen is redrawn; only
+        # chunks, particles and the pad inside the view are drawn at all
+        screen = self.screen
+        camera = self.camera
+        camera.follow(*self.vehicle.pose(self.alpha)[:2])
+        offset = camera.offset
+        shift = int(camera.x * STAR_PARALLAX) % WIDTH
+        screen.blits([(self.background, (-shift, 0)), (self.background, (WIDTH - shift, 0))], doreturn=False)
+        self.terrain.draw(screen, camera)
+        if self.catch:
+            self.draw_catch_objects()
+        else:
+            pad = self.landing_pad
+            if camera.visible(pygame.Rect(pad.x - pad.width/2, pad.y - pad.height, pad.width, pad.height)):
+                pad.draw(screen, offset)
+            else:
+                self.draw_target_marker(pad.x, pad.y)
+            self.ship.draw(screen, offset, self.alpha)
+        if self.ghost:
+            self.draw_ghost(offset)
+        self.particle_system.draw(screen, offset, self.alpha)
+        self.hud.draw(screen, self.vehicle, self.score, self.level, altitude(self.vehicle),
+                      self.governor.tier.name)
+        self.dirty_rects = []
+        self.full_redraw = True
+
+    def draw_catch_objects(self):
+        screen, offset = self.screen, self.camera.offset
+        tower, booster = self.tower, self.booster
+        mast = pygame.Rect(tower.x - MAST_WIDTH/2, tower.y - tower.height, MAST_WIDTH, tower.height)
+        if self.camera.visible(mast.inflate(2 * tower.arm_length, 0)):
+            tower.draw(screen, booster, offset, self.governor.tier.overlays)
+        elif booster.phase == PHASE_RETURN:
+            self.draw_target_marker(tower.catch_x, tower.catch_y(booster))
+        self.starship.draw(screen, offset, self.alpha)
+        if not self.sim.wrecked:
+            booster.draw(screen, offset, self.alpha)
+        draw_debris(screen, self.sim.debris, offset)
+        if self.ghost:
+            self.draw_ghost(offset)
+
+    def draw_ghost(self, offset=(0, 0)):
+        # The race opponent's vehicle, while it flies this same episode
+        self.ghost.poll()
+        sample = self.ghost.sample()
+        if sample is None:
+            return None
+        a, b, alpha = sample
+        if (b.seed, MODES[b.mode], STATUSES[b.status]) != (self.episode_seed, self.mode, "playing"):
+            return None
+        vehicle = self.ghost_vehicle
+        place(vehicle, a, b)
+        if self.catch:
+            body = (render_booster_body, vehicle.width, vehicle.height, vehicle.engine_count)
+        else:
+            body = (render_ship_body, vehicle.width, vehicle.height)
+        return vehicle.blit(self.screen, rotation_cache(render_ghost_body, *body), offset, alpha)
 
-        altitude = HEIGHT - self.ship.y - self.ship.height/2
-        self.hud.draw(self.screen, self.ship, self.score, self.level, altitude)
+    def draw_target_marker(self, target_x, target_y):
+        # Diamond on the screen edge nearest an off-screen target
+        size = PAD_MARKER_SIZE
+        x = min(max(target_x - self.camera.x, size), WIDTH - size)
+        y = min(max(target_y - self.camera.y, size), HEIGHT - size)
+        pygame.draw.polygon(self.screen, YELLOW, [(x, y - size), (x + size, y), (x, y + size), (x - size, y)])
 
     def draw_win_screen(self):
-        font = pygame.font.Font(None, 48)
-        win_text = font.render("Successful Landing!", True, GREEN)
-        self.screen.blit(win_text, (WIDTH//2 - win_text.get_width()//2, HEIGHT//2 - 50))
-
-        font = pygame.font.Font(None, 24)
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2))
-
-        restart_text = font.render("Press R to restart, Q to quit", True, WHITE)
-        self.screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 50))
+        title = "Booster Caught!" if self.catch else "Successful Landing!"
+        blit_centered(self.screen, render_text(TITLE_FONT_SIZE, title, GREEN), HEIGHT//2 - 50)
+        blit_centered(self.screen, render_text(TEXT_FONT_SIZE, f"Score: {self.score}", WHITE), HEIGHT//2)
+        blit_centered(self.screen, render_text(TEXT_FONT_SIZE, "Press R to restart, Q to quit", WHITE), HEIGHT//2 + 50)
 
     def draw_lose_screen(self):
-        font = pygame.font.Font(None, 48)
-        lose_text = font.render("Crash!", True, RED)
-        self.screen.blit(lose_text, (WIDTH//2 - lose_text.get_width()//2, HEIGHT//2 - 50))
-
-        font = pygame.font.Font(None, 24)
-        score_text = font.render(f"Final Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2))
-
-        restart_text = font.render("Press R to restart, Q to quit", True, WHITE)
-        self.screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 50))
+        blit_centered(self.screen, render_text(TITLE_FONT_SIZE, "Crash!", RED), HEIGHT//2 - 50)
+        blit_centered(self.screen, render_text(TEXT_FONT_SIZE, f"Final Score: {self.score}", WHITE), HEIGHT//2)
+        blit_centered(self.screen, render_text(TEXT_FONT_SIZE, "Press R to restart, Q to quit", WHITE), HEIGHT//2 + 50)
+
+    def run_profiled_frame(self):
+        profiler = self.profiler
+        profiler.begin()
+        running = self.handle_events()
+        profiler.mark(EVENTS)
+        ticks = self.due_ticks(time.perf_counter())
+        for _ in range(ticks):
+            # tick() with a mark after each half; marks add up over the frame
+            self.remember_poses()
+            self.update()
+            profiler.mark(UPDATE)
+            self.update_particles()
+            self.emit_exhaust()
+            profiler.mark(PARTICLES)
+        self.draw()
+        if profiler.show_overlay:
+            self.draw_profiler_overlay()
+        profiler.mark(DRAW)
+        self.present()
+        profiler.mark(PRESENT)
+        self.govern(profiler.frame_ms())
+        self.clock.tick(self.render_fps)
+        profiler.mark(IDLE)
+        profiler.end(len(self.particle_system), self.clock.get_fps(), self.governor.level, ticks)
+        return running
+
+    def govern(self, frame_ms):
+        # Feed the governor a frame's working time and apply any new tier
+        if self.governor.record(frame_ms):
+            self.apply_quality()
+
+    def apply_quality(self):
+        tier = self.governor.tier
+        self.particle_system.set_quality(tier.emission, tier.lifetime)
+        self.build_background()
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.full_redraw = True
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_q:
                     return False
+                elif event.key == pygame.K_F3:
+                    self.profiler.show_overlay = not self.profiler.show_overlay
+                    self.profiler.enabled = self.profiler.show_overlay or self.profile_path is not None
+                    self.full_redraw = True
+                elif event.key == pygame.K_p:
+                    self.use_autopilot = not self.use_autopilot
+                    self.autopilot = self.make_autopilot() if self.use_autopilot else None
                 elif event.key == pygame.K_r and self.game_state in ["win", "lose"]:
                     self.reset_game()
                     self.game_state = "playing"
@@ -635,17 +1240,72 @@ class Game:
     def run(self):
         running = True
         while running:
+            if self.profiler.enabled:
+                running = self.run_profiled_frame()
+                continue
+            start = time.perf_counter()
             running = self.handle_events()
-            self.update()
+            for _ in range(self.due_ticks(start)):
+                self.tick()
             self.draw()
-            self.clock.tick(FPS)
+            self.present()
+            self.govern((time.perf_counter() - start) * 1000)
+            self.clock.tick(self.render_fps)
+
+        if self.profile_path:
+            self.profiler.dump(self.profile_path)
+
+        if self.recorder:
+            if self.game_state == "playing":
+                self.recorder.end(self.game_state, self.score)  # Keep the unfinished episode too
+            self.recorder.close()
+
+        if self.leaderboard:
+            self.leaderboard.close()
 
-        if self.score > self.high_score:
-            self.high_score = self.score
-            self.save_high_score()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.server:
+            self.server.close()
+        if self.ghost:
+            self.ghost.close()
 
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+    parser = argparse.ArgumentParser(description="Starship Lander")
+    parser.add_argument("--seed", type=int, help="seed for a reproducible run")
+    parser.add_argument("--record", metavar="FILE", help="record every episode's inputs for replay.py")
+    parser.add_argument("--profile", metavar="FILE", help="record frame timings and write them as .csv or .json on exit")
+    parser.add_argument("--world", action="store_true", help="fly long-range missions over scrolling terrain")
+    parser.add_argument("--catch", action="store_true", help="launch the stack and fly the booster back to the tower")
+    parser.add_argument("--autopilot", action="store_true", help="let the rollout autopilot fly (toggle with P)")
+    parser.add_argument("--leaderboard", metavar="FILE", default=LEADERBOARD_PATH, help="store finished runs here")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help=f"frame rate cap, 0 for none; the simulation runs at {SIM_RATE} Hz regardless")
+    parser.add_argument("--telemetry", metavar="FILE", help="keep every physics step in this telemetry ring")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="send snapshots of the run to spectators and racers")
+    parser.add_argument("--race", metavar="[HOST:]PORT", help="show the run served there as a ghost; use the same --seed")
+    args = parser.parse_args()
+
+    recorder = None
+    if args.record:
+        from replay import InputRecorder
+        recorder = InputRecorder(args.record)
+    server = ghost = None
+    if args.serve or args.race:
+        from netplay import SnapshotClient, SnapshotServer, parse_address
+        if args.serve:
+            host, port = parse_address(args.serve)
+            server = SnapshotServer(port, host=host)
+        if args.race:
+            ghost = SnapshotClient(parse_address(args.race))
+    telemetry = None
+    if args.telemetry:
+        from telemetry import TelemetryRing
+        telemetry = TelemetryRing(args.telemetry, write=True)
+    game = Game(seed=args.seed, recorder=recorder, profile_path=args.profile, world=args.world,
+                catch=args.catch, autopilot=args.autopilot, leaderboard=Leaderboard(args.leaderboard),
+                render_fps=args.fps, server=server, ghost=ghost, telemetry=telemetry)
     game.run()
\ No newline at end of file
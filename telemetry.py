@@ -0,0 +1,202 @@
+"""Memory-mapped columnar ring of per-step flight telemetry.
+
+Game.update writes one row per simulation step of the flown vehicle (the
+ship, or the booster in catch mode): its pose, velocity, fuel and altitude,
+the controls, booster phase, wind, score and game state. The file holds a
+fixed schema of COLUMNS, each column one contiguous array of `capacity`
+values, after a small header whose row count the writer bumps once the row
+is in place. When the ring is full the oldest rows are overwritten.
+
+Readers map the same file and get every column as a NumPy array without a
+copy, also while a game is still writing it; rows() puts the live range in
+order. Sessions keep appending to the same file, each under its own session
+number, so one file can hold thousands of runs. Only one game should write
+a file at a time.
+
+    python starship_lander.py --telemetry flight.tlm
+    python telemetry.py flight.tlm --crashes
+    python telemetry.py flight.tlm --tail 20
+    python telemetry.py --bench 200000
+"""
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from lander_sim import LOSE, MODES, PHASES, STATUSES, altitude
+
+MAGIC = b"SLTELEM1"
+VERSION = 1
+CAPACITY = 1 << 20  # Rows; about 4.6 hours of flying at 60 steps per second
+# magic, version, column count, sessions started, capacity, rows ever written
+HEADER = struct.Struct("<8sIIIxxxxQQ")
+COUNT_OFFSET = HEADER.size - 8
+COLUMN_ENTRY = struct.Struct("<16s4sQ")  # name, dtype, byte offset
+DATA_ALIGN = 4096
+COLUMNS = (
+    ("session", "<u4"), ("seed", "<u4"), ("frame", "<u4"),
+    ("level", "u1"), ("mode", "u1"), ("status", "u1"), ("controls", "u1"), ("phase", "u1"),
+    ("x", "<f4"), ("y", "<f4"), ("vx", "<f4"), ("vy", "<f4"), ("angle", "<f4"), ("fuel", "<f4"),
+    ("altitude", "<f4"), ("wind", "<f4"), ("score", "<i4"),
+)
+LOST = STATUSES.index(LOSE)
+
+
+def layout(capacity):
+    # (name, dtype, offset) per column and the file size
+    columns, offset = [], DATA_ALIGN
+    for name, dtype in COLUMNS:
+        columns.append((name, dtype, offset))
+        offset += -(-capacity * np.dtype(dtype).itemsize // 64) * 64
+    return columns, offset
+
+
+class TelemetryRing:
+    # write=True creates the file if needed and starts a new session in it
+    def __init__(self, path, capacity=CAPACITY, write=False):
+        self.path = path
+        if write and not os.path.exists(path):
+            self.create(path, capacity)
+        self.map = np.memmap(path, dtype=np.uint8, mode="r+" if write else "r")
+        magic, version, count, sessions, capacity, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} telemetry file")
+        self.capacity = capacity
+        self.columns = {}
+        for i in range(count):
+            name, dtype, offset = COLUMN_ENTRY.unpack_from(self.map, HEADER.size + i * COLUMN_ENTRY.size)
+            dtype = np.dtype(dtype.rstrip(b"\0").decode())
+            self.columns[name.rstrip(b"\0").decode()] = self.map[offset:offset + capacity * dtype.itemsize].view(dtype)
+        if [(name, array.dtype) for name, array in self.columns.items()] != \
+                [(name, np.dtype(dtype)) for name, dtype in COLUMNS]:
+            raise ValueError(f"{path} has a different column schema")
+        self._count = self.map[COUNT_OFFSET:COUNT_OFFSET + 8].view("<u8")
+        self.session = None
+        if write:
+            self.session = sessions
+            struct.pack_into("<I", self.map, 16, sessions + 1)
+            self.written = int(self._count[0])
+            self._arrays = [self.columns[name] for name, _ in COLUMNS]
+
+    @staticmethod
+    def create(path, capacity):
+        columns, size = layout(capacity)
+        header = bytearray(DATA_ALIGN)
+        HEADER.pack_into(header, 0, MAGIC, VERSION, len(columns), 0, capacity, 0)
+        for i, (name, dtype, offset) in enumerate(columns):
+            COLUMN_ENTRY.pack_into(header, HEADER.size + i * COLUMN_ENTRY.size, name.encode(), dtype.encode(), offset)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.truncate(size)  # Sparse: pages are only backed once written
+
+    @property
+    def count(self):
+        # Rows ever written, read live from the header
+        return int(self._count[0])
+
+    def record(self, game, controls):
+        # One row for the step Game.update just took
+        vehicle, sim = game.vehicle, game.sim
+        row = self.written % self.capacity
+        values = (
+            self.session, game.episode_seed, sim.frame,
+            game.level, MODES.index(game.mode), STATUSES.index(game.game_state), controls.bits,
+            PHASES.index(vehicle.phase) if game.catch else 0,
+            vehicle.x, vehicle.y, vehicle.vx, vehicle.vy, vehicle.angle, vehicle.fuel,
+            altitude(vehicle), sim.wind_force, game.score,
+        )
+        for array, value in zip(self._arrays, values):
+            array[row] = value
+        self.written += 1
+        self._count[0] = self.written  # Published after the row is complete
+
+    def rows(self, last=None):
+        # The live rows, oldest first, as a dict of column copies. Rows the
+        # writer may have overwritten during the copy are left out, counting
+        # the unpublished row it may be filling, which reuses the slot of
+        # row count - capacity.
+        count = self.count
+        n = min(count, self.capacity, count if last is None else last)
+        index = np.arange(count - n, count) % self.capacity
+        columns = {name: array[index] for name, array in self.columns.items()}
+        overwritten = self.count + 1 - self.capacity - (count - n)
+        if overwritten > 0:
+            columns = {name: values[overwritten:] for name, values in columns.items()}
+        return columns
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        if self.session is not None:
+            self.flush()
+        self.columns = self._arrays = self._count = None
+        self.map = None
+
+
+def crash_report(rows):
+    # Impact conditions of every crashed episode: its final step's speeds,
+    # angle and fuel, over the given rows
+    crashed = rows["status"] == LOST
+    print(f"{len(np.unique(rows['session']))} sessions, {len(rows['frame'])} steps, {int(crashed.sum())} crashes")
+    if not crashed.any():
+        return
+    for name in ("vy", "vx", "angle", "fuel", "frame", "level"):
+        values = rows[name][crashed].astype(np.float64)
+        p10, p50, p90 = np.percentile(values, (10, 50, 90))
+        print(f"{name:>6} at impact: p10 {p10:8.2f}  p50 {p50:8.2f}  p90 {p90:8.2f}")
+
+
+def bench(steps):
+    # Per-step cost of record() on a headless game
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from lander_sim import NO_CONTROLS
+    from starship_lander import Game
+    game = Game(seed=0, sound=False)
+    game.game_state = "playing"
+    with tempfile.TemporaryDirectory() as directory:
+        ring = TelemetryRing(os.path.join(directory, "bench.tlm"), write=True)
+        start = time.perf_counter()
+        for _ in range(steps):
+            ring.record(game, NO_CONTROLS)
+        elapsed = time.perf_counter() - start
+        reader = TelemetryRing(ring.path)
+        start = time.perf_counter()
+        rows = reader.rows()
+        read = time.perf_counter() - start
+        print(f"record: {elapsed / steps * 1e6:.2f} us per step; "
+              f"{len(rows['frame'])} rows read in order in {read * 1000:.1f} ms")
+        reader.close()
+        ring.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a telemetry ring, or time writing one.")
+    parser.add_argument("paths", nargs="*", help="telemetry files")
+    parser.add_argument("--crashes", action="store_true", help="summarize the impact of every crash")
+    parser.add_argument("--tail", type=int, metavar="N", help="print the last N steps of each file")
+    parser.add_argument("--bench", type=int, metavar="STEPS", help="time STEPS record() calls")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+    for path in args.paths:
+        ring = TelemetryRing(path)
+        print(f"{path}: {ring.count} rows written, capacity {ring.capacity}")
+        if args.tail:
+            rows = ring.rows(args.tail)
+            names = list(rows)
+            print(" ".join(f"{name:>9}" for name in names))
+            for values in zip(*(rows[name].tolist() for name in names)):
+                print(" ".join(f"{value:>9.2f}" if isinstance(value, float) else f"{value:>9}" for value in values))
+        if args.crashes:
+            crash_report(ring.rows())
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
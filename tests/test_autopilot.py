@@ -0,0 +1,38 @@
+import pytest
+
+from autopilot import SEGMENT, Autopilot, fly
+from lander_sim import MAX_LEVEL, WIN, game_episode
+
+SEEDS = (0, 13)
+MODES = {"screen": (False, False), "world": (True, False), "catch": (False, True)}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("level", range(1, MAX_LEVEL + 1))
+@pytest.mark.parametrize("mode", MODES)
+def test_lands_every_level(mode, level, seed):
+    # Without a time budget every plan flies the full horizon, so the
+    # outcome is the same on any machine
+    state, pilot, _ = fly(level, seed, *MODES[mode], budget_ms=None)
+    assert state.status == WIN
+    assert pilot.vehicle(state).fuel > 0
+
+
+def test_rollout_stops_at_the_deadline_every_step():
+    # A budget too small for even one step still takes one step per frame,
+    # and the rollout carries on from there in the next frame
+    pilot = Autopilot(0, budget_ms=1e-6)
+    state = game_episode(1, 0)
+    for frame in range(SEGMENT - 1):
+        pilot(state)
+        assert pilot.depth == frame + 1
+    pilot(state)
+    assert pilot.cursor == 0 and pilot.batch is None  # The best candidate took over
+
+
+def test_first_segment_is_shared_by_every_candidate():
+    pilot = Autopilot(0)
+    state = game_episode(2, 0)
+    for _ in range(3 * SEGMENT + 1):
+        pilot(state)
+    assert (pilot.plans[:, :SEGMENT] == pilot.plan[None, :SEGMENT]).all()
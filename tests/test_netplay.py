@@ -0,0 +1,40 @@
+import pytest
+
+from netplay import EMPTY, FULL, HEADER, NO_BASELINE, decode, encode, local_test
+
+
+def snapshot(**changes):
+    return EMPTY._replace(status=1, level=2, seed=5, score=40, x=100.5, y=20.25, fuel=900.0, **changes)
+
+
+def test_full_snapshot_round_trips_without_a_baseline():
+    now = snapshot()
+    data = encode(7, now)
+    assert decode(data, {}) == (7, now)
+    assert len(data) < HEADER.size + FULL.size
+
+
+def test_delta_carries_only_the_changed_fields():
+    base = snapshot()
+    now = base._replace(score=41, y=21.75)
+    data = encode(8, now, 7, base)
+    assert decode(data, {7: base}) == (8, now)
+    assert len(data) == HEADER.size + 4 + 4
+    # An unchanged snapshot is just the header
+    assert len(encode(9, now, 8, now)) == HEADER.size
+
+
+def test_delta_against_a_dropped_baseline_is_not_decoded():
+    base = snapshot()
+    data = encode(8, base._replace(score=41), 7, base)
+    assert decode(data, {}) is None
+    assert decode(data, {6: base}) is None
+    assert decode(encode(8, base, NO_BASELINE), {}) == (8, base)
+
+
+@pytest.mark.parametrize("loss", [0.0, 0.1])
+def test_clients_see_exactly_what_the_server_sent(loss):
+    stats = local_test(ticks=300, loss=loss)
+    assert stats["checked"] > 0
+    assert stats["mismatches"] == 0
+    assert stats["interpolated"] > 0
@@ -0,0 +1,58 @@
+import itertools
+import random
+
+import pytest
+
+from physics import CELL_SIZE, STATIC, Body, BoxState, SpatialHash, World, box_overlap, brute_force_pairs, scatter_debris
+
+
+def contacts(world, pairs):
+    bodies = world.bodies
+    return {(i, j) for i, j in pairs if box_overlap(bodies[i], bodies[j]) is not None}
+
+
+def all_pairs(world):
+    return itertools.combinations(range(len(world.bodies)), 2)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_broadphase_matches_brute_force_as_debris_flies_and_settles(seed):
+    world = World()
+    rng = random.Random(seed)
+    scatter_debris(world, rng, 600, 400, 0, 0, 150, 12)
+    scatter_debris(world, rng, -130, 690, 0, 0, 40, 3)  # a pile at negative x
+    for frame in range(120):
+        if frame % 20 == 0:
+            found = world.broadphase()
+            assert found == brute_force_pairs(world)
+            assert contacts(world, found) == contacts(world, all_pairs(world))
+        world.step()
+
+
+def test_boxes_straddling_cells_and_larger_than_cells():
+    world = World()
+    edge = CELL_SIZE
+    boxes = [
+        BoxState(edge - 1, edge - 1, 4, 4),  # corner of four cells
+        BoxState(edge + 2, edge + 2, 4, 4),  # touches the first across the corner
+        BoxState(-edge, -edge, 2, 2),  # negative cell, alone
+        BoxState(5 * edge, edge, 6 * edge, 8),  # long bar over many cells
+        BoxState(7 * edge, edge + 3, 2, 2),  # under the middle of the bar
+        BoxState(2 * edge + 10, edge + 20, 2, 2),  # shares a cell with the bar, misses it
+        BoxState(3 * edge, 3 * edge, 20, 20, angle=45),  # rotated bounds
+        BoxState(3 * edge + 14, 3 * edge, 4, 4),
+    ]
+    for state in boxes:
+        world.add(Body(state, kind=STATIC))
+    assert world.broadphase() == brute_force_pairs(world) == {(0, 1), (3, 4), (6, 7)}
+
+
+def test_spatial_hash_pairs_share_a_cell():
+    grid = SpatialHash(10)
+    grid.insert(0, 0, 0, 9, 9)
+    grid.insert(1, 10.5, 0, 12, 2)  # next cell over
+    grid.insert(2, -5, -5, 25, 1)  # spans both
+    grid.insert(3, 50, 50, 51, 51)
+    assert grid.pairs() == {(0, 2), (1, 2)}
+    grid.clear()
+    assert grid.pairs() == set()
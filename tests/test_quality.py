@@ -0,0 +1,67 @@
+from quality import DOWNGRADE_LOAD, FRAME_BUDGET_MS, TIERS, UPGRADE_FRAMES, UPGRADE_LOAD, WINDOW, QualityGovernor
+
+BUSY = FRAME_BUDGET_MS * 0.95  # Above DOWNGRADE_LOAD
+MIDDLE = FRAME_BUDGET_MS * 0.7  # Between the two thresholds
+QUIET = FRAME_BUDGET_MS * 0.2  # Below UPGRADE_LOAD
+
+
+def feed(governor, frame_ms, frames):
+    # Frames after which the tier moved, counted from 1
+    return [i for i in range(1, frames + 1) if governor.record(frame_ms)]
+
+
+def dropped():
+    # A governor one tier down, with the change just made
+    governor = QualityGovernor()
+    assert feed(governor, BUSY, WINDOW) == [WINDOW]
+    return governor
+
+
+def test_thresholds_leave_a_gap():
+    assert UPGRADE_LOAD < 0.7 < DOWNGRADE_LOAD
+
+
+def test_drops_one_tier_when_over_budget():
+    governor = QualityGovernor()
+    assert feed(governor, MIDDLE, 10 * WINDOW) == []
+    assert feed(governor, BUSY, WINDOW) != []
+    assert governor.level == 1 and governor.tier is TIERS[1]
+
+
+def test_waits_a_full_window_after_every_change():
+    governor = dropped()
+    assert feed(governor, BUSY, 2 * WINDOW) == [WINDOW, 2 * WINDOW]
+    assert governor.level == 3
+    assert feed(governor, BUSY, 5 * WINDOW) == []  # Already the lowest tier
+    assert governor.changes == 3
+
+
+def test_holds_steady_between_the_thresholds():
+    governor = dropped()
+    assert feed(governor, MIDDLE, 20 * UPGRADE_FRAMES) == []
+    assert governor.level == 1
+
+
+def test_rises_only_after_upgrade_frames_of_quiet_in_a_row():
+    governor = dropped()
+    # The window mean goes quiet WINDOW frames after a full window of
+    # MIDDLE frames, and the tier rises UPGRADE_FRAMES quiet frames later
+    feed(governor, MIDDLE, WINDOW)
+    moved = feed(governor, QUIET, WINDOW + UPGRADE_FRAMES)
+    assert len(moved) == 1 and moved[0] > UPGRADE_FRAMES
+    assert governor.level == 0
+
+
+def test_a_busy_stretch_restarts_the_quiet_count():
+    # Mostly busy frames since the last change, then one quiet window: not
+    # enough to rise
+    governor = dropped()
+    assert feed(governor, FRAME_BUDGET_MS * 0.84, UPGRADE_FRAMES - WINDOW) == []
+    assert feed(governor, QUIET, WINDOW) == []
+    assert governor.level == 1
+    # A spike that lifts the window over UPGRADE_LOAD starts the count again
+    feed(governor, QUIET, UPGRADE_FRAMES // 2)
+    feed(governor, FRAME_BUDGET_MS * 10, 1)
+    assert feed(governor, QUIET, UPGRADE_FRAMES) == []
+    assert feed(governor, QUIET, 2 * WINDOW) != []
+    assert governor.level == 0
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from autopilot import Autopilot, CatchAutopilot
+from lander_sim import CONTROL_STATES, PLAYING
+from replay import (
+    EPISODE_HEADER_V1, FILE_HEADER, MAGIC, InputRecorder, pack_frames, read_recording, replay_episode,
+    unpack_frames,
+)
+
+MODES = [(False, False), (True, False), (True, True)]  # (world, catch); catch flies in a world
+
+
+def random_frames(rng, count):
+    return [rng.randrange(16) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 7, 600])
+def test_pack_frames_round_trip(count):
+    frames = random_frames(random.Random(count), count)
+    assert unpack_frames(pack_frames(frames), count) == frames
+
+
+def test_recorder_round_trip(tmp_path):
+    path = tmp_path / "run.slr"
+    rng = random.Random(1)
+    written = []
+    recorder = InputRecorder(str(path))
+    for i, (world, catch) in enumerate(MODES * 2):
+        frames = random_frames(rng, rng.randrange(1, 900))
+        recorder.begin(1000 + i, 1 + i % 4, world, catch)
+        for bits in frames:
+            recorder.record(CONTROL_STATES[bits])
+        recorder.end(("win", "lose")[i % 2], 37 * i)
+        written.append((1000 + i, 1 + i % 4, world, catch, frames, ("win", "lose")[i % 2], 37 * i))
+        assert recorder.reference() == f"{path}#{i}"
+    recorder.begin(99, 1)
+    recorder.end("lose", 0)  # No frames, so nothing is written
+    recorder.close()
+
+    episodes = read_recording(str(path))
+    assert [(e.seed, e.level, e.world, e.catch, e.frames, e.status, e.score) for e in episodes] == written
+    for episode, (*_, frames, _, _) in zip(episodes, written):
+        assert [controls.bits for controls in episode.controls()] == frames
+        assert episode.controls() == [CONTROL_STATES[bits] for bits in frames]
+
+
+def test_truncated_recording_keeps_finished_episodes(tmp_path):
+    path = tmp_path / "run.slr"
+    recorder = InputRecorder(str(path))
+    for seed in (1, 2):
+        recorder.begin(seed, 1)
+        for bits in random_frames(random.Random(seed), 300):
+            recorder.record(CONTROL_STATES[bits])
+        recorder.end("lose", 0)
+    recorder.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert [episode.seed for episode in read_recording(str(path))] == [1]
+
+
+def test_version_1_recording_still_loads(tmp_path):
+    path = tmp_path / "old.slr"
+    frames = random_frames(random.Random(5), 101)
+    payload = pack_frames(frames)
+    path.write_bytes(FILE_HEADER.pack(MAGIC, 1) +
+                     EPISODE_HEADER_V1.pack(42, 3, 1, 250, len(frames), len(payload)) + payload)
+    [episode] = read_recording(str(path))
+    assert (episode.seed, episode.level, episode.status, episode.score) == (42, 3, "win", 250)
+    assert (episode.world, episode.catch) == (False, False)
+    assert episode.frames == frames
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.slr"
+    path.write_bytes(FILE_HEADER.pack(b"NOPE", 2))
+    with pytest.raises(ValueError):
+        read_recording(str(path))
+
+
+@pytest.fixture(scope="module")
+def game():
+    pytest.importorskip("pygame")
+    from replay import headless_game
+    return headless_game()
+
+
+def fly(game, seed, level, world, catch, pilot):
+    # One episode through Game.update, as the game loop runs it
+    game.level, game.world, game.catch = level, world, catch
+    game.reset_game(seed)
+    game.game_state = PLAYING
+    while game.game_state == PLAYING:
+        game.update(pilot())
+
+
+@pytest.mark.parametrize("world, catch", MODES, ids=["screen", "world", "catch"])
+def test_replay_reproduces_recorded_outcome(game, tmp_path, world, catch):
+    # What replay.py --verify checks: the recorded controls, fed back
+    # through Game.update from the same seed, end the same way
+    path = tmp_path / "run.slr"
+    recorder = InputRecorder(str(path))
+    game.recorder = recorder
+    rng = random.Random(7)
+    odds = (0.3, 0.1, 0.1, 0.01)  # thrust, left, right, boost
+    try:
+        fly(game, 12, 3, world, catch,
+            lambda: CONTROL_STATES[sum(1 << i for i, p in enumerate(odds) if rng.random() < p)])
+        # Without a time budget the autopilot flies the same on any machine
+        pilot = (CatchAutopilot if catch else Autopilot)(13, budget_ms=None)
+        fly(game, 13, 2, world, catch, lambda: pilot(game.sim))
+    finally:
+        game.recorder = None
+        recorder.close()
+
+    episodes = read_recording(str(path))
+    assert [episode.status for episode in episodes] == ["lose", "win"]
+    for episode in episodes:
+        assert replay_episode(game, episode) == (episode.status, episode.score)
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from lander_sim import NO_CONTROLS, PLAYING, ShipState
+from telemetry import COLUMN_ENTRY, COLUMNS, HEADER, TelemetryRing
+
+
+def flight(frame, seed=5):
+    # The parts of a Game that record() reads
+    ship = ShipState(100.0 + frame, 50.0 + frame / 2, vx=0.5, vy=1.5, angle=-3.0, fuel=900.0 - frame)
+    return SimpleNamespace(
+        vehicle=ship, sim=SimpleNamespace(frame=frame, wind_force=0.01), level=2, mode="screen",
+        game_state=PLAYING, catch=False, episode_seed=seed, score=frame,
+    )
+
+
+def write(ring, frames, seed=5):
+    for frame in frames:
+        ring.record(flight(frame, seed), NO_CONTROLS)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "flight.tlm")
+
+
+def test_rows_come_back_in_order_across_the_wrap(path):
+    writer = TelemetryRing(path, capacity=8, write=True)
+    write(writer, range(20))
+    reader = TelemetryRing(path)
+    assert reader.count == 20
+    rows = reader.rows()
+    assert list(rows) == [name for name, _ in COLUMNS]
+    # The slot of row count - capacity is where the next row goes, so a
+    # full ring gives capacity - 1 rows
+    assert rows["frame"].tolist() == list(range(13, 20))
+    assert rows["score"].tolist() == list(range(13, 20))
+    assert np.allclose(rows["x"], 100.0 + np.arange(13, 20))
+    assert reader.rows(3)["frame"].tolist() == [17, 18, 19]
+    assert reader.rows(100)["frame"].tolist() == list(range(13, 20))
+    reader.close()
+    writer.close()
+
+
+def test_reader_follows_a_live_writer(path):
+    writer = TelemetryRing(path, capacity=8, write=True)
+    reader = TelemetryRing(path)
+    write(writer, range(3))
+    assert reader.rows()["frame"].tolist() == [0, 1, 2]
+    write(writer, range(3, 11))
+    assert reader.rows()["frame"].tolist() == list(range(4, 11))
+    reader.close()
+    writer.close()
+
+
+def test_each_writer_starts_the_next_session(path):
+    first = TelemetryRing(path, capacity=8, write=True)
+    write(first, range(2), seed=1)
+    first.close()
+    second = TelemetryRing(path, capacity=999, write=True)  # The file's capacity wins
+    assert (second.session, second.capacity) == (1, 8)
+    write(second, range(3), seed=2)
+    rows = second.rows()
+    assert rows["session"].tolist() == [0, 0, 1, 1, 1]
+    assert rows["seed"].tolist() == [1, 1, 2, 2, 2]
+    second.close()
+
+
+def test_rejects_other_files(path):
+    with open(path, "wb") as f:
+        f.write(b"not telemetry".ljust(8192, b"\0"))
+    with pytest.raises(ValueError):
+        TelemetryRing(path)
+
+
+def test_rejects_another_version(path):
+    TelemetryRing(path, capacity=8, write=True).close()
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write((99).to_bytes(4, "little"))
+    with pytest.raises(ValueError):
+        TelemetryRing(path)
+
+
+def test_rejects_a_different_schema(path):
+    TelemetryRing(path, capacity=8, write=True).close()
+    with open(path, "r+b") as f:
+        f.seek(HEADER.size + COLUMN_ENTRY.size)  # The second column's name
+        f.write(b"renamed".ljust(16, b"\0"))
+    with pytest.raises(ValueError):
+        TelemetryRing(path)
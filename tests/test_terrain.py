@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from lander_sim import (
+    CHUNK_CACHE, CHUNK_MARGIN, CHUNK_WIDTH, GROUND_Y, LOSE, NO_CONTROLS, WIDTH, ChunkedTerrain, Heightfield,
+    ShipState, new_episode, step,
+)
+from vector_sim import random_terrain, sweep_ground
+
+SPIKE = 100  # column of a one-column spike 100 px above flat ground
+
+
+def spiked():
+    heights = [float(GROUND_Y)] * (WIDTH + 1)
+    heights[SPIKE] = GROUND_Y - 100.0
+    return Heightfield(heights)
+
+
+def test_sweep_finds_a_spike_between_the_end_points():
+    # Both ends are 50 px above the ground; only the spike in between is hit
+    ground = spiked()
+    y = GROUND_Y - 50.0
+    assert ground.height_at(80) > y and ground.height_at(120) > y
+    t, x, hit_y = ground.sweep(80.0, y, 120.0, y)
+    assert t == pytest.approx(0.4875)
+    assert x == pytest.approx(SPIKE - 0.5)
+    assert hit_y == y
+    # Right to left meets the far face of the spike
+    t, x, _ = ground.sweep(120.0, y, 80.0, y)
+    assert x == pytest.approx(SPIKE + 0.5)
+    # Just over the top misses
+    assert ground.sweep(80.0, GROUND_Y - 101.0, 120.0, GROUND_Y - 101.0) is None
+
+
+def test_fast_ship_crashes_into_the_spike_instead_of_passing_through():
+    ship = ShipState(80.0, 0.0, vx=40.0, vy=0.0)
+    ship.y = GROUND_Y - 50.0 - ship.height/2
+    state = new_episode(1, ship=ship, terrain=spiked())
+    state.gravity = state.wind_force = 0.0
+    step(state, NO_CONTROLS)
+    assert state.status == LOSE
+    assert ship.x == pytest.approx(SPIKE - 0.5)
+
+
+def test_fast_fall_stops_on_the_ground():
+    ship = ShipState(300.0, 0.0, vy=200.0)
+    ship.y = GROUND_Y - 150.0 - ship.height/2
+    state = new_episode(1, ship=ship, terrain=Heightfield.flat(GROUND_Y))
+    step(state, NO_CONTROLS)
+    assert state.status == LOSE
+    assert ship.y + ship.height/2 == pytest.approx(GROUND_Y)
+
+
+def test_sweep_ground_matches_heightfield_sweep():
+    rng = np.random.default_rng(3)
+    n = 400
+    terrain = random_terrain(rng, n)
+    rise = np.diff(terrain, axis=1)
+    top = terrain.min(axis=1)
+    x0 = rng.uniform(-20, WIDTH + 20, n)
+    x1 = x0 + rng.uniform(-60, 60, n)
+    x1[::10] = x0[::10]  # some straight drops
+    y0 = rng.uniform(GROUND_Y - 60, GROUND_Y + 10, n)
+    y1 = y0 + rng.uniform(-20, 60, n)
+    t_hit, x_hit, y_hit = sweep_ground(terrain, rise, top, np.arange(n), x0, y0, x1, y1)
+    hits = 0
+    for i in range(n):
+        contact = Heightfield(terrain[i]).sweep(x0[i], y0[i], x1[i], y1[i])
+        if contact is None:
+            assert t_hit[i] == np.inf, i
+        else:
+            hits += 1
+            assert (t_hit[i], x_hit[i], y_hit[i]) == contact, i
+    assert 0 < hits < n
+
+
+def test_evicted_chunks_come_back_the_same():
+    terrain = ChunkedTerrain(7)
+    first = [x * CHUNK_WIDTH + 123.5 for x in range(-3, 3)]
+    before = [terrain.height_at(x) for x in first]
+    saved = {index: tuple(terrain.chunk(index)[0]) for index in range(-3, 3)}
+    # Walk far enough away that every early chunk falls out of the cache
+    for index in range(100, 100 + CHUNK_CACHE + 5):
+        terrain.chunk(index)
+        assert len(terrain.chunks) <= CHUNK_CACHE
+    assert not set(saved) & set(terrain.chunks)
+    assert [terrain.height_at(x) for x in first] == before
+    for index, heights in saved.items():
+        assert tuple(terrain.chunk(index)[0]) == heights
+
+
+def test_retain_drops_chunks_outside_the_margin():
+    terrain = ChunkedTerrain(7)
+    for index in range(-10, 11):
+        terrain.chunk(index)
+    terrain.retain(0, CHUNK_WIDTH - 1)
+    assert sorted(terrain.chunks) == list(range(-CHUNK_MARGIN, CHUNK_MARGIN + 1))
+    # Rebuilt chunks match a terrain that never evicted them
+    fresh = ChunkedTerrain(7)
+    assert tuple(terrain.chunk(-10)[0]) == tuple(fresh.chunk(-10)[0])
+
+
+def test_chunks_do_not_depend_on_build_order():
+    forward, backward = ChunkedTerrain(11), ChunkedTerrain(11)
+    xs = np.linspace(-3 * CHUNK_WIDTH, 3 * CHUNK_WIDTH, 97)
+    a = [forward.height_at(x) for x in xs]
+    b = [backward.height_at(x) for x in xs[::-1]][::-1]
+    assert a == b
+    assert a != [ChunkedTerrain(12).height_at(x) for x in xs]
+
+
+def test_chunks_join_without_a_step():
+    terrain = ChunkedTerrain(5)
+    for index in range(-4, 4):
+        heights, _ = terrain.chunk(index)
+        assert len(heights) == CHUNK_WIDTH + 1
+        assert heights[-1] == terrain.chunk(index + 1)[0][0]
+    heights, rise, origin = terrain.window(-CHUNK_WIDTH - 10.0, CHUNK_WIDTH + 10.0)
+    assert origin == -2 * CHUNK_WIDTH
+    assert len(heights) == 4 * CHUNK_WIDTH + 1 and len(rise) == 4 * CHUNK_WIDTH
+    assert [heights[c - origin] for c in range(origin, origin + 4 * CHUNK_WIDTH + 1)] == [
+        terrain.column_height(c) for c in range(origin, origin + 4 * CHUNK_WIDTH + 1)]
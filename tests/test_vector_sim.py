@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from lander_sim import MAX_FUEL, MAX_LEVEL, Controls, Heightfield, level_params, new_episode, step
+from vector_sim import LOSE, PLAYING, WIN, LanderBatch, descent_controls, random_terrain
+
+STATUS = {"playing": PLAYING, "win": WIN, "lose": LOSE}
+FIELDS = ("x", "y", "vx", "vy", "angle", "fuel")
+LEVELS = range(1, MAX_LEVEL + 1)
+
+
+def random_controls(rng, steps, n):
+    # thrust, left, right, boost per step and lander. Thrust odds run from
+    # 0.1 to 0.6 across the landers, so some crash and some stay up.
+    odds = np.array([0.0, 0.2, 0.2, 0.02])[:, None].repeat(n, axis=1)
+    odds[0] = np.linspace(0.1, 0.6, n)
+    return rng.random((steps, 4, n)) < odds
+
+
+def assert_same(batch, states):
+    for i, state in enumerate(states):
+        for name in FIELDS:
+            assert getattr(batch, name)[i] == getattr(state.ship, name), (i, name)
+        assert batch.status[i] == STATUS[state.status], i
+        assert batch.score[i] == state.score, i
+        assert batch.frame[i] == state.frame, i
+
+
+def run_both(batch, states, controls):
+    for step_controls in controls:
+        batch.step(*step_controls)
+        for i, state in enumerate(states):
+            step(state, Controls(*(bool(c) for c in step_controls[:, i])))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("level", LEVELS)
+def test_matches_scalar_step_over_terrain(level, seed):
+    rng = np.random.default_rng(seed)
+    n, steps = 32, 400
+    terrain = random_terrain(rng, n)
+    batch = LanderBatch.for_levels(np.full(n, level), terrain=terrain)
+    states = [new_episode(level, terrain=Heightfield(row)) for row in terrain.tolist()]
+    run_both(batch, states, random_controls(rng, steps, n))
+    assert_same(batch, states)
+    assert (batch.status == LOSE).any()
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_matches_scalar_step_under_autopilot(level):
+    # descent_controls brings the landers down on the pad, so this covers
+    # the landing checks and the fuel bonus
+    rng = np.random.default_rng(level)
+    n = 16
+    terrain = random_terrain(rng, n)
+    batch = LanderBatch.for_levels(np.full(n, level), terrain=terrain)
+    states = [new_episode(level, terrain=Heightfield(row)) for row in terrain.tolist()]
+    for _ in range(600):
+        controls = np.array(descent_controls(batch))
+        run_both(batch, states, [controls])
+    assert_same(batch, states)
+    assert (batch.status == WIN).all()
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_matches_scalar_step_on_flat_ground(level):
+    rng = np.random.default_rng(level)
+    n = 32
+    batch = LanderBatch.for_levels(np.full(n, level))
+    states = [new_episode(level) for _ in range(n)]
+    run_both(batch, states, random_controls(rng, 400, n))
+    assert_same(batch, states)
+
+
+def test_mixed_levels_in_one_batch():
+    rng = np.random.default_rng(7)
+    levels = np.tile(np.arange(1, MAX_LEVEL + 1), 8)
+    terrain = random_terrain(rng, len(levels))
+    batch = LanderBatch.for_levels(levels, terrain=terrain)
+    states = [new_episode(int(level), terrain=Heightfield(row)) for level, row in zip(levels, terrain.tolist())]
+    run_both(batch, states, random_controls(rng, 300, len(levels)))
+    assert_same(batch, states)
+
+
+def test_restart_matches_a_fresh_episode():
+    rng = np.random.default_rng(3)
+    n, level = 16, 2
+    batch = LanderBatch.for_levels(np.full(n, level), terrain=random_terrain(rng, n))
+    run_both(batch, [], random_controls(rng, 400, n))
+    done = np.flatnonzero(~batch.active)
+    assert len(done)
+
+    terrain = random_terrain(rng, len(done))
+    batch.restart(done, terrain=terrain, fuel=MAX_FUEL * level_params(level).fuel_fraction)
+    states = [new_episode(level, terrain=Heightfield(row)) for row in terrain.tolist()]
+    controls = random_controls(rng, 300, n)
+    for step_controls in controls:
+        batch.step(*step_controls)
+        for i, state in zip(done, states):
+            step(state, Controls(*(bool(c) for c in step_controls[:, i])))
+    for i, state in zip(done, states):
+        for name in FIELDS:
+            assert getattr(batch, name)[i] == getattr(state.ship, name), (i, name)
+        assert batch.status[i] == STATUS[state.status]
+        assert batch.score[i] == state.score
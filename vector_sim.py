@@ -0,0 +1,493 @@
+"""Batched lander physics: N landers advanced in lockstep as NumPy arrays.
+
+Mirrors lander_sim.step_ship and lander_sim.check_touchdown element-wise so
+difficulty values and landing limits can be swept over thousands of landers at
+once. Every per-lander parameter (gravity, wind, fuel, thresholds, pad) may be
+a scalar or an array of length n. Terrain is a table of per-column ground
+heights, one row per distinct terrain, that landers index into.
+
+    python vector_sim.py --landers 100000 --steps 200
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from lander_sim import (
+    WIDTH, GROUND_Y, SIM_DT, TERRAIN_STEP, TERRAIN_ROUGHNESS, THRUST_POWER, EMERGENCY_BOOST, MAX_FUEL,
+    LANDING_VELOCITY_THRESHOLD, LANDING_ANGLE_THRESHOLD,
+    SHIP_ROTATION_RATE, SHIP_ROTATION_FUEL, BOOST_FUEL, MAX_LEVEL,
+    PAD_X, PAD_Y, PAD_WIDTH, PAD_HEIGHT, LANDING_BONUS, FUEL_SCORE,
+    Controls, Heightfield, level_params, new_episode, step,
+)
+
+# Lander status codes
+PLAYING, WIN, LOSE = 0, 1, 2
+
+DEG = math.pi / 180
+TARGET_RATE = 100_000  # lander-steps per millisecond the batch is meant to reach
+
+# Rotation steps each way covered by the cached sin/cos tables
+DIRECTION_TABLE_STEPS = 4096
+_direction_tables = {}
+
+
+class LanderBatch:
+    def __init__(self, n, gravity, wind_force=0.0, fuel=MAX_FUEL,
+                 x=WIDTH // 2, y=50, vx=0.0, vy=2.0, angle=0.0,
+                 pad_x=PAD_X, pad_y=PAD_Y, pad_width=PAD_WIDTH, pad_height=PAD_HEIGHT,
+                 ground_y=GROUND_Y, terrain=None, terrain_index=None, width=20, height=40,
+                 velocity_threshold=LANDING_VELOCITY_THRESHOLD,
+                 angle_threshold=LANDING_ANGLE_THRESHOLD,
+                 rotation_rate=SHIP_ROTATION_RATE, rotation_fuel=SHIP_ROTATION_FUEL, wrap=True):
+        # terrain: per-column heights, shape (WIDTH + 1,) for one terrain or
+        # (k, WIDTH + 1) with terrain_index picking a row per lander (default:
+        # row i for lander i, or row 0 when k is 1). Without it the ground is
+        # flat at ground_y. Rotation rate and fuel are shared by the whole
+        # batch; wrap=False lets landers leave the screen as in world missions.
+        self.n = n
+        self.rotation_rate = rotation_rate
+        self.rotation_fuel = rotation_fuel
+        self.wrap = wrap
+        column = lambda value: np.array(np.broadcast_to(value, (n,)), dtype=np.float64)
+        self.x = column(x)
+        self.y = column(y)
+        self.vx = column(vx)
+        self.vy = column(vy)
+        self.angle = column(angle)
+        self.fuel = column(fuel)
+        self.gravity = column(gravity)
+        self.wind_force = column(wind_force)
+        self.width = column(width)
+        self.height = column(height)
+        self.velocity_threshold = column(velocity_threshold)
+        self.angle_threshold = column(angle_threshold)
+        if terrain is None:
+            levels, terrain_index = np.unique(column(ground_y), return_inverse=True)
+            terrain = np.repeat(levels[:, None], WIDTH + 1, axis=1)
+        terrain = np.atleast_2d(np.asarray(terrain, dtype=np.float64))
+        if terrain_index is None:
+            terrain_index = np.arange(n) if len(terrain) == n else np.zeros(n, dtype=np.intp)
+        self.terrain = np.ascontiguousarray(terrain)
+        self.terrain_rise = np.diff(self.terrain, axis=1)
+        self.terrain_index = np.array(np.broadcast_to(terrain_index, (n,)), dtype=np.intp)
+        self.pad_x = column(pad_x)
+        # Collision geometry that never changes during a run
+        self.pad_half = column(pad_width) / 2
+        self.pad_top = column(pad_y) - column(pad_height)
+        self.pad_reach = (column(pad_width) + self.width) / 2
+        self.ground_top = self.terrain.min(axis=1)[self.terrain_index]
+        self.status = np.zeros(n, dtype=np.int8)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.touchdown_vy = np.full(n, np.nan)
+        # Thrust direction, refreshed only for landers whose angle changed
+        self._sin = np.sin(self.angle * DEG)
+        self._cos = np.cos(self.angle * DEG)
+        # Below this y a lander may be touching the pad or the ground
+        self._contact_y = np.minimum(self.pad_top, self.ground_top) - self.height / 2
+        # Scratch buffers reused every step
+        self._x0 = np.empty(n)
+        self._y0 = np.empty(n)
+        self._dt = np.empty(n)
+        self._a = np.empty(n)
+        self._b = np.empty(n)
+        self._mask = np.empty(n, dtype=bool)
+        self._burn = np.empty(n, dtype=bool)
+        self._turned = np.empty(n, dtype=bool)
+
+    @classmethod
+    def for_levels(cls, levels, **kwargs):
+        # Gravity, wind and fuel from the level table, one level per lander
+        levels = np.clip(np.asarray(levels), 1, MAX_LEVEL)
+        table = np.array([[p.gravity, p.wind_force, MAX_FUEL * p.fuel_fraction]
+                          for p in map(level_params, range(MAX_LEVEL + 1))])
+        gravity, wind_force, fuel = table[levels].T
+        return cls(len(levels), gravity=gravity, wind_force=wind_force, fuel=fuel, **kwargs)
+
+    def restart(self, index, terrain=None, x=WIDTH // 2, y=50, vx=0.0, vy=2.0, angle=0.0, fuel=MAX_FUEL):
+        # Start the given landers on a fresh episode in place. terrain, one row
+        # of heights per lander, replaces their terrain rows, so those rows
+        # must not be shared with other landers.
+        self.x[index] = x
+        self.y[index] = y
+        self.vx[index] = vx
+        self.vy[index] = vy
+        self.angle[index] = angle
+        self.fuel[index] = fuel
+        self.status[index] = PLAYING
+        self.score[index] = 0
+        self.frame[index] = 0
+        self.touchdown_vy[index] = np.nan
+        if terrain is not None:
+            rows = self.terrain_index[index]
+            self.terrain[rows] = terrain
+            self.terrain_rise[rows] = np.diff(self.terrain[rows], axis=1)
+            self.ground_top[index] = self.terrain[rows].min(axis=1)
+            self._contact_y[index] = np.minimum(self.pad_top[index], self.ground_top[index]) - self.height[index] / 2
+        radians = self.angle[index] * DEG
+        self._sin[index] = np.sin(radians)
+        self._cos[index] = np.cos(radians)
+
+    @property
+    def active(self):
+        return self.status == PLAYING
+
+    def step(self, thrust, left, right, boost, dt=SIM_DT):
+        # Finished landers get a zero time step so nothing about them changes
+        a, b, mask, burn, turned = self._a, self._b, self._mask, self._burn, self._turned
+        dt_a = self._dt
+        np.equal(self.status, PLAYING, out=mask)
+        np.multiply(mask, dt, out=dt_a)
+        # With every lander in flight on a unit step, scaling by dt_a changes
+        # nothing, so those multiplies are skipped
+        unit = dt == 1.0 and mask.all()
+
+        # Gravity and wind
+        if unit:
+            self.vy += self.gravity
+            self.vx += self.wind_force
+        else:
+            np.multiply(self.gravity, dt_a, out=a)
+            self.vy += a
+            np.multiply(self.wind_force, dt_a, out=a)
+            self.vx += a
+
+        # Main engine
+        np.greater(self.fuel, 0, out=burn)
+        burn &= thrust
+        np.multiply(burn, dt_a, out=b)
+        self._thrust(b, THRUST_POWER)
+        self.fuel -= b
+
+        # Rotation, each side checked against the fuel left so far
+        turned.fill(False)
+        for keys, sign in ((left, -self.rotation_rate), (right, self.rotation_rate)):
+            np.greater(self.fuel, 0, out=mask)
+            mask &= keys
+            if not mask.any():
+                continue
+            turned |= mask
+            np.multiply(mask, dt_a, out=b)
+            np.multiply(b, sign, out=a)
+            self.angle += a
+            np.multiply(b, self.rotation_fuel, out=a)
+            self.fuel -= a
+        if turned.any():
+            self._refresh_direction(np.flatnonzero(turned), self.rotation_rate * dt)
+
+        # Emergency boost; few landers fire it at once, so only those are touched
+        np.greater(self.fuel, BOOST_FUEL, out=mask)
+        mask &= boost
+        i = np.flatnonzero(mask)
+        if len(i):
+            scale = dt_a[i]
+            self.vx[i] += self._sin[i] * EMERGENCY_BOOST * scale
+            self.vy[i] -= self._cos[i] * EMERGENCY_BOOST * scale
+            self.fuel[i] -= scale * BOOST_FUEL
+
+        # Position and screen wrap; the start of the step is kept for the
+        # swept touchdown test
+        np.copyto(self._x0, self.x)
+        np.copyto(self._y0, self.y)
+        if unit:
+            self.x += self.vx
+            self.y += self.vy
+        else:
+            np.multiply(self.vx, dt_a, out=a)
+            self.x += a
+            np.multiply(self.vy, dt_a, out=a)
+            self.y += a
+        # Finished landers can rest just past an edge, where their touchdown
+        # put them, and stay there
+        np.greater(dt_a, 0, out=burn)
+        if self.wrap:
+            np.less(self.x, 0, out=mask)
+            if mask.any():
+                mask &= burn
+                self.x[mask] = WIDTH
+            np.greater(self.x, WIDTH, out=mask)
+            if mask.any():
+                mask &= burn
+                self.x[mask] = 0
+
+        self._touchdown(burn, dt_a)
+        self.score += burn
+        self.frame += burn
+
+    def _refresh_direction(self, index, quantum):
+        # Angles only ever move in whole rotation steps, so they are usually
+        # exact multiples of one quantum: look those up in a table of the very
+        # same np.sin/np.cos values and only run the trig for the rest
+        angle = self.angle[index]
+        steps = angle / quantum
+        k = np.rint(steps)
+        table = self._direction_table(quantum)
+        exact = (k == steps) & (np.abs(k) <= DIRECTION_TABLE_STEPS)
+        if not exact.all():
+            other = index[~exact]
+            radians = self.angle[other] * DEG
+            self._sin[other] = np.sin(radians)
+            self._cos[other] = np.cos(radians)
+            index, k = index[exact], k[exact]
+        k = k.astype(np.intp) + DIRECTION_TABLE_STEPS
+        self._sin[index] = table[0][k]
+        self._cos[index] = table[1][k]
+
+    def _direction_table(self, quantum):
+        table = _direction_tables.get(quantum)
+        if table is None:
+            radians = np.arange(-DIRECTION_TABLE_STEPS, DIRECTION_TABLE_STEPS + 1) * quantum * DEG
+            table = _direction_tables[quantum] = (np.sin(radians), np.cos(radians))
+        return table
+
+    def _thrust(self, scale, power):
+        # Skips the work when nothing in the batch is firing this engine
+        if not scale.any():
+            return
+        a = self._a
+        np.multiply(self._sin, power, out=a)
+        a *= scale
+        self.vx += a
+        np.multiply(self._cos, power, out=a)
+        a *= scale
+        self.vy -= a
+
+    def _touchdown(self, active, dt_a):
+        # Cheap y test for the whole batch, swept pad/ground test for the few
+        # landers whose step ended or started low enough to touch anything
+        low = np.maximum(self._y0, self.y) >= self._contact_y
+        candidates = np.flatnonzero(active & low)
+        if len(candidates) == 0:
+            return
+        i = candidates
+        half = self.height[i] / 2
+        x0 = self._x0[i]
+        y0 = self._y0[i] + half
+        x1 = x0 + self.vx[i] * dt_a[i]
+        y1 = self.y[i] + half
+
+        # Pad: landing on top mid-step, or ending the step beside or inside it
+        top = self.pad_top[i]
+        reach = self.pad_reach[i]
+        pad_x = self.pad_x[i]
+        cross = (y0 < top) & (top <= y1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pad_t = (top - y0) / (y1 - y0)
+        pad_cx = x0 + (x1 - x0) * pad_t
+        on_top = cross & (np.abs(pad_cx - pad_x) < reach)
+        beside = ~on_top & (y1 >= top) & (np.abs(x1 - pad_x) < reach)
+        pad_t = np.where(on_top, pad_t, np.where(beside, 1.0, np.inf))
+        pad_cx = np.where(on_top, pad_cx, x1)
+        pad_cy = np.where(on_top, top, y1)
+
+        ground_t, ground_cx, ground_cy = sweep_ground(
+            self.terrain, self.terrain_rise, self.ground_top[i], self.terrain_index[i], x0, y0, x1, y1)
+        pad_hit = (pad_t != np.inf) & (pad_t <= ground_t)
+        ground_hit = ~pad_hit & (ground_t != np.inf)
+        t = np.where(pad_hit, pad_t, ground_t)
+        moved = (pad_hit | ground_hit) & (t < 1.0)
+        self.x[i[moved]] = np.where(pad_hit, pad_cx, ground_cx)[moved]
+        self.y[i[moved]] = (np.where(pad_hit, pad_cy, ground_cy) - half)[moved]
+
+        x = self.x[i]
+        half_w = self.width[i] / 2
+        half_pad = self.pad_half[i]
+        vy = self.vy[i]
+        fits = (x - half_w >= pad_x - half_pad) & (x + half_w <= pad_x + half_pad)
+        soft = (np.abs(vy) < self.velocity_threshold[i]) & (np.abs(self.angle[i]) < self.angle_threshold[i])
+        win = pad_hit & fits & soft
+        lose = (pad_hit & ~win) | ground_hit
+        winners = i[win]
+        self.score[winners] += np.trunc(self.fuel[winners] * FUEL_SCORE).astype(np.int64) + LANDING_BONUS
+        self.status[winners] = WIN
+        self.status[i[lose]] = LOSE
+        ended = win | lose
+        self.touchdown_vy[i[ended]] = vy[ended]
+
+    def all_done(self):
+        return not (self.status == PLAYING).any()
+
+
+def height_at(terrain, rise, row, x):
+    # Heightfield.height_at for many points; row picks each point's terrain.
+    # Rows may be any width, they are usually WIDTH + 1 columns.
+    last = rise.shape[-1]
+    x = np.clip(x, 0.0, float(last))
+    col = np.minimum(x.astype(np.intp), last - 1)
+    return terrain[row, col] + rise[row, col] * (x - col)
+
+
+def slope_at(terrain, rise, row, x):
+    last = rise.shape[-1]
+    col = np.minimum(np.clip(x, 0.0, float(last)).astype(np.intp), last - 1)
+    return rise[row, col]
+
+
+def sweep_ground(terrain, rise, top, row, x0, y0, x1, y1):
+    # Heightfield.sweep for many segments at once: returns the contact time,
+    # inf where a segment stays above the ground, and the contact point
+    m = len(x0)
+    last = rise.shape[-1]
+    t_hit = np.full(m, np.inf)
+    x_hit = np.zeros(m)
+    y_hit = np.zeros(m)
+    live = np.maximum(y0, y1) >= top
+    gap0 = y0 - height_at(terrain, rise, row, x0)
+    now = live & (gap0 >= 0)
+    t_hit[now] = 0.0
+    x_hit[now] = x0[now]
+    y_hit[now] = y0[now]
+    live &= ~now
+    if not live.any():
+        return t_hit, x_hit, y_hit
+
+    def contact(j, t0, g0, t1, g1):
+        t = t0 + (t1 - t0) * (g0 / (g0 - g1))
+        t_hit[j] = t
+        x_hit[j] = x0[j] + dx[j] * t
+        y_hit[j] = y0[j] + dy[j] * t
+        live[j] = False
+
+    # Column boundaries crossed, walked one at a time for every segment
+    dx = x1 - x0
+    dy = y1 - y0
+    forward = x1 > x0
+    backward = x1 < x0
+    start = np.where(forward, np.maximum(np.floor(x0) + 1, 0), np.minimum(np.ceil(x0) - 1, last))
+    stop = np.where(forward, np.minimum(np.ceil(x1), last + 1), np.maximum(np.floor(x1), -1))
+    count = np.maximum(np.where(forward, stop - start, np.where(backward, start - stop, 0)), 0).astype(np.intp)
+    start = start.astype(np.intp)
+    direction = np.where(forward, 1, -1)
+    t0 = np.zeros(m)
+    for k in range(int(count[live].max(initial=0))):
+        j = np.flatnonzero(live & (count > k))
+        c = start[j] + k * direction[j]
+        t = (c - x0[j]) / dx[j]
+        gap = (y0[j] + dy[j] * t) - terrain[row[j], c]
+        hit = gap >= 0
+        if hit.any():
+            contact(j[hit], t0[j[hit]], gap0[j[hit]], t[hit], gap[hit])
+        t0[j] = t
+        gap0[j] = gap
+    j = np.flatnonzero(live)
+    gap = y1[j] - height_at(terrain, rise, row[j], x1[j])
+    hit = gap >= 0
+    if hit.any():
+        contact(j[hit], t0[j[hit]], gap0[j[hit]], 1.0, gap[hit])
+    return t_hit, x_hit, y_hit
+
+
+def random_terrain(rng, count):
+    # count terrains shaped like lander_sim.generate_terrain, as height rows
+    vertices = GROUND_Y + rng.integers(-TERRAIN_ROUGHNESS, TERRAIN_ROUGHNESS + 1,
+                                       (count, WIDTH // TERRAIN_STEP + 1)).astype(np.float64)
+    x = np.arange(WIDTH + 1)
+    segment = np.minimum(x // TERRAIN_STEP, vertices.shape[1] - 2)
+    ya = vertices[:, segment]
+    yb = vertices[:, segment + 1]
+    return ya + (yb - ya) * ((x - segment * TERRAIN_STEP) / TERRAIN_STEP)
+
+
+def glide_path(batch):
+    # Height above the pad and the velocity descent_policy steers towards:
+    # drift over the pad, sink slower as it gets closer
+    bottom = batch.y + batch.height / 2
+    height = np.maximum(0.0, batch.pad_top - bottom)
+    target_vx = np.clip((batch.pad_x - batch.x) * 0.02, -3.0, 3.0)
+    target_vy = 1.0 + 0.5 * np.sqrt(2 * np.maximum(THRUST_POWER - batch.gravity, 0.05) * height)
+    far = np.abs(batch.pad_x - batch.x) > height + batch.pad_half / 2
+    target_vy = np.where(far, np.minimum(target_vy, 0.5), target_vy)
+    return height, target_vx, target_vy
+
+
+def descent_controls(batch):
+    # lander_sim.descent_policy for every lander in the batch at once
+    height, target_vx, target_vy = glide_path(batch)
+    need_x = (target_vx - batch.vx) * 0.2 - batch.wind_force
+    need_y = (target_vy - batch.vy) * 0.2 - batch.gravity
+    limit = np.where(height < 60, 8.0, 30.0)
+    target_angle = np.clip(np.degrees(np.arctan2(need_x, -need_y)), -limit, limit)
+    along = need_x * batch._sin - need_y * batch._cos
+    thrust = along > THRUST_POWER * 0.5
+    left = batch.angle > target_angle + 1
+    right = batch.angle < target_angle - 1
+    return thrust, left, right, np.zeros(batch.n, dtype=bool)
+
+
+def compare_with_scalar(n=64, steps=400, level=2, seed=0):
+    # Drive n scalar episodes and one batch with the same random controls and
+    # return the largest state difference seen
+    rng = np.random.default_rng(seed)
+    controls = rng.random((steps, 4, n)) < np.array([0.55, 0.2, 0.2, 0.02])[None, :, None]
+    terrain = random_terrain(rng, n)
+    batch = LanderBatch.for_levels(np.full(n, level), terrain=terrain)
+    states = [new_episode(level, terrain=Heightfield(row)) for row in terrain.tolist()]
+    for t in range(steps):
+        batch.step(*controls[t])
+        for i, state in enumerate(states):
+            step(state, Controls(*(bool(c) for c in controls[t, :, i])))
+    names = ("x", "y", "vx", "vy", "angle", "fuel")
+    error = 0.0
+    for i, state in enumerate(states):
+        for name in names:
+            error = max(error, abs(getattr(state.ship, name) - getattr(batch, name)[i]))
+        status = {"playing": PLAYING, "win": WIN, "lose": LOSE}[state.status]
+        if status != batch.status[i] or state.score != batch.score[i]:
+            raise AssertionError(f"lander {i}: scalar {state.status}/{state.score}, "
+                                 f"batch {batch.status[i]}/{batch.score[i]}")
+    return error
+
+
+def report(what, lander_steps, elapsed):
+    rate = lander_steps / elapsed / 1000
+    print(f"{what}: {lander_steps} lander-steps in {elapsed:.3f}s, {rate:.0f} lander-steps/ms "
+          f"({rate / TARGET_RATE:.0%} of the {TARGET_RATE // 1000}k target)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the batch against lander_sim and time it.")
+    parser.add_argument("--landers", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--max-steps", type=int, default=5000, help="give up on a descent after this many steps")
+    args = parser.parse_args()
+
+    for level in (1, 2, 3, 4):
+        print(f"level {level}: max abs error vs scalar {compare_with_scalar(level=level, seed=level):.3g}")
+
+    n = args.landers
+    rng = np.random.default_rng(0)
+    batch = LanderBatch.for_levels(rng.integers(1, 5, n), y=-1e9)  # far above the ground, never lands
+    thrust, left, right, boost = rng.random((4, n)) < np.array([0.5, 0.2, 0.2, 0.01])[:, None]
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        batch.step(thrust, left, right, boost)
+    elapsed = time.perf_counter() - start
+    report(f"{n} landers in free flight x {args.steps} steps", n * args.steps, elapsed)
+
+    # Real descents over random terrain, flown by descent_controls until every
+    # lander is down, so the sweeps and touchdown checks run as in the game.
+    # Landers that are down still cost a little each step, so the rate is
+    # given per lander in the batch and per lander still flying.
+    batch = LanderBatch.for_levels(rng.integers(1, 5, n), terrain=random_terrain(rng, min(n, 1000)),
+                                   terrain_index=rng.integers(0, min(n, 1000), n),
+                                   x=rng.uniform(100, WIDTH - 100, n))
+    steps = flying = 0
+    elapsed = 0.0
+    while not batch.all_done() and steps < args.max_steps:
+        controls = descent_controls(batch)
+        flying += np.count_nonzero(batch.status == PLAYING)
+        start = time.perf_counter()
+        batch.step(*controls)
+        elapsed += time.perf_counter() - start
+        steps += 1
+    landed = np.count_nonzero(batch.status == WIN)
+    crashed = np.count_nonzero(batch.status == LOSE)
+    what = f"{n} descents, {landed} landed and {crashed} crashed in {steps} steps"
+    report(what, n * steps, elapsed)
+    report(f"{what}, counting only landers in flight", flying, elapsed)
+
+
+if __name__ == "__main__":
+    main()